@@ -55,6 +55,10 @@ EPS_POTENTIAL = 1e-3   # larger than EPS_ACCEL to avoid large spikes in the mesh
 # Toggle default: enable 1PN corrections (Schwarzschild/EIH) by default
 ENABLE_1PN_DEFAULT = True
 
+# Default time stepper (see physics/integrators.py): "verlet" (2nd order)
+# or "yoshida4" (4th order, 3 force evaluations per step, allows a larger DT)
+INTEGRATOR_DEFAULT = "verlet"
+
 # ---------------------------
 # Visualization / rendering defaults
 # ---------------------------
@@ -65,6 +69,9 @@ VISUAL_RADIUS_SCALE = 2000.0
 # Trail / path decimation: store one trail sample every TRAIL_DECIMATE physics steps
 TRAIL_DECIMATE = 10
 
+# Trail history length per body (samples kept in the ring buffer; older ones are overwritten)
+TRAIL_MAX_POINTS = 300
+
 # Grid defaults for potential surface (x-z plane)
 GRID_DEFAULT_RANGE_AU = 20.0     # half-width of the grid in AU (grid spans [-L, L])
 GRID_COARSE_N = 61               # coarse grid resolution (general view)
@@ -86,6 +93,23 @@ FARFIELD_UPDATE_EVERY = 3
 # Radius (AU) for the high-resolution focus patch around a selected planet
 FOCUS_PATCH_RADIUS_AU = 2.0
 
+# Body count from which the multithreaded acceleration kernel is used
+# (below this, thread start-up costs more than the pair loop itself)
+PARALLEL_ACCEL_MIN_BODIES = 32
+
+# Body count from which accelerations come from the Barnes-Hut octree
+# (physics/barnes_hut.py) instead of the exact pair sum. The tree build only
+# pays for itself in the low thousands of bodies.
+BH_THRESHOLD = 2048
+
+# Barnes-Hut opening angle (cell width / distance) and bodies per leaf
+BH_THETA = 0.5
+BH_LEAF_SIZE = 8
+
+# Body count from which the NumPy (no-Numba) acceleration path evaluates its
+# N x N pair expressions with numexpr, when that is installed
+NUMEXPR_MIN_BODIES = 128
+
 # ---------------------------
 # Diagnostic / logging defaults
 # ---------------------------
@@ -134,11 +158,12 @@ DT_SECONDS = years_to_seconds(DT)
 __all__ = [
     "AU_IN_METERS", "SECONDS_PER_YEAR", "M_SUN_IN_KG", "G_SI", "C_SI",
     "G", "C_AU_PER_YR", "DT", "DT_SECONDS",
-    "EPS_ACCEL", "EPS_POTENTIAL", "ENABLE_1PN_DEFAULT",
-    "VISUAL_RADIUS_SCALE", "TRAIL_DECIMATE",
+    "EPS_ACCEL", "EPS_POTENTIAL", "ENABLE_1PN_DEFAULT", "INTEGRATOR_DEFAULT",
+    "VISUAL_RADIUS_SCALE", "TRAIL_DECIMATE", "TRAIL_MAX_POINTS",
     "GRID_DEFAULT_RANGE_AU", "GRID_COARSE_N", "GRID_FOCUS_N",
     "POTENTIAL_Y_SCALE", "POTENTIAL_Y_CLAMP",
-    "FARFIELD_UPDATE_EVERY", "FOCUS_PATCH_RADIUS_AU",
+    "FARFIELD_UPDATE_EVERY", "FOCUS_PATCH_RADIUS_AU", "PARALLEL_ACCEL_MIN_BODIES",
+    "BH_THRESHOLD", "BH_THETA", "BH_LEAF_SIZE", "NUMEXPR_MIN_BODIES",
     "DIAGNOSTIC_ENERGY_PRINT_EVERY", "DIAGNOSTIC_SAVE_HISTORY_LENGTH",
     "kg_to_solar_mass", "solar_mass_to_kg", "m_to_AU", "AU_to_m", "km_to_AU",
     "seconds_to_years", "years_to_seconds",
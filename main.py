@@ -17,10 +17,11 @@ from matplotlib.animation import FuncAnimation
 
 # Import our modules
 from model.system import load_solar_system, create_test_system
-from physics.nbody import step_system
+from physics.nbody import compute_accelerations
+from physics.integrators import INTEGRATORS, get_integrator
 from physics.diagnostics import total_energy, total_angular_momentum, diagnostics_report
 from viz.scene import Scene
-from constants import DT, DIAGNOSTIC_ENERGY_PRINT_EVERY
+from constants import DT, DIAGNOSTIC_ENERGY_PRINT_EVERY, INTEGRATOR_DEFAULT
 from viz.ui import InfoPanel, ControlPanel
 
 class SolarSimulation:
@@ -28,7 +29,8 @@ class SolarSimulation:
     Main simulation class that coordinates physics and visualization.
     """
     
-    def __init__(self, data_file=None, use_test_system=False):
+    def __init__(self, data_file=None, use_test_system=False, integrator=INTEGRATOR_DEFAULT,
+                 dtype=np.float64, renderer_type="matplotlib"):
         """
         Initialize the simulation.
         
@@ -38,15 +40,22 @@ class SolarSimulation:
             Path to solar system data file. Defaults to "data/solar_params.json"
         use_test_system : bool
             If True, use a simple test system instead of full solar system
+        integrator : str
+            Name of the time stepper in physics.integrators.INTEGRATORS
+        dtype : np.float64 or np.float32
+            Precision of the integration state; float32 is for
+            visualization-only runs
+        renderer_type : str
+            "matplotlib", or "opengl" for the pyqtgraph renderer
         """
         # Load solar system
         if use_test_system:
             print("Loading test system (Sun + Earth)...")
-            self.system = create_test_system()
+            self.system = create_test_system(dtype=dtype)
         else:
             data_file = data_file or "data/solar_params.json"
             print(f"Loading solar system from {data_file}...")
-            self.system = load_solar_system(data_file)
+            self.system = load_solar_system(data_file, dtype=dtype)
         
         print(f"Loaded {len(self.system.bodies)} bodies:")
         for body in self.system.bodies:
@@ -56,6 +65,11 @@ class SolarSimulation:
         self.time = 0.0
         self.step_count = 0
         self.dt = DT
+        self.step_fn = get_integrator(integrator)
+        
+        # Both steppers expect acc to hold the accelerations at the current
+        # positions on entry, so prime it before the first kick
+        compute_accelerations(self.system.bodies)
         
         # Store initial conditions for diagnostics
         self.E0 = total_energy(self.system.bodies)
@@ -65,11 +79,12 @@ class SolarSimulation:
         print(f"Initial angular momentum: {np.linalg.norm(self.H0):.6e}")
         
         # Initialize visualization
-        self.scene = Scene(self.system)
+        self.scene = Scene(self.system, renderer_type=renderer_type)
         
         # Animation control
         self.paused = False
         self.time_scale = 1.0
+        self._eff_dt = self.dt   # dt * time_scale, refreshed by set_time_scale
         
         # Performance tracking - OPTIMIZED
         self.last_time = time.time()
@@ -80,12 +95,32 @@ class SolarSimulation:
         # Skip frames for better performance
         self.frame_skip = 0
         self.skip_every = 2  # Skip every 2nd frame for rendering (but not physics)
+        
+        # Set by input handlers; the next animation tick renders once
+        self._render_dirty = False
+        
+        # on_key_press dispatch: one dict lookup per key event (the number
+        # keys are handled separately)
+        self._key_actions = {
+            ' ': self._toggle_pause,
+            'r': self._reset_camera,
+            'c': self._clear_trails,
+            't': self._toggle_trails,
+            's': self._toggle_surface,
+            'f': self._focus_selected,
+            '+': self._speed_up,
+            '=': self._speed_up,
+            '-': self._slow_down,
+            'p': self._cycle_performance,
+            'q': self._quit,
+            'escape': self._quit,
+        }
     
     def step_physics(self):
         """Advance physics by one timestep."""
         if not self.paused:
-            step_system(self.system.bodies, dt=self.dt * self.time_scale)
-            self.time += self.dt * self.time_scale
+            self.step_fn(self.system.bodies, dt=self._eff_dt)
+            self.time += self._eff_dt
             self.step_count += 1
             
             # Print diagnostics less frequently for better performance
@@ -95,6 +130,11 @@ class SolarSimulation:
                       f"dE/E0: {report.get('dE/E0', 0):.2e}, "
                       f"|dH|/|H0|: {report.get('|dH|/|H0|', 0):.2e}")
     
+    def set_time_scale(self, scale):
+        """Set the time scale and the effective timestep derived from it."""
+        self.time_scale = scale
+        self._eff_dt = self.dt * scale
+    
     def update_frame(self, frame):
         """Update function for matplotlib animation - OPTIMIZED."""
         # Always step physics (important for accuracy)
@@ -103,10 +143,11 @@ class SolarSimulation:
         # Always update scene (needed for trails, etc.)
         self.scene.update(self.dt)
         
-        # Frame skipping for rendering only
+        # Frame skipping for rendering only (input changes render right away)
         self.frame_skip += 1
-        if self.frame_skip >= self.skip_every:
+        if self.frame_skip >= self.skip_every or self._render_dirty:
             self.frame_skip = 0
+            self._render_dirty = False
             # Only render every skip_every frames
             self.scene.render()
         
@@ -121,55 +162,73 @@ class SolarSimulation:
     
     def on_key_press(self, event):
         """Handle keyboard input - OPTIMIZED."""
-        if event.key == ' ':
-            self.paused = not self.paused
-            print(f"Simulation {'PAUSED' if self.paused else 'RESUMED'}")
-        elif event.key == 'r':
-            self.scene.camera.reset()
-            print("Camera reset")
-        elif event.key == 'c':
-            self.system.clear_all_trails()
-            print("Trails cleared")
-        elif event.key == 't':
-            self.scene.toggle_trails()
-            print(f"Trails {'ON' if self.scene.show_trails else 'OFF'}")
-        elif event.key == 's':
-            self.scene.toggle_surface()
-            print(f"Surface {'ON' if self.scene.show_surface else 'OFF'}")
-        elif event.key == 'f':
-            if self.scene.ui.selected_body:
-                self.scene.camera.focus_on_body(self.scene.ui.selected_body)
-                print(f"Focusing on {self.scene.ui.selected_body.name}")
-        elif event.key in '12345678':
+        self._render_dirty = True
+        key = event.key
+        action = self._key_actions.get(key)
+        if action is not None:
+            action()
+        elif key is not None and len(key) == 1 and '1' <= key <= '8':
             # Select planet by number
-            planet_index = int(event.key) - 1
+            planet_index = int(key) - 1
             if 0 <= planet_index < len(self.system.planets):
                 body = self.system.planets[planet_index]
                 self.scene.ui.selected_body = body
                 self.scene.ui.info_panel.set_body(body)
                 self.scene.camera.focus_on_body(body)
                 print(f"Selected {body.name}")
-        elif event.key == '+' or event.key == '=':
-            self.time_scale = min(10.0, self.time_scale * 1.5)
-            print(f"Time scale: {self.time_scale:.1f}x")
-        elif event.key == '-':
-            self.time_scale = max(0.1, self.time_scale / 1.5)
-            print(f"Time scale: {self.time_scale:.1f}x")
-        elif event.key == 'p':
-            # Performance toggle
-            if self.skip_every == 1:
-                self.skip_every = 3  # More aggressive frame skipping
-                print("Performance mode: HIGH (skip 2/3 render frames)")
-            elif self.skip_every == 3:
-                self.skip_every = 1  # No frame skipping
-                print("Performance mode: QUALITY (render all frames)")
-            else:
-                self.skip_every = 2  # Default
-                print("Performance mode: BALANCED (skip 1/2 render frames)")
-        elif event.key == 'q' or event.key == 'escape':
-            print("Exiting simulation...")
-            plt.close('all')
-            sys.exit(0)
+    
+    # ---------------------------
+    # Key actions (see _key_actions)
+    # ---------------------------
+    def _toggle_pause(self):
+        self.paused = not self.paused
+        print(f"Simulation {'PAUSED' if self.paused else 'RESUMED'}")
+    
+    def _reset_camera(self):
+        self.scene.camera.reset()
+        print("Camera reset")
+    
+    def _clear_trails(self):
+        self.system.clear_all_trails()
+        print("Trails cleared")
+    
+    def _toggle_trails(self):
+        self.scene.toggle_trails()
+        print(f"Trails {'ON' if self.scene.show_trails else 'OFF'}")
+    
+    def _toggle_surface(self):
+        self.scene.toggle_surface()
+        print(f"Surface {'ON' if self.scene.show_surface else 'OFF'}")
+    
+    def _focus_selected(self):
+        if self.scene.ui.selected_body:
+            self.scene.camera.focus_on_body(self.scene.ui.selected_body)
+            print(f"Focusing on {self.scene.ui.selected_body.name}")
+    
+    def _speed_up(self):
+        self.set_time_scale(min(10.0, self.time_scale * 1.5))
+        print(f"Time scale: {self.time_scale:.1f}x")
+    
+    def _slow_down(self):
+        self.set_time_scale(max(0.1, self.time_scale / 1.5))
+        print(f"Time scale: {self.time_scale:.1f}x")
+    
+    def _cycle_performance(self):
+        # Performance toggle
+        if self.skip_every == 1:
+            self.skip_every = 3  # More aggressive frame skipping
+            print("Performance mode: HIGH (skip 2/3 render frames)")
+        elif self.skip_every == 3:
+            self.skip_every = 1  # No frame skipping
+            print("Performance mode: QUALITY (render all frames)")
+        else:
+            self.skip_every = 2  # Default
+            print("Performance mode: BALANCED (skip 1/2 render frames)")
+    
+    def _quit(self):
+        print("Exiting simulation...")
+        plt.close('all')
+        sys.exit(0)
 
     def on_scroll(self, event):
         """Handle mouse wheel zoom - OPTIMIZED."""
@@ -177,9 +236,9 @@ class SolarSimulation:
             self.scene.camera.zoom(1.1)   # zoom in
         elif event.button == 'down':
             self.scene.camera.zoom(0.9)   # zoom out
-        # Force immediate render for smooth zoom
-        self.scene.render()
-        plt.draw()
+        # Render on the next animation tick, so fast wheel input cannot
+        # queue up more redraws than the frame rate
+        self._render_dirty = True
 
     def on_mouse_press(self, event):
         """Handle mouse click."""
@@ -189,6 +248,19 @@ class SolarSimulation:
                 print(f"Selected {selected.name}")
     
     def run_interactive(self):
+        print("Controls:")
+        print("  SPACE - Pause/Resume")
+        print("  P - Toggle performance mode")
+        print("  S - Toggle gravity surface")
+        print("  T - Toggle trails")
+        print("  +/- - Adjust time scale")
+        print("  Mouse wheel - Zoom")
+        
+        if not hasattr(self.scene.renderer, "fig"):
+            # OpenGL renderer: its own Qt timer drives the frames
+            self.scene.renderer.run(self.update_frame, key_callback=self.on_key_press)
+            return
+        
         # Set matplotlib performance options
         plt.rcParams['path.simplify'] = True
         plt.rcParams['path.simplify_threshold'] = 0.1
@@ -199,20 +271,12 @@ class SolarSimulation:
         self.scene.renderer.fig.canvas.mpl_connect('button_press_event', self.on_mouse_press)
         self.scene.renderer.fig.canvas.mpl_connect('scroll_event', self.on_scroll)
         
-        print("Controls:")
-        print("  SPACE - Pause/Resume")
-        print("  P - Toggle performance mode")
-        print("  S - Toggle gravity surface")
-        print("  T - Toggle trails")
-        print("  +/- - Adjust time scale")
-        print("  Mouse wheel - Zoom")
-        
         # Create animation with optimized settings
         self.animation = FuncAnimation(
             self.scene.renderer.fig,
             self.update_frame,
-            interval=80,  # ~12 FPS (increased from 50)
-            blit=False,
+            interval=16,  # ~60 FPS target; artists are updated in place
+            blit=False,   # Axes3D only reprojects on a full draw
             cache_frame_data=False,
             repeat=True
         )
@@ -280,12 +344,21 @@ def main():
                        help='Number of steps for headless mode')
     parser.add_argument('--fast', action='store_true',
                        help='Start in high performance mode')
+    parser.add_argument('--integrator', choices=sorted(INTEGRATORS), default=INTEGRATOR_DEFAULT,
+                       help='Time stepper (yoshida4 is 4th order and tolerates a larger dt)')
+    parser.add_argument('--precision', choices=['fp64', 'fp32'], default='fp64',
+                       help='State precision (fp32 is faster but only good for visualization)')
+    parser.add_argument('--renderer', choices=['matplotlib', 'opengl'], default='matplotlib',
+                       help='Renderer (opengl needs pyqtgraph and PyOpenGL)')
     
     args = parser.parse_args()
     
     try:
         # Create simulation
-        sim = SolarSimulation(data_file=args.data, use_test_system=args.test)
+        sim = SolarSimulation(data_file=args.data, use_test_system=args.test,
+                              integrator=args.integrator,
+                              dtype=np.float32 if args.precision == 'fp32' else np.float64,
+                              renderer_type='matplotlib' if args.headless else args.renderer)
         
         # Set initial performance mode
         if args.fast:
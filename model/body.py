@@ -6,9 +6,14 @@ Body class (mass, radius, pos, vel, acc)
 Represents a single celestial body in the simulation with all its physical
 properties and state vectors. This is the fundamental data structure that
 the physics engine operates on.
+
+Once a body is added to a SolarSystem its state lives in the system's packed
+(N, 3) arrays; the attributes below become views onto row ``body.index``.
 """
 
+import math
 import numpy as np
+from constants import TRAIL_MAX_POINTS
 
 __all__ = ["Body"]
 
@@ -32,8 +37,10 @@ class Body:
         Acceleration vector in AU/yr^2 (computed by physics engine)
     color : list or tuple, length 3
         RGB color values for visualization (each component 0.0-1.0)
-    trail : list of np.ndarray
-        Historical positions for drawing orbital trails
+    trail : np.ndarray, shape (T, 3)
+        Historical positions (float32) for drawing orbital trails, oldest first
+    index : int or None
+        Row of this body in its system's packed arrays (None while detached)
     """
     
     def __init__(self, name, mass, radius, pos=None, vel=None, color=None):
@@ -56,17 +63,109 @@ class Body:
             RGB color [r, g, b] with values 0.0-1.0. Defaults to white.
         """
         self.name = name
-        self.mass = float(mass)
-        self.radius = float(radius)
         
-        # State vectors
-        self.pos = np.array(pos if pos is not None else [0.0, 0.0, 0.0], dtype=float)
-        self.vel = np.array(vel if vel is not None else [0.0, 0.0, 0.0], dtype=float)
-        self.acc = np.zeros(3, dtype=float)
+        # Packed storage owner (set by SolarSystem.add_body)
+        self._system = None
+        self.index = None
+        
+        # Detached state, used until the body joins a system
+        self._mass = float(mass)
+        self._radius = float(radius)
+        self._pos = np.array(pos if pos is not None else [0.0, 0.0, 0.0], dtype=float)
+        self._vel = np.array(vel if vel is not None else [0.0, 0.0, 0.0], dtype=float)
+        self._acc = np.zeros(3, dtype=float)
         
         # Visualization
         self.color = list(color if color is not None else [1.0, 1.0, 1.0])
-        self.trail = []
+        # Detached trail: a float32 ring laid out like SolarSystem's (each
+        # sample stored twice, so the trail is always one contiguous view),
+        # allocated by the first sample. Attached bodies use the system's.
+        self._trail = None
+        self._trail_len = 0
+        self._trail_head = 0
+        self._trail_calls = 0
+    
+    # ---------------------------
+    # State accessors (views into the owning system's SoA arrays)
+    # ---------------------------
+    @property
+    def pos(self):
+        if self._system is None:
+            return self._pos
+        return self._system._pos[self.index]
+    
+    @pos.setter
+    def pos(self, value):
+        self.pos[:] = value
+    
+    @property
+    def vel(self):
+        if self._system is None:
+            return self._vel
+        return self._system._vel[self.index]
+    
+    @vel.setter
+    def vel(self, value):
+        self.vel[:] = value
+    
+    @property
+    def acc(self):
+        if self._system is None:
+            return self._acc
+        return self._system._acc[self.index]
+    
+    @acc.setter
+    def acc(self, value):
+        self.acc[:] = value
+    
+    @property
+    def mass(self):
+        if self._system is None:
+            return self._mass
+        return float(self._system._mass[self.index])
+    
+    @mass.setter
+    def mass(self, value):
+        if self._system is None:
+            self._mass = float(value)
+        else:
+            self._system._mass[self.index] = value
+            self._system._rebuild_mass_tables()
+    
+    @property
+    def radius(self):
+        if self._system is None:
+            return self._radius
+        return float(self._system._radius[self.index])
+    
+    @radius.setter
+    def radius(self, value):
+        if self._system is None:
+            self._radius = float(value)
+        else:
+            self._system._radius[self.index] = value
+    
+    def _attach(self, system, index):
+        """Move this body's state into row ``index`` of ``system``'s arrays."""
+        system._pos[index] = self._pos
+        system._vel[index] = self._vel
+        system._acc[index] = self._acc
+        system._mass[index] = self._mass
+        system._radius[index] = self._radius
+        self._system = system
+        self.index = index
+        self._pos = self._vel = self._acc = None
+        self._trail = None
+        self._trail_len = 0
+    
+    @property
+    def trail(self):
+        if self._system is not None:
+            return self._system.get_trail(self.index)
+        if self._trail is None:
+            return np.empty((0, 3), dtype=np.float32)
+        end = self._trail_head + TRAIL_MAX_POINTS
+        return self._trail[end - self._trail_len:end]
         
     def __repr__(self):
         return f"Body(name='{self.name}', mass={self.mass:.3e}, radius={self.radius:.3e})"
@@ -78,17 +177,36 @@ class Body:
         """
         Add current position to the trail for visualization.
         
+        Only this body's trail gets the sample, with its own decimation
+        count; to sample every body of a SolarSystem at once use
+        ``SolarSystem.add_trail_points``.
+        
         Parameters
         ----------
         decimation : int
             Only add every Nth call to reduce memory usage
         """
-        if len(self.trail) % decimation == 0:
-            self.trail.append(self.pos.copy())
+        calls = self._trail_calls
+        self._trail_calls += 1
+        if calls % decimation != 0:
+            return
+        if self._system is not None:
+            self._system.add_trail_point(self.index)
+            return
+        if self._trail is None:
+            self._trail = np.zeros((2 * TRAIL_MAX_POINTS, 3), dtype=np.float32)
+        head = self._trail_head
+        self._trail[head] = self._pos
+        self._trail[head + TRAIL_MAX_POINTS] = self._pos
+        self._trail_head = (head + 1) % TRAIL_MAX_POINTS
+        self._trail_len = min(self._trail_len + 1, TRAIL_MAX_POINTS)
     
     def clear_trail(self):
         """Clear the orbital trail."""
-        self.trail.clear()
+        if self._system is not None:
+            self._system._trail_len[self.index] = 0
+        else:
+            self._trail_len = 0
     
     def get_kinetic_energy(self):
         """
@@ -99,7 +217,8 @@ class Body:
         float
             Kinetic energy in internal units (AU^2/yr^2 * M_sun)
         """
-        return 0.5 * self.mass * np.dot(self.vel, self.vel)
+        vx, vy, vz = self.vel
+        return 0.5 * self.mass * (vx*vx + vy*vy + vz*vz)
     
     def get_momentum(self):
         """
@@ -126,11 +245,18 @@ class Body:
         np.ndarray, shape (3,)
             Angular momentum vector in internal units (AU^2/yr * M_sun)
         """
-        if origin is None:
-            r = self.pos
-        else:
-            r = self.pos - np.array(origin)
-        return self.mass * np.cross(r, self.vel)
+        x, y, z = self.pos
+        if origin is not None:
+            ox, oy, oz = origin
+            x -= ox
+            y -= oy
+            z -= oz
+        vx, vy, vz = self.vel
+        m = self.mass
+        # r x v, written out for 3-vectors
+        return np.array([m * (y*vz - z*vy),
+                         m * (z*vx - x*vz),
+                         m * (x*vy - y*vx)])
     
     def distance_to(self, other):
         """
@@ -146,12 +272,19 @@ class Body:
         float
             Distance in AU
         """
-        return np.linalg.norm(self.pos - other.pos)
+        x, y, z = self.pos
+        ox, oy, oz = other.pos
+        dx = x - ox
+        dy = y - oy
+        dz = z - oz
+        return math.sqrt(dx*dx + dy*dy + dz*dz)
     
     def copy(self):
         """
         Create a deep copy of this body.
         
+        The copy is detached: it owns its state and is not part of any system.
+        
         Returns
         -------
         Body
@@ -166,6 +299,13 @@ class Body:
             color=self.color.copy()
         )
         new_body.acc = self.acc.copy()
-        new_body.trail = [p.copy() for p in self.trail]
+        trail = self.trail
+        n = len(trail)
+        if n:
+            new_body._trail = np.zeros((2 * TRAIL_MAX_POINTS, 3), dtype=np.float32)
+            new_body._trail[:n] = trail
+            new_body._trail[TRAIL_MAX_POINTS:TRAIL_MAX_POINTS + n] = trail
+            new_body._trail_len = n
+            new_body._trail_head = n % TRAIL_MAX_POINTS
         return new_body
 
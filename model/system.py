@@ -7,22 +7,28 @@ This module handles the initialization of the solar system from configuration
 files and provides utilities for managing collections of bodies.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import json
+import math
 import numpy as np
 from .body import Body
-from physics.elements import elements_to_state
-from constants import G
+from physics.elements import elements_to_state_batch
+from constants import G, TRAIL_MAX_POINTS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-__all__ = ["SolarSystem", "load_solar_system"]
+__all__ = ["SolarSystem", "BodyArray", "load_solar_system"]
 
 class SolarSystem:
     """
     Container for all bodies in the solar system simulation.
     
+    Body state is stored structure-of-arrays: the system owns contiguous
+    ``dtype`` arrays and each Body's ``pos``/``vel``/``acc``/``mass``/``radius``
+    are views onto its row, so the physics engine can work on whole arrays.
+    
     Attributes
     ----------
     bodies : list of Body
@@ -31,32 +37,153 @@ class SolarSystem:
         Reference to the central star
     planets : list of Body
         References to planetary bodies (excluding the Sun)
+    names : list of str
+        Name of every body, in ``bodies`` order
+    bodies_version : int
+        Incremented whenever a body is added, so per-body caches (e.g. the
+        renderers' artists) can tell when to rebuild
+    pos, vel, acc : np.ndarray, shape (N, 3)
+        Packed position, velocity and acceleration of every body
+    mass, radius : np.ndarray, shape (N,)
+        Packed masses and physical radii
+    Gm : np.ndarray, shape (N,)
+        G * mass for every body, kept in step with ``mass`` for the kernels
+    pair_Gmm : np.ndarray, shape (N*(N-1)/2,)
+        G * m_i * m_j for every pair i < j, in scipy's pdist order
+    scratch : np.ndarray, shape (N, 3)
+        Work buffer the integrator reuses for its kick/drift products
+    dtype : np.dtype
+        Precision of the packed state and mass arrays
     """
     
-    def __init__(self):
+    def __init__(self, dtype=np.float64):
+        """
+        Parameters
+        ----------
+        dtype : np.float64 or np.float32
+            Storage precision. float32 halves the memory traffic of every
+            physics pass and is meant for visualization-only runs; energy
+            diagnostics are then only good to ~1e-7. Trails are float32
+            either way.
+        """
+        self.dtype = np.dtype(dtype)
         self.bodies = []
         self.sun = None
         self.planets = []
+        self.names = []
+        self.bodies_version = 0
+        self._name_index = {}       # lower-cased name -> first body with it
+        
+        # Packed SoA storage (rows [0, _n) are live)
+        self._n = 0
+        self._pos = np.zeros((0, 3), dtype=self.dtype)
+        self._vel = np.zeros((0, 3), dtype=self.dtype)
+        self._acc = np.zeros((0, 3), dtype=self.dtype)
+        self._scratch = np.zeros((0, 3), dtype=self.dtype)
+        self._mass = np.zeros(0, dtype=self.dtype)
+        self._radius = np.zeros(0)
+        self._Gm = np.zeros(0, dtype=self.dtype)
+        self._pair_Gmm = None       # built on first use, dropped when masses change
+        
+        # Trail ring buffer: _trail[body, slot] with one shared write head;
+        # _trail_len[body] counts the valid samples ending just before the head.
+        # Every sample is also written to slot + TRAIL_MAX_POINTS, so any
+        # window of the ring is one contiguous slice (see get_trail). Samples
+        # are only drawn, so they are kept in float32.
+        self._trail = np.zeros((0, 2 * TRAIL_MAX_POINTS, 3), dtype=np.float32)
+        self._trail_len = np.zeros(0, dtype=np.intp)
+        self._trail_head = 0
+        self._trail_calls = 0
+    
+    def _alloc(self, n):
+        """
+        Preallocate packed storage for at least ``n`` bodies.
+        
+        Existing rows are preserved. Bodies always re-index into the current
+        arrays, so views taken before a reallocation should not be kept.
+        """
+        if n <= len(self._mass):
+            return
+        
+        def grow(old, shape, dtype=np.float64):
+            new = np.zeros(shape, dtype=dtype)
+            new[:self._n] = old[:self._n]
+            return new
+        
+        self._pos = grow(self._pos, (n, 3), self.dtype)
+        self._vel = grow(self._vel, (n, 3), self.dtype)
+        self._acc = grow(self._acc, (n, 3), self.dtype)
+        self._scratch = np.empty((n, 3), dtype=self.dtype)
+        self._mass = grow(self._mass, n, self.dtype)
+        self._radius = grow(self._radius, n)
+        self._Gm = grow(self._Gm, n, self.dtype)
+        self._trail = grow(self._trail, (n, 2 * TRAIL_MAX_POINTS, 3), np.float32)
+        self._trail_len = grow(self._trail_len, n).astype(np.intp)
+    
+    @property
+    def pos(self):
+        return self._pos[:self._n]
+    
+    @property
+    def vel(self):
+        return self._vel[:self._n]
+    
+    @property
+    def acc(self):
+        return self._acc[:self._n]
+    
+    @property
+    def scratch(self):
+        return self._scratch[:self._n]
+    
+    @property
+    def mass(self):
+        return self._mass[:self._n]
+    
+    @property
+    def radius(self):
+        return self._radius[:self._n]
+    
+    @property
+    def Gm(self):
+        return self._Gm[:self._n]
+    
+    @property
+    def pair_Gmm(self):
+        if self._pair_Gmm is None:
+            self._pair_Gmm = _pair_products(self.mass)
+        return self._pair_Gmm
+    
+    def _rebuild_mass_tables(self):
+        """Refresh the G * mass tables after masses change."""
+        np.multiply(G, self._mass[:self._n], out=self._Gm[:self._n])
+        self._pair_Gmm = None
     
     def add_body(self, body):
         """Add a body to the system."""
+        if self._n == len(self._mass):
+            self._alloc(max(1, 2 * self._n))
+        body._attach(self, self._n)
+        self._n += 1
+        self._rebuild_mass_tables()
+        
         self.bodies.append(body)
-        if body.name.lower() == "sun":
+        self.names.append(body.name)
+        self.bodies_version += 1
+        name_lower = body.name.lower()
+        self._name_index.setdefault(name_lower, body)
+        if name_lower == "sun":
             self.sun = body
         else:
             self.planets.append(body)
     
     def get_body_by_name(self, name):
         """Find a body by name (case-insensitive)."""
-        name_lower = name.lower()
-        for body in self.bodies:
-            if body.name.lower() == name_lower:
-                return body
-        return None
+        return self._name_index.get(name.lower())
     
     def get_total_mass(self):
         """Calculate total mass of all bodies."""
-        return sum(body.mass for body in self.bodies)
+        return float(self.mass.sum())
     
     def get_center_of_mass(self):
         """
@@ -67,38 +194,170 @@ class SolarSystem:
         tuple of (np.ndarray, np.ndarray)
             (COM position, COM velocity) in system units
         """
-        total_mass = self.get_total_mass()
+        mass = self.mass
+        total_mass = mass.sum()
         if total_mass == 0:
             return np.zeros(3), np.zeros(3)
         
-        com_pos = np.zeros(3)
-        com_vel = np.zeros(3)
+        # (N,) @ (N, 3): one gemv per vector instead of a per-body loop
+        com_pos = (mass @ self.pos) / total_mass
+        com_vel = (mass @ self.vel) / total_mass
         
-        for body in self.bodies:
-            com_pos += body.mass * body.pos
-            com_vel += body.mass * body.vel
-        
-        return com_pos / total_mass, com_vel / total_mass
+        return com_pos, com_vel
     
     def move_to_barycenter(self):
         """Move the entire system so center of mass is at origin."""
         com_pos, com_vel = self.get_center_of_mass()
         
-        for body in self.bodies:
-            body.pos -= com_pos
-            body.vel -= com_vel
+        self._pos[:self._n] -= com_pos
+        self._vel[:self._n] -= com_vel
+    
+    def max_distance(self):
+        """
+        Largest distance of any body from the origin, in AU (0.0 if empty).
+        
+        One row-wise dot product over the packed positions; the renderers
+        use it to size the overview.
+        """
+        pos = self.pos
+        if not len(pos):
+            return 0.0
+        return math.sqrt(float(np.einsum('ij,ij->i', pos, pos).max()))
     
     def clear_all_trails(self):
         """Clear orbital trails for all bodies."""
-        for body in self.bodies:
-            body.clear_trail()
+        self._trail_len[:] = 0
     
     def add_trail_points(self, decimation=1):
-        """Add current positions to trails for all bodies."""
-        for body in self.bodies:
-            body.add_trail_point(decimation)
+        """
+        Add current positions to trails for all bodies.
+        
+        All bodies are sampled with a single store into the ring buffer.
+        
+        Parameters
+        ----------
+        decimation : int
+            Only record every Nth call
+        """
+        calls = self._trail_calls
+        self._trail_calls += 1
+        if calls % decimation:
+            return
+        
+        n = self._n
+        head = self._trail_head
+        self._trail[:n, head, :] = self._pos[:n]
+        self._trail[:n, head + TRAIL_MAX_POINTS, :] = self._pos[:n]
+        self._trail_head = (head + 1) % TRAIL_MAX_POINTS
+        np.minimum(self._trail_len + 1, TRAIL_MAX_POINTS, out=self._trail_len)
+    
+    def add_trail_point(self, index):
+        """
+        Append the current position of body ``index`` to its trail only.
+        
+        The shared write head stays put, so the body's window is moved one
+        slot back (dropping its oldest sample once full) and the new sample
+        written just before the head, in both copies of the ring.
+        """
+        T = TRAIL_MAX_POINTS
+        ring = self._trail[index]
+        n = min(int(self._trail_len[index]) + 1, T)
+        end = self._trail_head + T
+        samples = np.empty((n, 3), dtype=np.float32)
+        samples[:n - 1] = ring[end - n + 1:end]
+        samples[n - 1] = self._pos[index]
+        slots = np.arange(end - n, end)
+        ring[slots] = samples
+        ring[(slots + T) % (2 * T)] = samples
+        self._trail_len[index] = n
+    
+    def get_trail(self, index):
+        """
+        Return the trail of body ``index`` as a (T, 3) float32 array, oldest first.
+        
+        This is always a view into the mirrored ring buffer (no copy), so it
+        is only valid until the next call to add_trail_points.
+        """
+        end = self._trail_head + TRAIL_MAX_POINTS
+        return self._trail[index, end - self._trail_len[index]:end]
 
-def load_solar_system(json_path):
+class BodyArray:
+    """
+    Packed structure-of-arrays state for an arbitrary list of bodies.
+    
+    A SolarSystem already stores its own bodies this way. BodyArray gives
+    the same ``pos``/``vel``/``acc``/``mass``/``Gm`` arrays for any other
+    list (detached copies, subsets) so the array-based physics paths can
+    run on it; results are copied back with ``sync_back``.
+    
+    Attributes
+    ----------
+    pos, vel, acc : np.ndarray, shape (N, 3)
+        C-contiguous state in ``dtype`` (float64 unless asked otherwise)
+    mass, Gm : np.ndarray, shape (N,)
+        Masses and G * mass
+    pair_Gmm : np.ndarray, shape (N*(N-1)/2,)
+        G * m_i * m_j for every pair i < j (built on first use)
+    scratch : np.ndarray, shape (N, 3)
+        Work buffer the integrator reuses for its kick/drift products
+    dtype : np.dtype
+        Precision of the packed arrays (float32 for visualization-only runs)
+    """
+    
+    def __init__(self, pos, vel, mass, acc=None, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.pos = np.array(pos, dtype=self.dtype, order='C').reshape(-1, 3)
+        self.vel = np.array(vel, dtype=self.dtype, order='C').reshape(-1, 3)
+        self.mass = np.array(mass, dtype=self.dtype).reshape(-1)
+        if acc is None:
+            self.acc = np.zeros_like(self.pos)
+        else:
+            self.acc = np.array(acc, dtype=self.dtype, order='C').reshape(-1, 3)
+        self.scratch = np.empty_like(self.pos)
+        self.Gm = (G * self.mass).astype(self.dtype)
+        self._pair_Gmm = None
+    
+    def __len__(self):
+        return len(self.mass)
+    
+    @property
+    def pair_Gmm(self):
+        if self._pair_Gmm is None:
+            self._pair_Gmm = _pair_products(self.mass)
+        return self._pair_Gmm
+    
+    @classmethod
+    def from_list(cls, bodies, dtype=np.float64):
+        """Gather the state of ``bodies`` into new packed ``dtype`` arrays."""
+        return cls(
+            pos=[b.pos for b in bodies],
+            vel=[b.vel for b in bodies],
+            mass=[b.mass for b in bodies],
+            acc=[b.acc for b in bodies],
+            dtype=dtype,
+        )
+    
+    def sync_back(self, bodies):
+        """Copy positions, velocities and accelerations back onto ``bodies``."""
+        for i, b in enumerate(bodies):
+            b.pos = self.pos[i]
+            b.vel = self.vel[i]
+            b.acc = self.acc[i]
+
+def _pair_products(mass):
+    """G * m_i * m_j for i < j, flattened row by row like scipy's pdist."""
+    i, j = np.triu_indices(len(mass), 1)
+    return G * mass[i] * mass[j]
+
+def _read_json(json_path):
+    """Parse a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(json_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+def load_solar_system(json_path, dtype=np.float64):
     """
     Load solar system configuration from JSON file.
     
@@ -106,16 +365,18 @@ def load_solar_system(json_path):
     ----------
     json_path : str
         Path to JSON configuration file
+    dtype : np.float64 or np.float32
+        Storage precision of the system's packed state (see SolarSystem)
         
     Returns
     -------
     SolarSystem
         Initialized solar system with all bodies
     """
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    data = _read_json(json_path)
     
-    system = SolarSystem()
+    system = SolarSystem(dtype=dtype)
+    system._alloc(1 + len(data["planets"]))
     
     # Create the Sun
     sun_data = data["sun"]
@@ -129,30 +390,35 @@ def load_solar_system(json_path):
     )
     system.add_body(sun)
     
-    # Create planets from orbital elements
-    for planet_data in data["planets"]:
-        # Extract orbital elements (angles assumed to be in radians)
-        a = planet_data["a"]          # semi-major axis (AU)
-        e = planet_data["e"]          # eccentricity
-        i = planet_data["i"]          # inclination (rad)
-        Omega = planet_data["Omega"]  # longitude of ascending node (rad)
-        omega = planet_data["omega"]  # argument of periapsis (rad)
-        M = planet_data["M"]          # mean anomaly (rad)
-        
-        # Standard gravitational parameter for Sun + planet
-        # (planet mass is negligible compared to Sun for orbital calculation)
-        mu = G * (sun.mass + planet_data["mass"])
-        
-        # Convert orbital elements to Cartesian state vectors
-        pos, vel = elements_to_state(a, e, i, Omega, omega, M, mu)
-        
-        # Create planet body
+    # Create planets from orbital elements (angles assumed to be in radians)
+    planets = data["planets"]
+    def column(key):
+        return np.array([p[key] for p in planets], dtype=float)
+    
+    planet_mass = column("mass")
+    
+    # Standard gravitational parameter for Sun + planet
+    # (planet mass is negligible compared to Sun for orbital calculation)
+    mu = G * (sun.mass + planet_mass)
+    
+    # Convert all orbital elements to Cartesian state vectors in one call
+    pos, vel = elements_to_state_batch(
+        column("a"),        # semi-major axis (AU)
+        column("e"),        # eccentricity
+        column("i"),        # inclination (rad)
+        column("Omega"),    # longitude of ascending node (rad)
+        column("omega"),    # argument of periapsis (rad)
+        column("M"),        # mean anomaly (rad)
+        mu
+    )
+    
+    for k, planet_data in enumerate(planets):
         planet = Body(
             name=planet_data["name"],
             mass=planet_data["mass"],
             radius=planet_data["radius"],
-            pos=pos,
-            vel=vel,
+            pos=pos[k],
+            vel=vel[k],
             color=planet_data["color"]
         )
         
@@ -163,16 +429,21 @@ def load_solar_system(json_path):
     
     return system
 
-def create_test_system():
+def create_test_system(dtype=np.float64):
     """
     Create a simple test system with Sun and Earth for debugging.
     
+    Parameters
+    ----------
+    dtype : np.float64 or np.float32
+        Storage precision of the system's packed state (see SolarSystem)
+        
     Returns
     -------
     SolarSystem
         Simple two-body system
     """
-    system = SolarSystem()
+    system = SolarSystem(dtype=dtype)
     
     # Sun at origin
     sun = Body(
@@ -4,9 +4,12 @@ physics package
 This folder contains all the "math brains" of our simulator:
  - elements.py     → convert orbital elements <-> state vectors
  - nbody.py        → Newtonian gravity + numerical integrator
+ - integrators.py  → higher-order symplectic steppers built on nbody
  - pn1.py          → relativistic corrections (1PN terms)
  - osculating.py   → calculate orbital elements from current state
  - diagnostics.py  → check conservation of energy, momentum, etc.
+ - potential.py    → gravitational potential sampled on a grid
+ - barnes_hut.py   → octree gravity for scenes with thousands of bodies
 
 We keep this separate from rendering so we can test the physics
 without any 3D graphics.
@@ -14,13 +17,19 @@ without any 3D graphics.
 
 from .elements import *       # orbital element conversions
 from .nbody import *          # Newtonian stepper
+from .integrators import *    # 4th-order Yoshida stepper
 from .pn1 import *            # GR correction terms
 from .osculating import *     # live orbital elements
 from .diagnostics import *    # checks and logging
+from .potential import *      # potential grid for the surface
+from .barnes_hut import *     # tree gravity for large N
 
 __all__ = []
 __all__ += elements.__all__
 __all__ += nbody.__all__
+__all__ += integrators.__all__
 __all__ += pn1.__all__
 __all__ += osculating.__all__
 __all__ += diagnostics.__all__
+__all__ += potential.__all__
+__all__ += barnes_hut.__all__
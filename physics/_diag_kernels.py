@@ -0,0 +1,76 @@
+"""
+_diag_kernels.py
+
+Numba-compiled aggregators behind physics/diagnostics.py.
+
+Like the integrator kernels in _kernels.py these take the packed SoA arrays
+of a SolarSystem. They only run every few hundred steps, so they are
+compiled eagerly and cached on disk to keep the JIT cost out of the run.
+"""
+
+import math
+import numpy as np
+from ._kernels import njit, state_signatures
+
+__all__ = ["total_energy_nb", "total_angular_momentum_nb"]
+
+# ---------------------------
+# Energy
+# ---------------------------
+@njit(state_signatures("f8({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[::1])"),
+      cache=True, fastmath=True)
+def total_energy_nb(pos, vel, mass, Gm):
+    """
+    Kinetic + pairwise potential energy in one pass over the bodies.
+
+    ``Gm`` is the system's G * mass table, so each pair costs one multiply
+    for G * m_i * m_j.
+    """
+    n = pos.shape[0]
+    e_kin = 0.0
+    e_pot = 0.0
+    for i in range(n):
+        vx = vel[i, 0]
+        vy = vel[i, 1]
+        vz = vel[i, 2]
+        e_kin += 0.5 * mass[i] * (vx*vx + vy*vy + vz*vz)
+
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        zi = pos[i, 2]
+        gmi = Gm[i]
+        for j in range(i + 1, n):
+            dx = pos[j, 0] - xi
+            dy = pos[j, 1] - yi
+            dz = pos[j, 2] - zi
+            dist2 = dx*dx + dy*dy + dz*dz
+            if dist2 > 0.0:
+                e_pot -= gmi * mass[j] / math.sqrt(dist2)
+    return e_kin + e_pot
+
+# ---------------------------
+# Angular momentum
+# ---------------------------
+@njit(state_signatures("f8[::1]({t}[:, ::1], {t}[:, ::1], {t}[::1])"),
+      cache=True, fastmath=True)
+def total_angular_momentum_nb(pos, vel, mass):
+    """Sum of m * (r x v) over all bodies."""
+    hx = 0.0
+    hy = 0.0
+    hz = 0.0
+    for i in range(pos.shape[0]):
+        x = pos[i, 0]
+        y = pos[i, 1]
+        z = pos[i, 2]
+        vx = vel[i, 0]
+        vy = vel[i, 1]
+        vz = vel[i, 2]
+        m = mass[i]
+        hx += m * (y*vz - z*vy)
+        hy += m * (z*vx - x*vz)
+        hz += m * (x*vy - y*vx)
+    out = np.empty(3)
+    out[0] = hx
+    out[1] = hy
+    out[2] = hz
+    return out
@@ -0,0 +1,296 @@
+"""
+_kernels.py
+
+Numba-compiled inner loops for the N-body engine.
+
+The kernels work directly on the packed SoA arrays owned by SolarSystem
+(pos/vel/acc as C-contiguous (N, 3) float64, Gm = G * mass as (N,) float64),
+so no per-body Python objects are touched inside the hot loops.
+
+Numba is optional. If it is not installed HAVE_NUMBA is False and nbody.py
+falls back to its pure Python/NumPy implementation.
+
+The thread count used by the parallel kernels can be set with the
+SOLARA_NUM_THREADS environment variable (defaults to Numba's choice).
+
+State arrays may be float64 or float32 (see SolarSystem / BodyArray
+``dtype``); every kernel is compiled for both, via state_signatures.
+Sums and the scalar arguments stay float64 either way.
+
+Kernels deliberately read no values from constants.py: G, the softening and
+1/c^2 arrive as arguments (Gm, eps2, inv_c2). Numba would freeze such
+globals into the on-disk cache, and that cache is only invalidated when
+this file changes.
+"""
+
+import os
+import math
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in decorator so this module still imports without Numba."""
+        def wrap(func):
+            return func
+        return wrap
+
+__all__ = [
+    "HAVE_NUMBA", "get_num_threads",
+    "compute_accel_nb", "compute_accel_nb_parallel",
+    "verlet_step_nb", "verlet_step_nb_parallel",
+    "advance_nb", "advance_nb_parallel",
+]
+
+if HAVE_NUMBA and os.environ.get("SOLARA_NUM_THREADS"):
+    numba.set_num_threads(int(os.environ["SOLARA_NUM_THREADS"]))
+
+def get_num_threads():
+    """Threads available to the parallel kernels (1 without Numba)."""
+    return numba.get_num_threads() if HAVE_NUMBA else 1
+
+def state_signatures(template):
+    """
+    Eager signatures of a kernel for float64 and float32 state.
+
+    ``template`` writes the state element type as ``{t}``; scalars that
+    should stay double precision are written as plain ``f8``.
+    """
+    return [template.format(t=t) for t in ("f8", "f4")]
+
+# ---------------------------
+# Simplified 1PN correction (Sun-only, see pn1.py)
+# ---------------------------
+@njit(cache=True, fastmath=True, inline="always")
+def _pn_accel(rx, ry, rz, vx, vy, vz, gm, eps2, inv_c2):
+    """
+    1PN correction for one body at (r, v) relative to the central body.
+
+    Same formula as pn1.compute_pn_accelerations:
+        a_PN = GM / (c^2 r^3) * [(4GM/r - v^2) r_vec + 4 (r_vec . v_vec) v_vec]
+    """
+    r2 = rx*rx + ry*ry + rz*rz + eps2
+    inv_r = 1.0 / math.sqrt(r2)
+    v2 = vx*vx + vy*vy + vz*vz
+    rv = rx*vx + ry*vy + rz*vz
+
+    factor = gm * inv_c2 * inv_r * inv_r * inv_r
+    cr = factor * (4.0 * gm * inv_r - v2)
+    cv = factor * 4.0 * rv
+    return cr * rx + cv * vx, cr * ry + cv * vy, cr * rz + cv * vz
+
+# ---------------------------
+# Pairwise accelerations (Newtonian + optional 1PN)
+# ---------------------------
+@njit(state_signatures("void({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def compute_accel_nb(pos, vel, Gm, acc, eps2, inv_c2):
+    """
+    Softened Newtonian accelerations for all bodies, written into ``acc``.
+
+    Visits each pair once (i < j) and applies the force to both bodies,
+    so there is a single sqrt per pair. Row i is complete once its own
+    j-loop ends, so the 1PN term from the central body (row 0) is added
+    there, while r_i is still in registers; pass inv_c2 = 1 / c^2 to
+    enable it or 0.0 for Newtonian gravity only.
+    """
+    n = pos.shape[0]
+    for i in range(n):
+        acc[i, 0] = 0.0
+        acc[i, 1] = 0.0
+        acc[i, 2] = 0.0
+
+    for i in range(n):
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        zi = pos[i, 2]
+        ax = 0.0
+        ay = 0.0
+        az = 0.0
+        for j in range(i + 1, n):
+            dx = pos[j, 0] - xi
+            dy = pos[j, 1] - yi
+            dz = pos[j, 2] - zi
+            dist2 = dx*dx + dy*dy + dz*dz + eps2
+            inv_r = 1.0 / math.sqrt(dist2)
+            inv_r3 = inv_r * inv_r * inv_r
+
+            si = Gm[j] * inv_r3
+            sj = Gm[i] * inv_r3
+            ax += si * dx
+            ay += si * dy
+            az += si * dz
+            acc[j, 0] -= sj * dx
+            acc[j, 1] -= sj * dy
+            acc[j, 2] -= sj * dz
+
+        if inv_c2 != 0.0 and i > 0:
+            px, py, pz = _pn_accel(xi - pos[0, 0], yi - pos[0, 1], zi - pos[0, 2],
+                                   vel[i, 0] - vel[0, 0], vel[i, 1] - vel[0, 1],
+                                   vel[i, 2] - vel[0, 2], Gm[0], eps2, inv_c2)
+            ax += px
+            ay += py
+            az += pz
+        acc[i, 0] += ax
+        acc[i, 1] += ay
+        acc[i, 2] += az
+
+@njit(state_signatures("void({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8, i8)"),
+      cache=True, fastmath=True, boundscheck=False, parallel=True)
+def compute_accel_nb_parallel(pos, vel, Gm, acc, eps2, inv_c2, nthreads):
+    """
+    Multithreaded variant of compute_accel_nb for larger body counts.
+
+    Keeps the i < j halving: rows are dealt round-robin to the threads
+    (which balances the triangular pair loop), and every thread applies
+    both halves of its pairs to a private (N, 3) accumulator, so no two
+    threads ever write the same memory. A second parallel pass sums the
+    accumulators per row, adds the 1PN term and stores each row once.
+
+    ``nthreads`` is passed in (see get_num_threads) rather than queried
+    here, which would keep the kernel out of the on-disk cache.
+    """
+    n = pos.shape[0]
+    nt = nthreads
+    local = np.zeros((nt, n, 3))
+    for t in prange(nt):
+        for i in range(t, n, nt):
+            xi = pos[i, 0]
+            yi = pos[i, 1]
+            zi = pos[i, 2]
+            ax = 0.0
+            ay = 0.0
+            az = 0.0
+            for j in range(i + 1, n):
+                dx = pos[j, 0] - xi
+                dy = pos[j, 1] - yi
+                dz = pos[j, 2] - zi
+                dist2 = dx*dx + dy*dy + dz*dz + eps2
+                inv_r = 1.0 / math.sqrt(dist2)
+                inv_r3 = inv_r * inv_r * inv_r
+
+                si = Gm[j] * inv_r3
+                sj = Gm[i] * inv_r3
+                ax += si * dx
+                ay += si * dy
+                az += si * dz
+                local[t, j, 0] -= sj * dx
+                local[t, j, 1] -= sj * dy
+                local[t, j, 2] -= sj * dz
+            local[t, i, 0] += ax
+            local[t, i, 1] += ay
+            local[t, i, 2] += az
+
+    for i in prange(n):
+        ax = 0.0
+        ay = 0.0
+        az = 0.0
+        for t in range(nt):
+            ax += local[t, i, 0]
+            ay += local[t, i, 1]
+            az += local[t, i, 2]
+
+        if inv_c2 != 0.0 and i > 0:
+            px, py, pz = _pn_accel(pos[i, 0] - pos[0, 0], pos[i, 1] - pos[0, 1],
+                                   pos[i, 2] - pos[0, 2],
+                                   vel[i, 0] - vel[0, 0], vel[i, 1] - vel[0, 1],
+                                   vel[i, 2] - vel[0, 2], Gm[0], eps2, inv_c2)
+            ax += px
+            ay += py
+            az += pz
+        acc[i, 0] = ax
+        acc[i, 1] = ay
+        acc[i, 2] = az
+
+# ---------------------------
+# Fused velocity-Verlet step
+# ---------------------------
+@njit(state_signatures("void({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8, f8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def verlet_step_nb(pos, vel, Gm, acc, dt, eps2, inv_c2):
+    """
+    One kick-drift-kick velocity-Verlet step, entirely in compiled code.
+
+    ``acc`` must hold the accelerations at the current positions on entry
+    and holds those at the new positions on return, exactly as the
+    per-body loop in nbody.step_system leaves it.
+
+    ``inv_c2`` is 1 / c^2 to include the 1PN correction in the same call,
+    or 0.0 for a purely Newtonian step.
+    """
+    n = pos.shape[0]
+    half_dt = 0.5 * dt
+    for i in range(n):
+        vx = vel[i, 0] + half_dt * acc[i, 0]
+        vy = vel[i, 1] + half_dt * acc[i, 1]
+        vz = vel[i, 2] + half_dt * acc[i, 2]
+        vel[i, 0] = vx
+        vel[i, 1] = vy
+        vel[i, 2] = vz
+        pos[i, 0] += dt * vx
+        pos[i, 1] += dt * vy
+        pos[i, 2] += dt * vz
+
+    compute_accel_nb(pos, vel, Gm, acc, eps2, inv_c2)
+
+    for i in range(n):
+        vel[i, 0] += half_dt * acc[i, 0]
+        vel[i, 1] += half_dt * acc[i, 1]
+        vel[i, 2] += half_dt * acc[i, 2]
+
+@njit(state_signatures("void({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8, f8, i8)"),
+      cache=True, fastmath=True, boundscheck=False, parallel=True)
+def verlet_step_nb_parallel(pos, vel, Gm, acc, dt, eps2, inv_c2, nthreads):
+    """Multithreaded variant of verlet_step_nb for larger body counts."""
+    n = pos.shape[0]
+    half_dt = 0.5 * dt
+    for i in prange(n):
+        vx = vel[i, 0] + half_dt * acc[i, 0]
+        vy = vel[i, 1] + half_dt * acc[i, 1]
+        vz = vel[i, 2] + half_dt * acc[i, 2]
+        vel[i, 0] = vx
+        vel[i, 1] = vy
+        vel[i, 2] = vz
+        pos[i, 0] += dt * vx
+        pos[i, 1] += dt * vy
+        pos[i, 2] += dt * vz
+
+    compute_accel_nb_parallel(pos, vel, Gm, acc, eps2, inv_c2, nthreads)
+
+    for i in prange(n):
+        vel[i, 0] += half_dt * acc[i, 0]
+        vel[i, 1] += half_dt * acc[i, 1]
+        vel[i, 2] += half_dt * acc[i, 2]
+
+# ---------------------------
+# Many steps in one call
+# ---------------------------
+@njit(state_signatures("void({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8, f8, i8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def advance_nb(pos, vel, Gm, acc, dt, eps2, inv_c2, nsteps):
+    """
+    ``nsteps`` consecutive verlet_step_nb steps without returning to Python.
+
+    The state stays in the same arrays (and in cache) from step to step,
+    and the interpreter is entered once instead of once per step.
+    """
+    for _ in range(nsteps):
+        verlet_step_nb(pos, vel, Gm, acc, dt, eps2, inv_c2)
+
+@njit(state_signatures("void({t}[:, ::1], {t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8, f8, i8, i8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def advance_nb_parallel(pos, vel, Gm, acc, dt, eps2, inv_c2, nsteps, nthreads):
+    """
+    Multithreaded variant of advance_nb for larger body counts.
+
+    The loop over steps is sequential by nature; the threads come from
+    the parallel regions inside verlet_step_nb_parallel.
+    """
+    for _ in range(nsteps):
+        verlet_step_nb_parallel(pos, vel, Gm, acc, dt, eps2, inv_c2, nthreads)
@@ -0,0 +1,29 @@
+"""
+_packed.py
+
+Lookup of packed (structure-of-arrays) body state.
+
+The fast paths in nbody.py, pn1.py, diagnostics.py and viz/surface.py all
+need the same thing: contiguous pos/vel/acc (N, 3), mass and Gm (N,) arrays
+for the bodies they were given. This module finds them without importing
+the model package, so it can be shared without import cycles.
+"""
+
+__all__ = []
+
+def _packed_system(bodies):
+    """
+    Return an object holding packed arrays for exactly ``bodies``.
+
+    That is the BodyArray itself, or the SolarSystem whose arrays hold the
+    given list. Returns None for ad-hoc lists (detached bodies, subsets,
+    duck-typed bodies), which then take the per-body Python path.
+    """
+    if hasattr(bodies, "Gm"):      # BodyArray / SolarSystem passed directly
+        return bodies
+    if not bodies:
+        return None
+    system = getattr(bodies[0], "_system", None)
+    if system is None or system.bodies is not bodies:
+        return None
+    return system
@@ -0,0 +1,26 @@
+"""
+_vec3.py
+
+Scalar helpers for single 3-vectors.
+
+np.cross, np.dot and np.linalg.norm cost a ufunc dispatch (and usually an
+allocation) each, which dwarfs the few multiplies involved for length-3
+inputs. The element conversions in elements.py and osculating.py work on
+one body at a time, so they use these plain-float versions instead.
+"""
+
+import math
+
+__all__ = []
+
+def _cross3(ax, ay, az, bx, by, bz):
+    """Components of a x b."""
+    return ay*bz - az*by, az*bx - ax*bz, ax*by - ay*bx
+
+def _dot3(ax, ay, az, bx, by, bz):
+    """a . b"""
+    return ax*bx + ay*by + az*bz
+
+def _norm3(x, y, z):
+    """|(x, y, z)|"""
+    return math.sqrt(x*x + y*y + z*z)
@@ -0,0 +1,338 @@
+"""
+barnes_hut.py
+
+Barnes-Hut tree gravity for scenes with many bodies.
+
+The direct kernels in _kernels.py cost O(N^2), which is nothing for the
+Solar System but dominates once asteroid or particle clouds are loaded.
+Here the bodies are sorted into an octree whose cells carry their total
+G * mass and centre of mass, and distant cells act as single point masses,
+giving O(N log N).
+
+The tree is walked once per leaf rather than once per body (Barnes 1990):
+every leaf collects one interaction list of far cells and near leaves,
+which is then applied to all bodies in the leaf with the same softened
+pair sum as the direct kernel.
+
+Like the other kernels these take G, the softening and the opening angle
+as arguments, and need Numba: without it nbody.py keeps the direct sum.
+"""
+
+import math
+import numpy as np
+from ._kernels import njit, state_signatures
+
+__all__ = ["bh_accel_nb"]
+
+# Cells stop splitting below this depth, so coincident bodies still end in a leaf
+_MAX_DEPTH = 32
+
+# ---------------------------
+# Octree construction
+# ---------------------------
+@njit(cache=True)
+def _grow(a, size):
+    """Copy ``a`` into a new array with ``size`` rows."""
+    shape = (size,) + a.shape[1:]
+    out = np.empty(shape, dtype=a.dtype)
+    out[:a.shape[0]] = a
+    return out
+
+@njit(cache=True, inline="always")
+def _is_leaf(child, node):
+    for c in range(8):
+        if child[node, c] >= 0:
+            return False
+    return True
+
+@njit(cache=True, boundscheck=False)
+def _build_octree(pos, leaf_size):
+    """
+    Top-down octree over ``pos``.
+
+    Returns (order, start, end, child, center, half, n_nodes). Every node
+    owns the contiguous slice order[start:end] of body indices, so a
+    node's bodies (and those of its whole subtree) are one range. Nodes
+    are numbered in creation order, parents before their children.
+    """
+    n = pos.shape[0]
+    order = np.arange(n)
+    scratch = np.empty(n, dtype=np.int64)
+    code = np.empty(n, dtype=np.int64)
+
+    cap = max(16, 2 * n)
+    start = np.empty(cap, dtype=np.int64)
+    end = np.empty(cap, dtype=np.int64)
+    depth = np.empty(cap, dtype=np.int64)
+    child = np.empty((cap, 8), dtype=np.int64)
+    center = np.empty((cap, 3))
+    half = np.empty(cap)
+
+    # Root: bounding cube of all bodies
+    lo = np.empty(3)
+    hi = np.empty(3)
+    for k in range(3):
+        lo[k] = pos[0, k]
+        hi[k] = pos[0, k]
+    for i in range(1, n):
+        for k in range(3):
+            lo[k] = min(lo[k], pos[i, k])
+            hi[k] = max(hi[k], pos[i, k])
+    h = 0.0
+    for k in range(3):
+        center[0, k] = 0.5 * (lo[k] + hi[k])
+        h = max(h, 0.5 * (hi[k] - lo[k]))
+    half[0] = h * (1.0 + 1e-9) + 1e-300
+    start[0] = 0
+    end[0] = n
+    depth[0] = 0
+    n_nodes = 1
+
+    node = 0
+    while node < n_nodes:
+        child[node, :] = -1
+        s = start[node]
+        e = end[node]
+        if e - s <= leaf_size or depth[node] >= _MAX_DEPTH:
+            node += 1
+            continue
+
+        # Counting sort of the node's range by octant
+        cx = center[node, 0]
+        cy = center[node, 1]
+        cz = center[node, 2]
+        counts = np.zeros(8, dtype=np.int64)
+        for p in range(s, e):
+            i = order[p]
+            c = 0
+            if pos[i, 0] >= cx:
+                c |= 1
+            if pos[i, 1] >= cy:
+                c |= 2
+            if pos[i, 2] >= cz:
+                c |= 4
+            code[p] = c
+            counts[c] += 1
+        offsets = np.empty(8, dtype=np.int64)
+        acc_count = s
+        for c in range(8):
+            offsets[c] = acc_count
+            acc_count += counts[c]
+        for p in range(s, e):
+            c = code[p]
+            scratch[offsets[c]] = order[p]
+            offsets[c] += 1
+        order[s:e] = scratch[s:e]
+
+        if n_nodes + 8 > cap:
+            cap *= 2
+            start = _grow(start, cap)
+            end = _grow(end, cap)
+            depth = _grow(depth, cap)
+            child = _grow(child, cap)
+            center = _grow(center, cap)
+            half = _grow(half, cap)
+
+        hh = 0.5 * half[node]
+        first = s
+        for c in range(8):
+            if counts[c] == 0:
+                continue
+            k = n_nodes
+            n_nodes += 1
+            start[k] = first
+            end[k] = first + counts[c]
+            depth[k] = depth[node] + 1
+            center[k, 0] = cx + (hh if c & 1 else -hh)
+            center[k, 1] = cy + (hh if c & 2 else -hh)
+            center[k, 2] = cz + (hh if c & 4 else -hh)
+            half[k] = hh
+            child[node, c] = k
+            first += counts[c]
+        node += 1
+
+    return order, start, end, child, center, half, n_nodes
+
+@njit(cache=True, boundscheck=False)
+def _cell_moments(pos, Gm, order, start, end, child, n_nodes):
+    """Total G * mass and centre of mass of every node, leaves first."""
+    gm = np.zeros(n_nodes)
+    com = np.zeros((n_nodes, 3))
+    for node in range(n_nodes - 1, -1, -1):
+        total = 0.0
+        mx = 0.0
+        my = 0.0
+        mz = 0.0
+        if _is_leaf(child, node):
+            for p in range(start[node], end[node]):
+                i = order[p]
+                g = Gm[i]
+                total += g
+                mx += g * pos[i, 0]
+                my += g * pos[i, 1]
+                mz += g * pos[i, 2]
+        else:
+            for c in range(8):
+                k = child[node, c]
+                if k >= 0:
+                    g = gm[k]
+                    total += g
+                    mx += g * com[k, 0]
+                    my += g * com[k, 1]
+                    mz += g * com[k, 2]
+        gm[node] = total
+        if total > 0.0:
+            com[node, 0] = mx / total
+            com[node, 1] = my / total
+            com[node, 2] = mz / total
+        else:
+            # Massless cell: any point will do, it contributes nothing
+            com[node, 0] = pos[order[start[node]], 0]
+            com[node, 1] = pos[order[start[node]], 1]
+            com[node, 2] = pos[order[start[node]], 2]
+    return gm, com
+
+# ---------------------------
+# Grouped tree walk
+# ---------------------------
+@njit(cache=True, fastmath=True, boundscheck=False, inline="always")
+def _direct_sum(pos, Gm, order, lo, hi, xi, yi, zi, eps2):
+    """
+    Softened pull on (xi, yi, zi) from the bodies order[lo:hi].
+
+    Callers pass ranges that never contain the body itself, so the loop
+    carries no self-interaction test.
+    """
+    ax = 0.0
+    ay = 0.0
+    az = 0.0
+    for pj in range(lo, hi):
+        j = order[pj]
+        dx = pos[j, 0] - xi
+        dy = pos[j, 1] - yi
+        dz = pos[j, 2] - zi
+        inv_r = 1.0 / math.sqrt(dx*dx + dy*dy + dz*dz + eps2)
+        s = Gm[j] * inv_r * inv_r * inv_r
+        ax += s * dx
+        ay += s * dy
+        az += s * dz
+    return ax, ay, az
+
+@njit(state_signatures("void({t}[:, ::1], {t}[::1], {t}[:, ::1], f8, f8, i8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def bh_accel_nb(pos, Gm, acc, eps2, theta, leaf_size):
+    """
+    Softened accelerations for all bodies from a Barnes-Hut octree.
+
+    A cell of width w is used as a point mass at its centre of mass when
+    w < theta * r, with r the distance from that centre to the nearest
+    point of the leaf's bounding box, so the test holds for every body in
+    the leaf. Cells containing the leaf itself are always opened. Bodies
+    are grouped leaf_size per leaf.
+    """
+    n = pos.shape[0]
+    if n == 0:
+        return
+    order, start, end, child, center, half, n_nodes = _build_octree(pos, leaf_size)
+    gm, com = _cell_moments(pos, Gm, order, start, end, child, n_nodes)
+
+    theta2 = theta * theta
+    stack = np.empty(8 * _MAX_DEPTH + 8, dtype=np.int64)
+    cells = np.empty(n_nodes, dtype=np.int64)
+    leaves = np.empty(n_nodes, dtype=np.int64)
+
+    for g in range(n_nodes):
+        if not _is_leaf(child, g):
+            continue
+        gs = start[g]
+        ge = end[g]
+
+        # Bounding box of the group
+        i0 = order[gs]
+        bx0 = pos[i0, 0]
+        by0 = pos[i0, 1]
+        bz0 = pos[i0, 2]
+        bx1 = bx0
+        by1 = by0
+        bz1 = bz0
+        for p in range(gs + 1, ge):
+            i = order[p]
+            bx0 = min(bx0, pos[i, 0])
+            by0 = min(by0, pos[i, 1])
+            bz0 = min(bz0, pos[i, 2])
+            bx1 = max(bx1, pos[i, 0])
+            by1 = max(by1, pos[i, 1])
+            bz1 = max(bz1, pos[i, 2])
+
+        # Build the interaction list of this group
+        n_cells = 0
+        n_leaves = 0
+        stack[0] = 0
+        top = 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            if gm[node] == 0.0:
+                continue
+            ancestor = start[node] <= gs and ge <= end[node]
+            if not ancestor:
+                cx = com[node, 0]
+                cy = com[node, 1]
+                cz = com[node, 2]
+                dx = max(bx0 - cx, 0.0, cx - bx1)
+                dy = max(by0 - cy, 0.0, cy - by1)
+                dz = max(bz0 - cz, 0.0, cz - bz1)
+                w = 2.0 * half[node]
+                if w * w < theta2 * (dx*dx + dy*dy + dz*dz):
+                    cells[n_cells] = node
+                    n_cells += 1
+                    continue
+            if _is_leaf(child, node):
+                if node != g:
+                    leaves[n_leaves] = node
+                    n_leaves += 1
+                continue
+            for c in range(8):
+                k = child[node, c]
+                if k >= 0:
+                    stack[top] = k
+                    top += 1
+
+        # Apply it to every body of the group
+        for p in range(gs, ge):
+            i = order[p]
+            xi = pos[i, 0]
+            yi = pos[i, 1]
+            zi = pos[i, 2]
+            ax = 0.0
+            ay = 0.0
+            az = 0.0
+            for q in range(n_cells):
+                node = cells[q]
+                dx = com[node, 0] - xi
+                dy = com[node, 1] - yi
+                dz = com[node, 2] - zi
+                inv_r = 1.0 / math.sqrt(dx*dx + dy*dy + dz*dz + eps2)
+                s = gm[node] * inv_r * inv_r * inv_r
+                ax += s * dx
+                ay += s * dy
+                az += s * dz
+            for q in range(n_leaves):
+                node = leaves[q]
+                bx, by, bz = _direct_sum(pos, Gm, order, start[node], end[node], xi, yi, zi, eps2)
+                ax += bx
+                ay += by
+                az += bz
+
+            # The group's own leaf, split around body i itself
+            bx, by, bz = _direct_sum(pos, Gm, order, gs, p, xi, yi, zi, eps2)
+            ax += bx
+            ay += by
+            az += bz
+            bx, by, bz = _direct_sum(pos, Gm, order, p + 1, ge, xi, yi, zi, eps2)
+            ax += bx
+            ay += by
+            az += bz
+            acc[i, 0] = ax
+            acc[i, 1] = ay
+            acc[i, 2] = az
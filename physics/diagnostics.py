@@ -10,14 +10,22 @@ We track:
 
 If the timestep (DT) or softening (EPS) is too large/small,
 these numbers will drift over time. Watching them helps you tune stability.
-"""
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+For bodies held in a SolarSystem the sums run in the compiled kernels from
+_diag_kernels.py when Numba is available.
+"""
 
 import numpy as np
 from constants import G
+from ._kernels import HAVE_NUMBA
+from ._diag_kernels import total_energy_nb, total_angular_momentum_nb
+from ._packed import _packed_system
+from ._vec3 import _norm3
+
+try:
+    from scipy.spatial.distance import pdist
+except ImportError:
+    pdist = None
 
 __all__ = ["total_energy", "total_angular_momentum", "diagnostics_report"]
 
@@ -30,29 +38,49 @@ def total_energy(bodies):
 
     Parameters
     ----------
-    bodies : list of Body
+    bodies : list of Body or BodyArray
 
     Returns
     -------
     E : float
         Total energy (internal units: AU^2 / yr^2 * M_sun)
     """
-    E_kin = 0.0
-    E_pot = 0.0
+    system = _packed_system(bodies)
+    if HAVE_NUMBA and system is not None:
+        return total_energy_nb(system.pos, system.vel, system.mass, system.Gm)
+    if system is not None:
+        return _total_energy_numpy(system.pos, system.vel, system.mass, system.pair_Gmm)
+    if not bodies:
+        return 0.0
+
+    # Gather the ad-hoc list once and use the array form
+    pos = np.stack([b.pos for b in bodies])
+    vel = np.stack([b.vel for b in bodies])
+    mass = np.array([b.mass for b in bodies], dtype=float)
+    return _total_energy_numpy(pos, vel, mass)
+
+def _total_energy_numpy(pos, vel, mass, pair_Gmm=None):
+    """
+    Array form of total_energy.
 
+    Pair distances come from scipy's pdist when it is installed; its
+    condensed (i < j) order matches ``pair_Gmm``, the cached
+    G * m_i * m_j table of a packed system.
+    """
     # Kinetic: 1/2 m v^2
-    for b in bodies:
-        v2 = np.dot(b.vel, b.vel)
-        E_kin += 0.5 * b.mass * v2
+    E_kin = 0.5 * float(mass @ np.einsum('ij,ij->i', vel, vel))
 
     # Potential: - G m_i m_j / r_ij (sum over pairs)
-    n = len(bodies)
-    for i in range(n):
-        for j in range(i+1, n):
-            rij = bodies[j].pos - bodies[i].pos
-            dist = np.linalg.norm(rij)
-            if dist > 0:
-                E_pot -= G * bodies[i].mass * bodies[j].mass / dist
+    if pdist is not None:
+        dist = pdist(pos)
+    else:
+        i, j = np.triu_indices(len(mass), 1)
+        dist = np.linalg.norm(pos[j] - pos[i], axis=1)
+    if pair_Gmm is None:
+        i, j = np.triu_indices(len(mass), 1)
+        pair_Gmm = G * mass[i] * mass[j]
+    ok = dist > 0
+    E_pot = -float(np.sum(pair_Gmm[ok] / dist[ok]))
 
     return E_kin + E_pot
 
@@ -65,17 +93,41 @@ def total_angular_momentum(bodies):
 
     Parameters
     ----------
-    bodies : list of Body
+    bodies : list of Body or BodyArray
 
     Returns
     -------
     H_vec : np.ndarray, shape (3,)
         Angular momentum vector (AU^2 / yr * M_sun)
     """
-    H_vec = np.zeros(3)
+    system = _packed_system(bodies)
+    if HAVE_NUMBA and system is not None:
+        return total_angular_momentum_nb(system.pos, system.vel, system.mass)
+    if system is not None:
+        return _angular_momentum_numpy(system.pos, system.vel, system.mass)
+
+    hx = hy = hz = 0.0
     for b in bodies:
-        H_vec += b.mass * np.cross(b.pos, b.vel)
-    return H_vec
+        x, y, z = b.pos
+        vx, vy, vz = b.vel
+        m = b.mass
+        hx += m * (y*vz - z*vy)
+        hy += m * (z*vx - x*vz)
+        hz += m * (x*vy - y*vx)
+    return np.array([hx, hy, hz])
+
+def _angular_momentum_numpy(pos, vel, mass):
+    """
+    Array form of total_angular_momentum for packed state.
+
+    The cross product is written out per component: each one is a single
+    mass-weighted dot product, with no (N, 3) np.cross result in between.
+    """
+    x, y, z = pos.T
+    vx, vy, vz = vel.T
+    return np.array([mass @ (y*vz - z*vy),
+                     mass @ (z*vx - x*vz),
+                     mass @ (x*vy - y*vx)])
 
 # ---------------------------
 # Reporting helper
@@ -102,7 +154,7 @@ def diagnostics_report(bodies, E0=None, H0=None):
         report["dE/E0"] = (E - E0) / E0
 
     if H0 is not None:
-        dH = np.linalg.norm(H - H0)
-        report["|dH|/|H0|"] = dH / np.linalg.norm(H0)
+        dH = _norm3(H[0] - H0[0], H[1] - H0[1], H[2] - H0[2])
+        report["|dH|/|H0|"] = dH / _norm3(*H0)
 
     return report
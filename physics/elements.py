@@ -18,16 +18,14 @@ Given these and the central mass, we can compute:
 And vice versa: from r and v we can derive elements again.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import math
 import numpy as np
 from constants import G
+from ._vec3 import _cross3, _dot3, _norm3
 
 __all__ = [
     "elements_to_state",
+    "elements_to_state_batch",
     "state_to_elements",
     "solve_kepler"
 ]
@@ -38,17 +36,45 @@ __all__ = [
 # Use Newton-Raphson iteration
 # ---------------------------
 def solve_kepler(M, e, tol=1e-10, max_iter=50):
-    """Solve Kepler's equation M = E - e*sin(E) for E."""
+    """
+    Solve Kepler's equation M = E - e*sin(E) for E.
+
+    M and e may be scalars or broadcastable arrays; all orbits are iterated
+    together and the loop stops once the largest correction is below tol.
+    Returns a float for scalar input, otherwise an array.
+
+    Orbits with e < 0.3 start from Meeus' E0 = atan2(sin M, cos M - e),
+    which leaves one or two Newton steps; scalar calls run on plain floats.
+    """
+    if isinstance(M, (int, float)) and isinstance(e, (int, float)):
+        return _solve_kepler_scalar(M, e, tol, max_iter)
+
     M = np.mod(M, 2*math.pi)  # wrap into [0, 2π)
-    if e < 0.8:
+    e = np.asarray(e, dtype=float)
+    E = np.where(e < 0.3, np.mod(np.arctan2(np.sin(M), np.cos(M) - e), 2*math.pi),
+                 np.where(e < 0.8, M, math.pi))
+
+    for _ in range(max_iter):
+        f = E - e*np.sin(E) - M
+        fprime = 1 - e*np.cos(E)
+        dE = -f/fprime
+        E = E + dE
+        if np.max(np.abs(dE)) < tol:
+            break
+    return float(E) if E.ndim == 0 else E
+
+def _solve_kepler_scalar(M, e, tol, max_iter):
+    """solve_kepler for one orbit, with math instead of NumPy ufuncs."""
+    M = M % (2*math.pi)
+    if e < 0.3:
+        E = math.atan2(math.sin(M), math.cos(M) - e) % (2*math.pi)
+    elif e < 0.8:
         E = M
     else:
         E = math.pi
 
     for _ in range(max_iter):
-        f = E - e*math.sin(E) - M
-        fprime = 1 - e*math.cos(E)
-        dE = -f/fprime
+        dE = -(E - e*math.sin(E) - M) / (1 - e*math.cos(E))
         E += dE
         if abs(dE) < tol:
             break
@@ -64,6 +90,9 @@ def elements_to_state(a, e, i, Omega, omega, M, mu=4*np.pi**2):
     """
     Convert orbital elements to Cartesian state vectors (r, v).
     
+    Arrays of elements are handed to elements_to_state_batch, which
+    returns (N, 3) arrays; scalar elements take the plain-float path below.
+    
     Parameters
     ----------
     a : float
@@ -86,39 +115,99 @@ def elements_to_state(a, e, i, Omega, omega, M, mu=4*np.pi**2):
     (r, v) : tuple of np.ndarray
         Position [x,y,z] in AU and velocity [vx,vy,vz] in AU/yr
     """
+    if any(np.ndim(x) for x in (a, e, i, Omega, omega, M, mu)):
+        return elements_to_state_batch(a, e, i, Omega, omega, M, mu)
 
     # --- Solve Kepler's equation for eccentric anomaly E ---
-    def kepler(E, M, e): return E - e*np.sin(E) - M
-    def kepler_prime(E, e): return 1 - e*np.cos(E)
+    if e < 0.3:
+        # Meeus' closed-form starter, then two Newton steps (error < 1e-11)
+        M = math.remainder(M, 2*math.pi)
+        E = math.atan2(math.sin(M), math.cos(M) - e)
+        n_iter = 2
+    else:
+        E = M
+        n_iter = 10
+    for _ in range(n_iter):  # Newton-Raphson iteration
+        E -= (E - e*math.sin(E) - M) / (1 - e*math.cos(E))
+
+    cosE, sinE = math.cos(E), math.sin(E)
+    sqrt1me2 = math.sqrt(1 - e*e)
+    n = math.sqrt(mu / (a*a*a))  # mean motion
+    denom = 1 - e*cosE
 
-    E = M
-    for _ in range(10):  # Newton-Raphson iteration
-        E -= kepler(E, M, e) / kepler_prime(E, e)
+    # --- Position and velocity in orbital plane (z = 0) ---
+    x_prime = a * (cosE - e)
+    y_prime = a * sqrt1me2 * sinE
+    vx_prime = -a * n * sinE / denom
+    vy_prime = a * n * sqrt1me2 * cosE / denom
 
-    # --- Position in orbital plane ---
-    x_prime = a * (np.cos(E) - e)
-    y_prime = a * np.sqrt(1 - e**2) * np.sin(E)
-    r_orb = np.array([x_prime, y_prime, 0.0])
+    # --- Rotate into 3D space (first two columns of R, inlined) ---
+    cosO, sinO = math.cos(Omega), math.sin(Omega)
+    cosi, sini = math.cos(i), math.sin(i)
+    cosw, sinw = math.cos(omega), math.sin(omega)
 
-    # --- Velocity in orbital plane ---
+    r00 = cosO*cosw - sinO*sinw*cosi
+    r10 = sinO*cosw + cosO*sinw*cosi
+    r20 = sinw*sini
+    r01 = -cosO*sinw - sinO*cosw*cosi
+    r11 = -sinO*sinw + cosO*cosw*cosi
+    r21 = cosw*sini
+
+    r = np.array([r00*x_prime + r01*y_prime,
+                  r10*x_prime + r11*y_prime,
+                  r20*x_prime + r21*y_prime])
+    v = np.array([r00*vx_prime + r01*vy_prime,
+                  r10*vx_prime + r11*vy_prime,
+                  r20*vx_prime + r21*vy_prime])
+
+    return r, v
+
+def elements_to_state_batch(a, e, i, Omega, omega, M, mu=4*np.pi**2):
+    """
+    Vectorised elements_to_state for many orbits at once.
+    
+    Every argument may be a scalar or an array of shape (N,); they are
+    broadcast together. Kepler's equation is solved by solve_kepler, one
+    Newton-Raphson iteration over the whole array that exits as soon as
+    every orbit has converged.
+    
+    Returns
+    -------
+    (r, v) : tuple of np.ndarray, shape (N, 3)
+        Positions in AU and velocities in AU/yr, one row per orbit
+        (shape (3,) when every argument is a scalar)
+    """
+    a, e, i, Omega, omega, M, mu = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (a, e, i, Omega, omega, M, mu)))
+
+    # --- Solve Kepler's equation for eccentric anomaly E ---
+    E = np.asarray(solve_kepler(M, e, tol=1e-12))
+
+    cosE, sinE = np.cos(E), np.sin(E)
+    sqrt1me2 = np.sqrt(1 - e**2)
     n = np.sqrt(mu / a**3)  # mean motion
-    vx_prime = -a * n * np.sin(E) / (1 - e*np.cos(E))
-    vy_prime = a * n * np.sqrt(1 - e**2) * np.cos(E) / (1 - e*np.cos(E))
-    v_orb = np.array([vx_prime, vy_prime, 0.0])
 
-    # --- Rotate into 3D space ---
+    # --- Position and velocity in orbital plane (z = 0) ---
+    x_prime = a * (cosE - e)
+    y_prime = a * sqrt1me2 * sinE
+    vx_prime = -a * n * sinE / (1 - e*cosE)
+    vy_prime = a * n * sqrt1me2 * cosE / (1 - e*cosE)
+
+    # --- Rotate into 3D space (first two columns of R only) ---
     cosO, sinO = np.cos(Omega), np.sin(Omega)
     cosi, sini = np.cos(i), np.sin(i)
     cosw, sinw = np.cos(omega), np.sin(omega)
 
-    R = np.array([
-        [cosO*cosw - sinO*sinw*cosi, -cosO*sinw - sinO*cosw*cosi, sinO*sini],
-        [sinO*cosw + cosO*sinw*cosi, -sinO*sinw + cosO*cosw*cosi, -cosO*sini],
-        [sinw*sini,                  cosw*sini,                   cosi]
-    ])
-
-    r = R @ r_orb
-    v = R @ v_orb
+    # Only the six entries that multiply a nonzero in-plane component;
+    # each output column is written straight into the result arrays
+    r = np.empty(M.shape + (3,))
+    v = np.empty(M.shape + (3,))
+    for k, (R0k, R1k) in enumerate((
+            (cosO*cosw - sinO*sinw*cosi, -cosO*sinw - sinO*cosw*cosi),
+            (sinO*cosw + cosO*sinw*cosi, -sinO*sinw + cosO*cosw*cosi),
+            (sinw*sini,                  cosw*sini))):
+        r[..., k] = R0k*x_prime + R1k*y_prime
+        v[..., k] = R0k*vx_prime + R1k*vy_prime
 
     return r, v
 
@@ -138,47 +227,52 @@ def state_to_elements(r, v, mu=G*(1.0+0.0)):
         (a, e, i, Ω, ω, M)
         All angles in radians.
     """
-    rmag = np.linalg.norm(r)
-    vmag = np.linalg.norm(v)
+    rx, ry, rz = (float(c) for c in r)
+    vx, vy, vz = (float(c) for c in v)
+    rmag = _norm3(rx, ry, rz)
+    v2 = _dot3(vx, vy, vz, vx, vy, vz)
 
     # Specific angular momentum
-    h = np.cross(r, v)
-    hmag = np.linalg.norm(h)
+    hx, hy, hz = _cross3(rx, ry, rz, vx, vy, vz)
+    hmag = _norm3(hx, hy, hz)
 
     # Inclination
-    i = math.acos(h[2] / hmag)
+    i = math.acos(hz / hmag)
 
-    # Node line
-    K = np.array([0, 0, 1])
-    N = np.cross(K, h)
-    Nmag = np.linalg.norm(N)
+    # Node line: K x h with K = z-hat
+    Nx, Ny = -hy, hx
+    Nmag = math.sqrt(Nx*Nx + Ny*Ny)
 
     # Eccentricity vector
-    e_vec = (1/mu) * ((vmag**2 - mu/rmag)*r - np.dot(r,v)*v)
-    e = np.linalg.norm(e_vec)
+    cr = (v2 - mu/rmag) / mu
+    cv = _dot3(rx, ry, rz, vx, vy, vz) / mu
+    ex = cr*rx - cv*vx
+    ey = cr*ry - cv*vy
+    ez = cr*rz - cv*vz
+    e = _norm3(ex, ey, ez)
 
     # Semi-major axis from vis-viva
-    a = 1 / (2/rmag - vmag**2/mu)
+    a = 1 / (2/rmag - v2/mu)
 
     # Longitude of ascending node
     if Nmag != 0:
-        Omega = math.atan2(N[1], N[0])
+        Omega = math.atan2(Ny, Nx)
     else:
         Omega = 0.0
 
     # Argument of periapsis
     if Nmag != 0 and e > 1e-10:
-        omega = math.atan2(np.dot(np.cross(N, e_vec), h)/hmag,
-                           np.dot(N, e_vec)/Nmag)
+        omega = math.atan2(_dot3(*_cross3(Nx, Ny, 0.0, ex, ey, ez), hx, hy, hz)/hmag,
+                           (Nx*ex + Ny*ey)/Nmag)
     else:
         omega = 0.0
 
     # True anomaly
     if e > 1e-10:
-        nu = math.atan2(np.dot(np.cross(e_vec, r), h)/hmag,
-                        np.dot(e_vec, r)/(e*rmag))
+        nu = math.atan2(_dot3(*_cross3(ex, ey, ez, rx, ry, rz), hx, hy, hz)/hmag,
+                        _dot3(ex, ey, ez, rx, ry, rz)/(e*rmag))
     else:
-        nu = math.atan2(r[1], r[0])
+        nu = math.atan2(ry, rx)
 
     # Eccentric anomaly from true anomaly
     E = 2*math.atan2(math.tan(nu/2), math.sqrt((1+e)/(1-e)))
@@ -0,0 +1,62 @@
+"""
+integrators.py
+
+Higher-order symplectic steppers built on nbody.step_system.
+
+Velocity-Verlet is second order, so its energy error grows as dt^2 and
+accuracy has to be bought with small steps. Yoshida's fourth-order scheme
+composes three Verlet steps of lengths w1*dt, w0*dt, w1*dt; the inner half
+kicks merge, leaving
+
+    kick   d0/2 dt   (d = w1, w0, w1)
+    drift  d0 dt
+    kick   (d0 + d1)/2 dt
+    ...
+
+i.e. the drift/kick coefficients c = [w1/2, (w0+w1)/2, (w0+w1)/2, w1/2],
+d = [w1, w0, w1] with the roles of positions and velocities swapped. It
+costs three force evaluations per step but allows roughly an order of
+magnitude larger dt for the same energy error.
+
+Because every substep is an ordinary step_system call, the compiled
+kernels, the Barnes-Hut path and the 1PN term all apply unchanged.
+"""
+
+from constants import DT, ENABLE_1PN_DEFAULT
+from .nbody import step_system
+
+__all__ = ["step_system_yoshida4", "INTEGRATORS", "get_integrator"]
+
+# Yoshida (1990) triple-jump weights
+_CBRT2 = 2.0 ** (1.0 / 3.0)
+_W1 = 1.0 / (2.0 - _CBRT2)
+_W0 = -_CBRT2 * _W1
+
+# ---------------------------
+# Fourth-order Yoshida step
+# ---------------------------
+def step_system_yoshida4(bodies, dt=DT, use_relativity=ENABLE_1PN_DEFAULT):
+    """
+    Advance the system by one timestep with Yoshida's 4th-order scheme.
+
+    Takes the same arguments as nbody.step_system and, like it, leaves
+    ``acc`` holding the accelerations at the new positions.
+    """
+    step_system(bodies, dt=_W1 * dt, use_relativity=use_relativity)
+    step_system(bodies, dt=_W0 * dt, use_relativity=use_relativity)
+    step_system(bodies, dt=_W1 * dt, use_relativity=use_relativity)
+
+# ---------------------------
+# Lookup by name
+# ---------------------------
+INTEGRATORS = {
+    "verlet": step_system,
+    "yoshida4": step_system_yoshida4,
+}
+
+def get_integrator(name):
+    """Return the step function registered as ``name`` in INTEGRATORS."""
+    try:
+        return INTEGRATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown integrator {name!r}; choose from {sorted(INTEGRATORS)}")
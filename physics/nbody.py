@@ -10,15 +10,42 @@ Implements Newtonian gravity and the main integrator.
 This file is the *engine* that advances the system forward in time.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import numpy as np
-from constants import G, DT, EPS_ACCEL, ENABLE_1PN_DEFAULT
+from constants import (G, DT, EPS_ACCEL, ENABLE_1PN_DEFAULT, PARALLEL_ACCEL_MIN_BODIES, C_AU_PER_YR,
+                       BH_THRESHOLD, BH_THETA, BH_LEAF_SIZE, NUMEXPR_MIN_BODIES)
 from .pn1 import compute_pn_accelerations   # will be used for relativity
+from ._packed import _packed_system
+from ._kernels import (HAVE_NUMBA, get_num_threads, compute_accel_nb, compute_accel_nb_parallel,
+                       verlet_step_nb, verlet_step_nb_parallel, advance_nb, advance_nb_parallel)
+from .barnes_hut import bh_accel_nb
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+__all__ = ["compute_accelerations", "step_system", "advance"]
 
-__all__ = ["compute_accelerations", "step_system"]
+# Derived constants, evaluated once at import. The compiled kernels take
+# them as arguments rather than reading module globals: Numba freezes
+# globals into the cached machine code, which would then go stale when
+# constants.py changes but _kernels.py does not.
+_EPS2 = EPS_ACCEL**2
+_INV_C2 = 1.0 / C_AU_PER_YR**2
+
+def _use_parallel(n):
+    """
+    True when the prange kernels should be used for ``n`` bodies.
+
+    They add per-thread accumulators and a reduction pass on top of the
+    serial pair loop, so they only pay off with enough bodies and more
+    than one thread to split them across.
+    """
+    return n >= PARALLEL_ACCEL_MIN_BODIES and get_num_threads() > 1
+
+def _use_tree(n):
+    """True when ``n`` bodies are enough for the Barnes-Hut octree (Numba only)."""
+    return HAVE_NUMBA and n >= BH_THRESHOLD
 
 # ---------------------------
 # Newtonian pairwise accelerations
@@ -29,7 +56,7 @@ def compute_accelerations(bodies):
 
     Parameters
     ----------
-    bodies : list of Body
+    bodies : list of Body or BodyArray
         Each Body must have attributes:
           - mass (float)
           - pos (np.array, shape (3,))
@@ -40,26 +67,81 @@ def compute_accelerations(bodies):
     Uses softened gravity with EPS_ACCEL to avoid singularities.
     Acceleration on body i: sum over j != i of
         a_i = G * m_j * (r_j - r_i) / (|r_j - r_i|^2 + eps^2)^(3/2)
+
+    When the bodies belong to a SolarSystem and Numba is available, the
+    packed arrays are handed to the compiled kernel in physics/_kernels.py
+    (the multithreaded one from PARALLEL_ACCEL_MIN_BODIES bodies upwards,
+    when Numba has more than one thread).
+    From BH_THRESHOLD bodies upwards the compiled Barnes-Hut octree in
+    physics/barnes_hut.py is used instead, trading exactness (opening angle
+    BH_THETA) for O(N log N).
+    Otherwise all pairs are evaluated at once with NumPy broadcasting.
     """
-    n = len(bodies)
+    system = _packed_system(bodies)
+    if system is not None:
+        n = len(system.pos)
+        if _use_tree(n):
+            bh_accel_nb(system.pos, system.Gm, system.acc, _EPS2, BH_THETA, BH_LEAF_SIZE)
+        elif not HAVE_NUMBA:
+            system.acc[:] = _accel_numpy(system.pos, system.Gm)
+        elif _use_parallel(n):
+            compute_accel_nb_parallel(system.pos, system.vel, system.Gm, system.acc, _EPS2, 0.0,
+                                      get_num_threads())
+        else:
+            compute_accel_nb(system.pos, system.vel, system.Gm, system.acc, _EPS2, 0.0)
+        return
 
-    # Reset accelerations to zero
-    for b in bodies:
-        b.acc[:] = 0.0
+    if not bodies:
+        return
+
+    # Gather the ad-hoc list once, solve on arrays, then write back
+    P = np.stack([b.pos for b in bodies])
+    Gm = G * np.array([b.mass for b in bodies], dtype=float)
+    if _use_tree(len(bodies)):
+        A = np.empty_like(P)
+        bh_accel_nb(P, Gm, A, _EPS2, BH_THETA, BH_LEAF_SIZE)
+    else:
+        A = _accel_numpy(P, Gm)
+    for i, b in enumerate(bodies):
+        b.acc[:] = A[i]
+
+def _accel_numpy(P, Gm):
+    """
+    Vectorised pairwise accelerations for positions P (N, 3) and G * mass Gm (N,).
 
-    # Pairwise calculation (O(N^2), fine for solar system scale)
-    for i in range(n):
-        for j in range(i + 1, n):
-            rij = bodies[j].pos - bodies[i].pos
-            dist2 = np.dot(rij, rij) + EPS_ACCEL**2
-            dist = np.sqrt(dist2)
-            inv_r3 = 1.0 / (dist2 * dist)
+    Builds the full (N, N, 3) separation tensor, so it is meant for the
+    small-N / no-Numba path. From NUMEXPR_MIN_BODIES bodies the work is
+    handed to _accel_numexpr when numexpr is installed.
+    """
+    if numexpr is not None and len(P) >= NUMEXPR_MIN_BODIES:
+        return _accel_numexpr(P, Gm)
+    R = P[None, :, :] - P[:, None, :]          # R[i, j] = r_j - r_i
+    d2 = np.einsum('ijk,ijk->ij', R, R) + _EPS2
+    inv_r3 = d2**-1.5
+    np.fill_diagonal(inv_r3, 0.0)              # no self-interaction
+    return np.einsum('ij,ijk->ik', Gm[None, :] * inv_r3, R)
+
+def _accel_numexpr(P, Gm):
+    """
+    _accel_numpy with the N x N pair expressions evaluated by numexpr.
 
-            ai = G * bodies[j].mass * rij * inv_r3
-            aj = -G * bodies[i].mass * rij * inv_r3
+    The softened Gm_j / r^3 factor is formed in one fused, multithreaded
+    pass straight from the coordinate columns, without the separation
+    tensor, and each acceleration component is one fused reduction.
+    """
+    cols = {'eps2': _EPS2, 'Gm_j': Gm[None, :]}
+    for k, c in enumerate('xyz'):
+        cols[c + 'i'] = P[:, k, None]
+        cols[c + 'j'] = P[None, :, k]
+    s = numexpr.evaluate('Gm_j * ((xj-xi)**2 + (yj-yi)**2 + (zj-zi)**2 + eps2) ** -1.5',
+                         local_dict=cols)
+    np.fill_diagonal(s, 0.0)                   # no self-interaction
+    cols['s'] = s
 
-            bodies[i].acc += ai
-            bodies[j].acc += aj
+    A = np.empty_like(P)
+    for k, c in enumerate('xyz'):
+        A[:, k] = numexpr.evaluate(f'sum(s * ({c}j - {c}i), axis=1)', local_dict=cols)
+    return A
 
 # ---------------------------
 # One full integrator step (velocity Verlet)
@@ -70,7 +152,7 @@ def step_system(bodies, dt=DT, use_relativity=ENABLE_1PN_DEFAULT):
 
     Parameters
     ----------
-    bodies : list of Body
+    bodies : list of Body or BodyArray
         Each Body has .pos, .vel, .acc, .mass
     dt : float
         Timestep (years)
@@ -80,15 +162,52 @@ def step_system(bodies, dt=DT, use_relativity=ENABLE_1PN_DEFAULT):
     Returns
     -------
     None (updates bodies in-place)
+
+    Steps of a packed SolarSystem or BodyArray run as one fused compiled
+    kernel when Numba is available, with the 1PN correction folded into the
+    same call, and as whole-array NumPy operations otherwise (including
+    systems large enough for the Barnes-Hut path, whose step is dominated
+    by the tree walk).
     """
+    system = _packed_system(bodies)
+    if HAVE_NUMBA and system is not None and not _use_tree(len(bodies)):
+        inv_c2 = _INV_C2 if use_relativity else 0.0
+        if _use_parallel(len(bodies)):
+            verlet_step_nb_parallel(system.pos, system.vel, system.Gm, system.acc,
+                                    dt, _EPS2, inv_c2, get_num_threads())
+        else:
+            verlet_step_nb(system.pos, system.vel, system.Gm, system.acc,
+                           dt, _EPS2, inv_c2)
+        return
+
+    if system is not None:
+        # Products go through the preallocated scratch buffer, so the
+        # kicks and the drift allocate no (N, 3) temporaries
+        pos, vel, acc, tmp = system.pos, system.vel, system.acc, system.scratch
+        half_dt = 0.5 * dt
+        np.multiply(acc, half_dt, out=tmp)
+        vel += tmp
+        np.multiply(vel, dt, out=tmp)
+        pos += tmp
+        compute_accelerations(system)
+        if use_relativity:
+            compute_pn_accelerations(system)
+        np.multiply(acc, half_dt, out=tmp)
+        vel += tmp
+        return
+
+    tmp = np.empty(3)
+    half_dt = 0.5 * dt
 
     # 1) v_half = v + 0.5 * a * dt
     for b in bodies:
-        b.vel += 0.5 * b.acc * dt
+        np.multiply(b.acc, half_dt, out=tmp)
+        b.vel += tmp
 
     # 2) r_new = r + v_half * dt
     for b in bodies:
-        b.pos += b.vel * dt
+        np.multiply(b.vel, dt, out=tmp)
+        b.pos += tmp
 
     # 3) Recompute accelerations at new positions
     compute_accelerations(bodies)
@@ -98,4 +217,42 @@ def step_system(bodies, dt=DT, use_relativity=ENABLE_1PN_DEFAULT):
 
     # 4) v_new = v_half + 0.5 * a_new * dt
     for b in bodies:
-        b.vel += 0.5 * b.acc * dt
+        np.multiply(b.acc, half_dt, out=tmp)
+        b.vel += tmp
+
+# ---------------------------
+# Many velocity-Verlet steps at once
+# ---------------------------
+def advance(bodies, dt=DT, nsteps=1, use_relativity=ENABLE_1PN_DEFAULT):
+    """
+    Advance the system by ``nsteps`` velocity-Verlet steps of ``dt``.
+
+    Gives the same result as calling step_system ``nsteps`` times. For a
+    packed SolarSystem or BodyArray with Numba available the whole loop
+    runs inside one compiled call (physics/_kernels.py), so the per-step
+    Python dispatch is paid once; other inputs, including systems on the
+    Barnes-Hut path, fall back to the step_system loop.
+
+    Parameters
+    ----------
+    bodies : list of Body or BodyArray
+    dt : float
+        Timestep (years)
+    nsteps : int
+        Number of steps to take
+    use_relativity : bool
+        If True, add post-Newtonian corrections
+    """
+    system = _packed_system(bodies)
+    if HAVE_NUMBA and system is not None and not _use_tree(len(bodies)):
+        inv_c2 = _INV_C2 if use_relativity else 0.0
+        if _use_parallel(len(bodies)):
+            advance_nb_parallel(system.pos, system.vel, system.Gm, system.acc,
+                                dt, _EPS2, inv_c2, nsteps, get_num_threads())
+        else:
+            advance_nb(system.pos, system.vel, system.Gm, system.acc,
+                       dt, _EPS2, inv_c2, nsteps)
+        return
+
+    for _ in range(nsteps):
+        step_system(bodies, dt=dt, use_relativity=use_relativity)
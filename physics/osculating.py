@@ -24,13 +24,10 @@ Notes / practical points:
   - mu should be provided (G*(M_central + m_body)) in the same internal units.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import math
 import numpy as np
 from constants import G
+from ._vec3 import _cross3, _dot3, _norm3
 
 __all__ = ["osculating_elements", "elements_from_state_dict"]
 
@@ -80,29 +77,32 @@ def osculating_elements(r, v, mu=G):
     - The function is robust to circular (e ~ 0) and equatorial (i ~ 0) edge cases.
     - For hyperbolic orbits (e >= 1), 'a' will be negative; period is None.
     """
-    r = np.asarray(r, dtype=float)
-    v = np.asarray(v, dtype=float)
+    rx, ry, rz = (float(c) for c in r)
+    vx, vy, vz = (float(c) for c in v)
 
-    rmag = np.linalg.norm(r)
-    vmag = np.linalg.norm(v)
+    rmag = _norm3(rx, ry, rz)
+    v2 = _dot3(vx, vy, vz, vx, vy, vz)
 
     # Specific angular momentum
-    h_vec = np.cross(r, v)
-    h = np.linalg.norm(h_vec)
+    hx, hy, hz = _cross3(rx, ry, rz, vx, vy, vz)
+    h = _norm3(hx, hy, hz)
 
-    # Node vector (points toward ascending node)
-    K = np.array([0.0, 0.0, 1.0])
-    N_vec = np.cross(K, h_vec)
-    N = np.linalg.norm(N_vec)
+    # Node vector (points toward ascending node): K x h with K = z-hat
+    Nx, Ny = -hy, hx
+    N = math.sqrt(Nx*Nx + Ny*Ny)
 
     # Specific orbital energy (vis-viva form)
-    specific_energy = 0.5 * vmag**2 - mu / rmag
+    specific_energy = 0.5 * v2 - mu / rmag
 
     # Eccentricity vector (Laplace-Runge-Lenz style)
     # e_vec = (1/mu) * ( (v^2 - mu/r)*r - (r·v) v )
-    rv_dot = np.dot(r, v)
-    e_vec = ( (vmag**2 - mu/rmag) * r - rv_dot * v ) / mu
-    e = np.linalg.norm(e_vec)
+    rv_dot = _dot3(rx, ry, rz, vx, vy, vz)
+    cr = (v2 - mu/rmag) / mu
+    cv = rv_dot / mu
+    ex = cr * rx - cv * vx
+    ey = cr * ry - cv * vy
+    ez = cr * rz - cv * vz
+    e = _norm3(ex, ey, ez)
 
     # Semi-major axis from vis-viva (handle parabolic/hyperbolic cases)
     if abs(specific_energy) < _EPS:
@@ -112,13 +112,13 @@ def osculating_elements(r, v, mu=G):
 
     # Inclination
     if h > _SMALL:
-        i = math.acos(max(-1.0, min(1.0, h_vec[2] / h)))
+        i = math.acos(max(-1.0, min(1.0, hz / h)))
     else:
         i = 0.0
 
     # Longitude of ascending node Ω
     if N > _SMALL:
-        Omega = math.atan2(N_vec[1], N_vec[0])
+        Omega = math.atan2(Ny, Nx)
         Omega = _wrap_to_2pi(Omega)
     else:
         Omega = 0.0
@@ -126,16 +126,16 @@ def osculating_elements(r, v, mu=G):
     # Argument of periapsis ω
     if e > _SMALL and N > _SMALL:
         # Compute cos(ω) = (N · e_vec) / (N * e)
-        cos_omega = np.dot(N_vec, e_vec) / (N * e)
+        cos_omega = (Nx*ex + Ny*ey) / (N * e)
         cos_omega = max(-1.0, min(1.0, cos_omega))
-        sin_omega = np.dot(np.cross(N_vec, e_vec), h_vec) / (N * e * h)
+        sin_omega = _dot3(*_cross3(Nx, Ny, 0.0, ex, ey, ez), hx, hy, hz) / (N * e * h)
         omega = math.atan2(sin_omega, cos_omega)
         omega = _wrap_to_2pi(omega)
     elif e > _SMALL and N <= _SMALL:
         # Equatorial orbit: ω measured from x-axis in orbital plane
-        cos_omega = e_vec[0] / e
+        cos_omega = ex / e
         cos_omega = max(-1.0, min(1.0, cos_omega))
-        sin_omega = e_vec[1] / e
+        sin_omega = ey / e
         omega = math.atan2(sin_omega, cos_omega)
         omega = _wrap_to_2pi(omega)
     else:
@@ -143,23 +143,26 @@ def osculating_elements(r, v, mu=G):
 
     # True anomaly ν
     if e > _SMALL:
-        cos_nu = np.dot(e_vec, r) / (e * rmag)
+        cos_nu = _dot3(ex, ey, ez, rx, ry, rz) / (e * rmag)
         cos_nu = max(-1.0, min(1.0, cos_nu))
-        sin_nu = np.dot(np.cross(e_vec, r), h_vec) / (e * rmag * h) if h > _SMALL else 0.0
+        sin_nu = (_dot3(*_cross3(ex, ey, ez, rx, ry, rz), hx, hy, hz) / (e * rmag * h)
+                  if h > _SMALL else 0.0)
         nu = math.atan2(sin_nu, cos_nu)
         nu = _wrap_to_2pi(nu)
     else:
         # Circular orbit: true anomaly from position vector measured in orbital plane
         # Project r onto node/ref frame to get a meaningful angle.
         if N > _SMALL:
-            cos_nu = np.dot(N_vec / N, r) / rmag
+            nx, ny = Nx / N, Ny / N
+            cos_nu = (nx*rx + ny*ry) / rmag
             cos_nu = max(-1.0, min(1.0, cos_nu))
-            sin_nu = np.dot(np.cross(N_vec / N, r), h_vec) / (rmag * h) if h > _SMALL else 0.0
+            sin_nu = (_dot3(*_cross3(nx, ny, 0.0, rx, ry, rz), hx, hy, hz) / (rmag * h)
+                      if h > _SMALL else 0.0)
             nu = math.atan2(sin_nu, cos_nu)
             nu = _wrap_to_2pi(nu)
         else:
             # Equatorial & circular: fallback to angle in x-y plane
-            nu = math.atan2(r[1], r[0])
+            nu = math.atan2(ry, rx)
             nu = _wrap_to_2pi(nu)
 
     # Eccentric anomaly E and mean anomaly M (for elliptic orbits only)
@@ -190,7 +193,7 @@ def osculating_elements(r, v, mu=G):
         'nu': nu,
         'M': M,
         'specific_energy': specific_energy,
-        'h_vec': h_vec,
+        'h_vec': np.array([hx, hy, hz]),
         'h': h,
         'period': period
     }
@@ -16,12 +16,9 @@ In practice:
   - then call compute_pn_accelerations() to add the GR tweak
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import numpy as np
 from constants import G, C_AU_PER_YR, EPS_ACCEL
+from ._packed import _packed_system
 
 __all__ = ["compute_pn_accelerations"]
 
@@ -47,24 +44,46 @@ def compute_pn_accelerations(bodies):
     References:
       - Einstein–Infeld–Hoffmann equations (see Will, "Theory and Experiment in Gravitational Physics")
       - Brumberg, "Essential Relativistic Celestial Mechanics"
+
+    A SolarSystem or BodyArray is corrected with whole-array operations.
     """
+    system = _packed_system(bodies)
+    if system is not None:
+        _pn_numpy(system.pos, system.vel, system.Gm, system.acc)
+        return
+
     # Identify central body (assume Sun is bodies[0])
     sun = bodies[0]
-    M = sun.mass
+    GM = G * sun.mass
+    eps2 = EPS_ACCEL**2
 
     for b in bodies[1:]:  # skip the Sun itself
         r_vec = b.pos - sun.pos
         v_vec = b.vel - sun.vel
 
-        r2 = np.dot(r_vec, r_vec) + EPS_ACCEL**2
+        r2 = np.dot(r_vec, r_vec) + eps2
         r = np.sqrt(r2)
 
         v2 = np.dot(v_vec, v_vec)
         rv = np.dot(r_vec, v_vec)
 
         # Relativistic correction term
-        factor = G * M / (C_AU_PER_YR**2 * r**3)
-        correction = factor * ((4*G*M/r - v2) * r_vec + 4*rv * v_vec)
+        factor = GM / (C_AU_PER_YR**2 * r**3)
+        correction = factor * ((4*GM/r - v2) * r_vec + 4*rv * v_vec)
 
         # Add this tweak to the acceleration already computed
         b.acc += correction
+
+def _pn_numpy(pos, vel, Gm, acc):
+    """Array form of the Sun-only correction above, for packed state."""
+    GM = Gm[0]
+    r_vec = pos[1:] - pos[0]
+    v_vec = vel[1:] - vel[0]
+
+    r2 = np.einsum('ij,ij->i', r_vec, r_vec) + EPS_ACCEL**2
+    r = np.sqrt(r2)
+    v2 = np.einsum('ij,ij->i', v_vec, v_vec)
+    rv = np.einsum('ij,ij->i', r_vec, v_vec)
+
+    factor = GM / (C_AU_PER_YR**2 * r**3)
+    acc[1:] += (factor * (4*GM/r - v2))[:, None] * r_vec + (factor * 4*rv)[:, None] * v_vec
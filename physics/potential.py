@@ -0,0 +1,109 @@
+"""
+potential.py
+
+Gravitational potential sampled on a grid.
+
+The potential surface in viz/surface.py shows the "gravity wells" of the
+bodies as a mesh. Evaluating it is O(N_bodies x N_grid), so for packed
+systems the sum runs here as a multithreaded Numba kernel over the grid
+points instead of as one NumPy pass per body.
+
+The grid may be float64 or float32 (the surface only feeds the renderer),
+independently of the precision of the body state.
+"""
+
+import math
+import numpy as np
+from ._kernels import njit, prange, state_signatures
+
+__all__ = ["compute_potential_grid_nb", "compute_potential_axes_nb", "compute_potential_point_nb"]
+
+# Every grid precision against every body-state precision
+_GRID_SIGNATURES = [
+    sig
+    for g in ("f8", "f4")
+    for sig in state_signatures(
+        "void(%s[:, ::1], %s[:, ::1], f8, {t}[:, ::1], {t}[::1], f8, f8, %s[:, ::1])" % (g, g, g))
+]
+
+# The same for grids given by their 1-D axes
+_AXES_SIGNATURES = [
+    sig
+    for g in ("f8", "f4")
+    for sig in state_signatures(
+        "void(%s[::1], %s[::1], f8, {t}[:, ::1], {t}[::1], f8, f8, %s[:, ::1])" % (g, g, g))
+]
+
+# ---------------------------
+# Potential at a single point
+# ---------------------------
+@njit(state_signatures("f8(f8, f8, f8, {t}[:, ::1], {t}[::1], f8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def compute_potential_point_nb(x, y, z, pos, Gm, eps2):
+    """Softened potential U = -sum(G m / r) at the point (x, y, z)."""
+    phi = 0.0
+    for k in range(pos.shape[0]):
+        dx = x - pos[k, 0]
+        dy = y - pos[k, 1]
+        dz = z - pos[k, 2]
+        phi -= Gm[k] / math.sqrt(dx*dx + dy*dy + dz*dz + eps2)
+    return phi
+
+# ---------------------------
+# Potential on a grid
+# ---------------------------
+@njit(_GRID_SIGNATURES, cache=True, fastmath=True, boundscheck=False, parallel=True)
+def compute_potential_grid_nb(X, Z, y_plane, pos, Gm, eps2, floor, out):
+    """
+    Softened potential U = -sum(G m / r) at every (X, y_plane, Z) point.
+
+    Rows of the grid are split across threads; each point keeps its sum
+    in a local and writes ``out`` once.
+
+    Every term is negative, so once a point's partial sum reaches
+    ``floor`` the remaining bodies are skipped and ``floor`` is stored.
+    Pass -inf to always sum every body.
+    """
+    n = pos.shape[0]
+    for r in prange(X.shape[0]):
+        for c in range(X.shape[1]):
+            x = X[r, c]
+            z = Z[r, c]
+            phi = 0.0
+            for k in range(n):
+                dx = x - pos[k, 0]
+                dy = y_plane - pos[k, 1]
+                dz = z - pos[k, 2]
+                phi -= Gm[k] / math.sqrt(dx*dx + dy*dy + dz*dz + eps2)
+                if phi <= floor:
+                    phi = floor
+                    break
+            out[r, c] = phi
+
+@njit(_AXES_SIGNATURES, cache=True, fastmath=True, boundscheck=False, parallel=True)
+def compute_potential_axes_nb(x, z, y_plane, pos, Gm, eps2, floor, out):
+    """
+    compute_potential_grid_nb for the meshgrid of the axes ``x`` and ``z``.
+
+    ``out[r, c]`` is the potential at (x[c], y_plane, z[r]). The grid is
+    never read as 2-D arrays: every row first computes the part of r^2
+    it shares with the whole row, (y - y_k)^2 + (z_r - z_k)^2 + eps2,
+    once per body, leaving one subtraction per point and body.
+    """
+    n = pos.shape[0]
+    for r in prange(z.shape[0]):
+        row2 = np.empty(n)
+        for k in range(n):
+            dy = y_plane - pos[k, 1]
+            dz = z[r] - pos[k, 2]
+            row2[k] = dy*dy + dz*dz + eps2
+        for c in range(x.shape[0]):
+            xc = x[c]
+            phi = 0.0
+            for k in range(n):
+                dx = xc - pos[k, 0]
+                phi -= Gm[k] / math.sqrt(dx*dx + row2[k])
+                if phi <= floor:
+                    phi = floor
+                    break
+            out[r, c] = phi
@@ -0,0 +1,41 @@
+"""
+warm_numba_cache.py
+
+Populate Numba's on-disk cache for the physics and viz kernels.
+
+Every kernel in physics/_kernels.py, physics/_diag_kernels.py,
+physics/potential.py, physics/barnes_hut.py and viz/_hit_kernel.py is
+declared with an explicit signature and cache=True, so importing them
+once compiles them and writes the cache files next to the modules. Run
+this after installing or editing those modules so the first
+`python main.py` starts without the JIT delay.
+
+Usage:
+    python scripts/warm_numba_cache.py
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    start = time.time()
+    from physics import _kernels, _diag_kernels, potential, barnes_hut
+    from viz import _hit_kernel
+
+    if not _kernels.HAVE_NUMBA:
+        print("Numba is not installed; nothing to compile.")
+        return 1
+
+    for module in (_kernels, _diag_kernels, potential, barnes_hut, _hit_kernel):
+        for name in module.__all__:
+            kernel = getattr(module, name)
+            if hasattr(kernel, "signatures"):
+                print(f"  {module.__name__}.{name}: {len(kernel.signatures)} signature(s)")
+
+    print(f"Numba kernels ready in {time.time() - start:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,8 +7,8 @@ Simple test script to verify the simulation works correctly.
 
 import numpy as np
 import matplotlib.pyplot as plt
-from model.system import load_solar_system, create_test_system
-from physics.nbody import step_system
+from model.system import load_solar_system, create_test_system, BodyArray
+from physics.nbody import step_system, advance
 from physics.diagnostics import total_energy, total_angular_momentum, diagnostics_report
 from physics.osculating import osculating_elements
 from constants import G
@@ -38,6 +38,33 @@ def test_energy_conservation():
         print("✗ Energy conservation test FAILED")
         return False
 
+def test_yoshida_integrator():
+    """Test that the 4th-order stepper beats velocity-Verlet at a large dt."""
+    print("\nTesting Yoshida integrator...")
+    
+    from physics.integrators import step_system_yoshida4
+    from physics.nbody import compute_accelerations
+    
+    errors = []
+    for step in (step_system, step_system_yoshida4):
+        system = create_test_system()
+        compute_accelerations(system.bodies)
+        E0 = total_energy(system.bodies)
+        max_error = 0.0
+        for i in range(100):
+            step(system.bodies, dt=0.01, use_relativity=False)
+            max_error = max(max_error, abs(total_energy(system.bodies) - E0) / abs(E0))
+        errors.append(max_error)
+    
+    print(f"Max relative energy error at dt=0.01: Verlet {errors[0]:.2e}, Yoshida {errors[1]:.2e}")
+    
+    if errors[1] < 1e-8 and errors[1] < errors[0] / 100:
+        print("✓ Yoshida integrator test PASSED")
+        return True
+    else:
+        print("✗ Yoshida integrator test FAILED")
+        return False
+
 def test_orbital_elements():
     """Test orbital element calculations."""
     print("\nTesting orbital elements...")
@@ -104,6 +131,117 @@ def test_full_system():
         print(f"✗ Full system test FAILED: {e}")
         return False
 
+def test_packed_state():
+    """Test that packed (SoA) and per-body integration paths agree."""
+    print("\nTesting packed body state...")
+    
+    system = load_solar_system("data/solar_params.json")
+    detached = [body.copy() for body in system.bodies]
+    packed = BodyArray.from_list(detached)
+    batched = BodyArray.from_list(detached)
+    single = BodyArray.from_list(detached, dtype=np.float32)
+    
+    for i in range(200):
+        step_system(system.bodies, dt=0.001)
+        step_system(detached, dt=0.001)
+        step_system(packed, dt=0.001)
+    advance(batched, dt=0.001, nsteps=200)
+    advance(single, dt=0.001, nsteps=200)
+    
+    loop_pos = np.array([body.pos for body in detached])
+    err_system = np.abs(system.pos - loop_pos).max()
+    err_array = np.abs(packed.pos - loop_pos).max()
+    err_batched = np.abs(batched.pos - loop_pos).max()
+    err_single = np.abs(single.pos - loop_pos).max()
+    E_diff = abs(total_energy(packed) - total_energy(detached))
+    
+    print(f"Max position difference (system): {err_system:.2e} AU")
+    print(f"Max position difference (BodyArray): {err_array:.2e} AU")
+    print(f"Max position difference (advance): {err_batched:.2e} AU")
+    print(f"Max position difference (float32): {err_single:.2e} AU")
+    
+    if (err_system < 1e-10 and err_array < 1e-10 and err_batched < 1e-10
+            and err_single < 1e-4 and E_diff < 1e-12):
+        print("✓ Packed state test PASSED")
+        return True
+    else:
+        print("✗ Packed state test FAILED")
+        return False
+
+def test_body_trails():
+    """Test that Body.add_trail_point samples only that body, also in a system."""
+    print("\nTesting per-body trails...")
+    
+    from constants import TRAIL_MAX_POINTS
+    
+    system = load_solar_system("data/solar_params.json")
+    earth = system.get_body_by_name("Earth")
+    expected = {body.name: [] for body in system.bodies}
+    
+    # A per-body loop, then a system-wide sample, then one body only;
+    # enough rounds to wrap the ring
+    for i in range(TRAIL_MAX_POINTS + 20):
+        step_system(system.bodies, dt=0.001)
+        if i % 3 == 0:
+            system.add_trail_points()
+            for body in system.bodies:
+                expected[body.name].append(body.pos.copy())
+        elif i % 3 == 1:
+            for body in system.bodies:
+                body.add_trail_point()
+                expected[body.name].append(body.pos.copy())
+        else:
+            earth.add_trail_point()
+            expected[earth.name].append(earth.pos.copy())
+    
+    err = 0.0
+    lengths_ok = True
+    for body in system.bodies:
+        want = np.array(expected[body.name][-TRAIL_MAX_POINTS:], dtype=np.float32)
+        lengths_ok = lengths_ok and len(body.trail) == len(want)
+        if len(body.trail) == len(want):
+            err = max(err, np.abs(body.trail - want).max())
+    print(f"Earth trail length: {len(earth.trail)}, max sample error: {err:.2e} AU")
+    
+    if lengths_ok and err == 0.0:
+        print("✓ Per-body trail test PASSED")
+        return True
+    else:
+        print("✗ Per-body trail test FAILED")
+        return False
+
+def test_barnes_hut():
+    """Test that the Barnes-Hut octree agrees with the direct pair sum."""
+    print("\nTesting Barnes-Hut accelerations...")
+    
+    from physics._kernels import HAVE_NUMBA
+    from physics.nbody import _accel_numpy, _EPS2
+    from physics.barnes_hut import bh_accel_nb
+    
+    if not HAVE_NUMBA:
+        print("✓ Barnes-Hut test skipped (Numba not installed)")
+        return True
+    
+    rng = np.random.default_rng(42)
+    pos = rng.normal(scale=5.0, size=(1000, 3))
+    mass = rng.uniform(1e-9, 1e-6, size=1000)
+    pos[0] = 0.0
+    mass[0] = 1.0
+    
+    direct = _accel_numpy(pos, G * mass)
+    tree = np.empty_like(pos)
+    bh_accel_nb(pos, G * mass, tree, _EPS2, 0.5, 8)
+    
+    rel_err = np.linalg.norm(tree - direct, axis=1) / np.linalg.norm(direct, axis=1)
+    print(f"Relative error: median {np.median(rel_err):.2e}, max {rel_err.max():.2e}")
+    
+    if np.median(rel_err) < 1e-4 and rel_err.max() < 1e-2:
+        print("✓ Barnes-Hut test PASSED")
+        return True
+    else:
+        print("✗ Barnes-Hut test FAILED")
+        return False
+
 def test_visualization_components():
     """Test that visualization components can be imported and initialized."""
     print("\nTesting visualization components...")
@@ -136,8 +274,12 @@ def main():
     
     tests = [
         test_energy_conservation,
+        test_yoshida_integrator,
         test_orbital_elements,
         test_full_system,
+        test_packed_state,
+        test_body_trails,
+        test_barnes_hut,
         test_visualization_components
     ]
     
@@ -6,19 +6,17 @@ This folder contains all the visualization and user interface components:
  - ui.py       → Clicks, info panels
  - camera.py   → Camera modes (general vs focus)
  - scene.py    → Rendering setup
+ - renderer_gl.py → optional pyqtgraph/OpenGL renderer (loaded by Scene on
+                    request, so it is not imported here)
 
 We keep this separate from physics so we can easily swap different
 visualization backends or run headless simulations.
 """
 
-from .surface import *
-from .ui import *
-from .camera import *
-from .scene import *
-
-__all__ = []
-__all__ += surface.__all__
-__all__ += ui.__all__
-__all__ += camera.__all__
-__all__ += scene.__all__
+from . import surface, ui, camera, scene
+from .surface import PotentialSurface, compute_potential_grid, compute_potential_axes
+from .ui import UIManager, InfoPanel, ControlPanel
+from .camera import Camera, CameraMode
+from .scene import Scene, MatplotlibRenderer
 
+__all__ = surface.__all__ + ui.__all__ + camera.__all__ + scene.__all__
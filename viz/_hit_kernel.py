@@ -0,0 +1,48 @@
+"""
+_hit_kernel.py
+
+Numba-compiled click hit-testing.
+
+UIManager.handle_mouse_click needs the body nearest to the click among
+those whose on-screen selection radius contains it. With NumPy that is a
+projection plus several (N,) temporaries; nearest_body_nb does projection,
+perspective divide, radius test and the running minimum in one pass.
+
+Like the physics kernels this is compiled eagerly for float64 and float32
+positions and falls back to the NumPy code when Numba is missing.
+"""
+
+from physics._kernels import njit, state_signatures
+
+__all__ = ["nearest_body_nb"]
+
+@njit(state_signatures("i8({t}[:, ::1], f8[:, ::1], f8, f8, f8[::1], f8, f8)"),
+      cache=True, fastmath=True, boundscheck=False)
+def nearest_body_nb(positions, m, x, y, radii, scale, min_radius):
+    """
+    Index of the body closest to screen point (x, y), or -1 if none is hit.
+
+    ``m`` is Camera.compose_world_to_screen's matrix. Body i is hit when
+    it is in front of the camera and within max(min_radius, radii[i] *
+    scale) pixels of the click; of those the nearest wins, the first on
+    ties.
+    """
+    best = -1
+    best_d2 = 0.0
+    for i in range(positions.shape[0]):
+        px = positions[i, 0]
+        py = positions[i, 1]
+        pz = positions[i, 2]
+        w = m[3, 0] * px + m[3, 1] * py + m[3, 2] * pz + m[3, 3]
+        if w <= 0.0:
+            continue
+        dx = (m[0, 0] * px + m[0, 1] * py + m[0, 2] * pz + m[0, 3]) / w - x
+        dy = (m[1, 0] * px + m[1, 1] * py + m[1, 2] * pz + m[1, 3]) / w - y
+        d2 = dx*dx + dy*dy
+        r = radii[i] * scale
+        if r < min_radius:
+            r = min_radius
+        if d2 < r*r and (best < 0 or d2 < best_d2):
+            best = i
+            best_d2 = d2
+    return best
@@ -63,11 +63,25 @@ class Camera:
         # Animation
         self.smooth_factor = 0.1  # for smooth camera transitions
         
+        # Cached matrices; the view is rebuilt after any move, the
+        # projection whenever aspect/fov/near/far differ from _proj_key
+        self._view = None
+        self._inv_view = None
+        self._view_dirty = True
+        self._proj = None
+        self._inv_proj = None
+        self._proj_key = None
+        self._vp = np.empty((4, 4))     # proj @ view, see get_view_projection
+        self._vp_stale = True
+        self._w2s = np.empty((4, 4))    # viewport @ proj @ view, see compose_world_to_screen
+        self._w2s_key = None
+        
         self._update_position()
     
     def set_mode(self, mode):
         """Change camera mode."""
         self.mode = mode
+        self._view_dirty = True
         if mode == CameraMode.OVERVIEW:
             self.distance = 20.0
             self.target = np.array([0.0, 0.0, 0.0])
@@ -87,13 +101,15 @@ class Camera:
         self.focus_body = body
         self.mode = CameraMode.FOCUS
         self.target = body.pos.copy()
+        self._view_dirty = True
         
         # Adjust distance based on body size and orbital distance
         if body.name.lower() == "sun":
             self.distance = 10.0
         else:
             # Scale distance based on orbital distance
-            orbital_radius = np.linalg.norm(body.pos)
+            x, y, z = body.pos.tolist()
+            orbital_radius = math.sqrt(x*x + y*y + z*z)
             self.distance = max(0.5, min(5.0, orbital_radius * 0.3))
     
     def rotate(self, d_azimuth, d_elevation):
@@ -111,7 +127,7 @@ class Camera:
         self.elevation += d_elevation
         
         # Clamp elevation to avoid gimbal lock
-        self.elevation = np.clip(self.elevation, -math.pi/2 + 0.1, math.pi/2 - 0.1)
+        self.elevation = max(-math.pi/2 + 0.1, min(math.pi/2 - 0.1, self.elevation))
         
         self._update_position()
     
@@ -125,7 +141,7 @@ class Camera:
             Zoom factor (>1 zooms in, <1 zooms out)
         """
         self.distance /= factor
-        self.distance = np.clip(self.distance, 0.1, 100.0)
+        self.distance = max(0.1, min(100.0, self.distance))
         self._update_position()
     
     def update(self, dt):
@@ -146,21 +162,31 @@ class Camera:
     def _update_position(self):
         """Update camera position based on spherical coordinates."""
         # Convert spherical to Cartesian coordinates
-        x = self.distance * math.cos(self.elevation) * math.cos(self.azimuth)
-        y = self.distance * math.sin(self.elevation)
-        z = self.distance * math.cos(self.elevation) * math.sin(self.azimuth)
-        
-        self.position = self.target + np.array([x, y, z])
+        d = self.distance
+        ce = math.cos(self.elevation)
+        se = math.sin(self.elevation)
+        ca = math.cos(self.azimuth)
+        sa = math.sin(self.azimuth)
+        
+        # Written into the existing position array rather than rebinding it
+        # to target + np.array([...])
+        np.add(self.target, (d * ce * ca, d * se, d * ce * sa), out=self.position)
+        self._view_dirty = True
     
     def get_view_matrix(self):
         """
         Get the view matrix for rendering.
         
+        The matrix is cached until the camera moves; treat it as read-only.
+        
         Returns
         -------
         np.ndarray
             4x4 view matrix
         """
+        if not self._view_dirty:
+            return self._view
+        
         # Look-at matrix calculation
         forward = self.target - self.position
         forward = forward / np.linalg.norm(forward)
@@ -181,12 +207,19 @@ class Camera:
             np.dot(-forward, self.position)
         ])
         
+        self._view = view
+        self._inv_view = None
+        self._view_dirty = False
+        self._vp_stale = True
         return view
     
     def get_projection_matrix(self, aspect_ratio):
         """
         Get the projection matrix for rendering.
         
+        The matrix is cached per aspect ratio, fov and clip planes; treat it
+        as read-only.
+        
         Parameters
         ----------
         aspect_ratio : float
@@ -197,6 +230,10 @@ class Camera:
         np.ndarray
             4x4 projection matrix
         """
+        key = (aspect_ratio, self.fov, self.near, self.far)
+        if key == self._proj_key:
+            return self._proj
+        
         fov_rad = math.radians(self.fov)
         f = 1.0 / math.tan(fov_rad / 2.0)
         
@@ -207,8 +244,87 @@ class Camera:
         proj[2, 3] = (2 * self.far * self.near) / (self.near - self.far)
         proj[3, 2] = -1
         
+        self._proj = proj
+        self._inv_proj = None
+        self._proj_key = key
+        self._vp_stale = True
         return proj
     
+    def get_view_projection(self, aspect_ratio):
+        """
+        Get the combined projection @ view matrix (cached like its factors).
+        
+        Parameters
+        ----------
+        aspect_ratio : float
+            Screen aspect ratio (width/height)
+            
+        Returns
+        -------
+        np.ndarray
+            4x4 matrix taking world to clip coordinates; treat it as read-only
+        """
+        proj = self.get_projection_matrix(aspect_ratio)
+        view = self.get_view_matrix()
+        if self._vp_stale:
+            np.matmul(proj, view, out=self._vp)
+            self._vp_stale = False
+            self._w2s_key = None
+        return self._vp
+    
+    def compose_world_to_screen(self, screen_width=800, screen_height=600):
+        """
+        Get the fused viewport @ projection @ view matrix (cached).
+        
+        For a world point p, ``s = M @ [p, 1]`` gives the screen position
+        as (s[0] / s[3], s[1] / s[3]), with s[3] > 0 in front of the
+        camera: the NDC-to-pixel mapping of world_to_screen is linear
+        before the divide, so it folds into the matrix.
+        
+        Returns
+        -------
+        np.ndarray
+            4x4 matrix; treat it as read-only
+        """
+        vp = self.get_view_projection(screen_width / screen_height)
+        key = (screen_width, screen_height)
+        if self._w2s_key != key:
+            # x_s = (x_c + w_c) * width / 2, y_s = (w_c - y_c) * height / 2
+            half_w = 0.5 * screen_width
+            half_h = 0.5 * screen_height
+            self._w2s[0] = half_w * (vp[0] + vp[3])
+            self._w2s[1] = half_h * (vp[3] - vp[1])
+            self._w2s[2:] = vp[2:]
+            self._w2s_key = key
+        return self._w2s
+    
+    def _get_inverse_matrices(self, aspect_ratio):
+        """
+        Inverse projection and view matrices, cached with the originals.
+        
+        Both are written down in closed form rather than inverted with
+        np.linalg.inv: the view is a rotation R plus translation t, with
+        inverse [R^T | -R^T t], and the perspective matrix only has five
+        non-zero entries.
+        """
+        proj = self.get_projection_matrix(aspect_ratio)
+        view = self.get_view_matrix()
+        if self._inv_proj is None:
+            inv_proj = np.zeros((4, 4))
+            inv_proj[0, 0] = 1.0 / proj[0, 0]
+            inv_proj[1, 1] = 1.0 / proj[1, 1]
+            inv_proj[2, 3] = -1.0
+            inv_proj[3, 2] = 1.0 / proj[2, 3]
+            inv_proj[3, 3] = proj[2, 2] / proj[2, 3]
+            self._inv_proj = inv_proj
+        if self._inv_view is None:
+            rot_t = view[:3, :3].T
+            inv_view = np.eye(4)
+            inv_view[:3, :3] = rot_t
+            inv_view[:3, 3] = -(rot_t @ view[:3, 3])
+            self._inv_view = inv_view
+        return self._inv_proj, self._inv_view
+    
     def world_to_screen(self, world_pos, screen_width=800, screen_height=600):
         """
         Convert world coordinates to screen coordinates.
@@ -225,30 +341,52 @@ class Camera:
         tuple or None
             (screen_x, screen_y) or None if behind camera
         """
-        # Transform to camera space
-        view = self.get_view_matrix()
-        proj = self.get_projection_matrix(screen_width / screen_height)
-        
-        # Convert to homogeneous coordinates
-        world_pos_h = np.append(world_pos, 1.0)
-        
-        # Apply transformations
-        view_pos = view @ world_pos_h
-        if view_pos[2] > 0:  # Behind camera
-            return None
+        # World to (homogeneous) screen space in one product, w = 1
+        m = self.compose_world_to_screen(screen_width, screen_height)
+        sx, sy, _, w = (m[:, :3] @ np.asarray(world_pos, dtype=float) + m[:, 3]).tolist()
         
-        clip_pos = proj @ view_pos
-        if clip_pos[3] == 0:
+        # The projection puts -z_view into w: w < 0 is behind the camera
+        if w <= 0:
             return None
         
         # Perspective divide
-        ndc = clip_pos[:3] / clip_pos[3]
+        return (sx / w, sy / w)
+    
+    def world_to_screen_batch(self, world_positions, screen_width=800, screen_height=600):
+        """
+        Convert many world positions to screen coordinates at once.
         
-        # Convert to screen coordinates
-        screen_x = (ndc[0] + 1) * 0.5 * screen_width
-        screen_y = (1 - ndc[1]) * 0.5 * screen_height
+        Same result as calling world_to_screen on every row, but with the
+        fused matrix of compose_world_to_screen applied in one product.
         
-        return (screen_x, screen_y)
+        Parameters
+        ----------
+        world_positions : array_like, shape (N, 3)
+            World positions
+        screen_width, screen_height : int
+            Screen dimensions
+            
+        Returns
+        -------
+        screen : np.ndarray, shape (N, 2)
+            Screen coordinates (meaningless where ``visible`` is False)
+        visible : np.ndarray of bool, shape (N,)
+            False where world_to_screen would return None
+        """
+        pts = np.asarray(world_positions, dtype=float).reshape(-1, 3)
+        m = self.compose_world_to_screen(screen_width, screen_height)
+        
+        # Homogeneous multiply without building the (N, 4) ones column;
+        # only the x, y and w rows are needed
+        rows = m[[0, 1, 3]]
+        hom = pts @ rows[:, :3].T + rows[:, 3]
+        
+        # The projection puts -z_view into w, so w > 0 covers both the
+        # behind-camera and the w == 0 rejections of world_to_screen
+        w = hom[:, 2]
+        visible = w > 0
+        screen = hom[:, :2] / np.where(visible, w, 1.0)[:, None]
+        return screen, visible
     
     def screen_to_world(self, screen_x, screen_y, screen_width=800, screen_height=600, depth=0.0):
         """
@@ -273,12 +411,7 @@ class Camera:
         ndc_y = 1.0 - (2.0 * screen_y / screen_height)
         
         # Create ray from camera through screen point
-        view = self.get_view_matrix()
-        proj = self.get_projection_matrix(screen_width / screen_height)
-        
-        # Inverse transformations
-        inv_proj = np.linalg.inv(proj)
-        inv_view = np.linalg.inv(view)
+        inv_proj, inv_view = self._get_inverse_matrices(screen_width / screen_height)
         
         # Ray in clip space
         clip_pos = np.array([ndc_x, ndc_y, -1.0, 1.0])
@@ -0,0 +1,298 @@
+"""
+renderer_gl.py
+
+OpenGL renderer (pyqtgraph)
+
+Draws the same scene as MatplotlibRenderer, but through pyqtgraph's OpenGL
+items, so projection and rasterisation happen on the GPU instead of in
+matplotlib's Python/Agg pipeline. All bodies share one scatter item fed
+with the packed float32 positions; every trail is one line item fed with
+its float32 ring-buffer view, and the potential surfaces are surface
+items drawn as wireframes.
+
+pyqtgraph, PyOpenGL and a Qt binding are optional; they are only needed
+when a Scene is created with renderer_type="opengl". The view has its own
+mouse orbit and zoom, and body picking by mouse click is not supported
+(select bodies with the number keys instead).
+"""
+
+import numpy as np
+
+try:
+    import pyqtgraph as pg
+    import pyqtgraph.opengl as gl
+    from pyqtgraph.Qt import QtCore, QtWidgets
+except ImportError:
+    pg = gl = None
+
+from .camera import CameraMode
+from .scene import get_display_radius
+
+__all__ = ["GLRenderer"]
+
+class GLRenderer:
+    """
+    pyqtgraph/OpenGL renderer for the solar system visualization.
+    
+    Offers the renderer interface Scene and the UI panels use (render,
+    render_text_panel, show, save_frame) plus run(), which drives the
+    animation from a Qt timer.
+    """
+    
+    def __init__(self, scene):
+        """
+        Initialize the OpenGL renderer.
+        
+        Parameters
+        ----------
+        scene : Scene
+            Scene to render
+        """
+        if gl is None:
+            raise ImportError("The opengl renderer needs pyqtgraph, PyOpenGL and a Qt "
+                              "binding (pip install pyqtgraph PyOpenGL PyQt5)")
+        self.scene = scene
+        
+        self.app = pg.mkQApp("Solar System Simulation")
+        self.view = gl.GLViewWidget()
+        self.view.setWindowTitle("Solar System Simulation")
+        self.view.resize(1200, 800)
+        self.view.setBackgroundColor("k")
+        self.view.setCameraPosition(distance=60, elevation=20, azimuth=30)
+        
+        self.grid = gl.GLGridItem()
+        self.grid.setSize(60, 60)
+        self.grid.setSpacing(5, 5)
+        self.grid.setColor((255, 255, 255, 40))
+        self.view.addItem(self.grid)
+        
+        self.axes = gl.GLAxisItem()
+        self.axes.setSize(2, 2, 2)
+        self.view.addItem(self.axes)
+        
+        # Items keyed like MatplotlibRenderer's artists, built on first render
+        self.body_plot = None
+        self.label_items = {}
+        self.trail_items = {}
+        self.surface_items = {}
+        self._label_list = []       # label (or None) and trail items in body order
+        self._trail_list = []
+        self._items_key = None      # (system, bodies_version) they were built for
+        self._surface_versions = {}
+        self._display_radii = []
+        self._camera_state = None
+        
+        # float32 shadow of the body positions, refreshed once per render
+        self._pos32 = np.empty((0, 3), dtype=np.float32)
+        
+        # 2-D overlay labels, keyed by screen position
+        self.text_panels = {}
+        
+        self._timer = None
+        self._key_callback = None
+        self.view.keyPressEvent = self._on_key_press
+    
+    # ---------------------------
+    # Per-frame update
+    # ---------------------------
+    def render(self):
+        """Render the current frame."""
+        system = self.scene.system
+        if self.body_plot is None or self._items_key != (id(system), system.bodies_version):
+            self._build_items(system.bodies)
+        
+        self._render_surface('far', self.scene.potential_surface)
+        self._render_surface('focus', self.scene.focus_surface)
+        self._render_bodies()
+        self._render_trails()
+        self.axes.setVisible(self.scene.show_axes)
+        self._update_camera()
+        
+        # UI panels; those not drawn this frame stay hidden
+        for label in self.text_panels.values():
+            label.hide()
+        self.scene.ui.render(self)
+        
+        self.view.update()
+    
+    def _build_items(self, bodies):
+        """Create the scatter, label and trail items reused by every frame."""
+        if self.body_plot is not None:
+            self.view.removeItem(self.body_plot)
+        for item in self._label_list + self._trail_list:
+            if item is not None:
+                self.view.removeItem(item)
+        self.label_items = {}
+        self.trail_items = {}
+        self._label_list = []
+        self._trail_list = []
+        
+        colors = np.ones((len(bodies), 4), dtype=np.float32)
+        colors[:, :3] = [body.color for body in bodies]
+        colors[:, 3] = 0.9
+        
+        # Fixed per body; read by the per-frame label loop
+        self._display_radii = [get_display_radius(body) for body in bodies]
+        
+        # Same marker areas as the matplotlib scatter (points^2), as diameters
+        sizes = np.sqrt([max(20, r * 10000) for r in self._display_radii])
+        
+        self.body_plot = gl.GLScatterPlotItem(pos=np.zeros((len(bodies), 3), dtype=np.float32),
+                                              size=sizes.astype(np.float32), color=colors,
+                                              pxMode=True)
+        self.view.addItem(self.body_plot)
+        
+        text_item = getattr(gl, "GLTextItem", None)
+        for k, body in enumerate(bodies):
+            label = None
+            if text_item is not None:
+                label = text_item(text=body.name, color=(255, 255, 255, 255))
+                self.view.addItem(label)
+                self.label_items[body.name] = label
+            trail = gl.GLLinePlotItem(pos=np.zeros((0, 3), dtype=np.float32),
+                                      color=tuple(colors[k, :3]) + (0.6,),
+                                      width=1, antialias=True)
+            self.view.addItem(trail)
+            self.trail_items[body.name] = trail
+            self._label_list.append(label)
+            self._trail_list.append(trail)
+        self._items_key = (id(self.scene.system), self.scene.system.bodies_version)
+    
+    def _render_bodies(self):
+        """Render all celestial bodies."""
+        pos = self.scene.system.pos
+        if self._pos32.shape != pos.shape:
+            self._pos32 = np.empty(pos.shape, dtype=np.float32)
+        np.copyto(self._pos32, pos, casting='same_kind')
+        self.body_plot.setData(pos=self._pos32)
+        
+        show = self.scene.show_labels
+        for k, label in enumerate(self._label_list):
+            if label is None:
+                continue
+            label.setVisible(show)
+            if show:
+                x, y, z = self._pos32[k]
+                label.setData(pos=(x, y, z + self._display_radii[k]))
+    
+    def _render_trails(self):
+        """Render orbital trails."""
+        system = self.scene.system
+        for k, item in enumerate(self._trail_list):
+            trail = system.get_trail(k)
+            visible = self.scene.show_trails and len(trail) > 1
+            item.setVisible(visible)
+            if visible:
+                item.setData(pos=trail)
+    
+    def _render_surface(self, name, surface):
+        """Create or refresh the wireframe item for ``surface``."""
+        item = self.surface_items.get(name)
+        if surface is None:
+            if item is not None:
+                item.setVisible(False)
+            return
+        
+        if item is None:
+            color = (0.0, 1.0, 1.0, 0.2 if name == 'far' else 0.35)
+            item = gl.GLSurfacePlotItem(drawFaces=False, drawEdges=True, edgeColor=color)
+            self.view.addItem(item)
+            self.surface_items[name] = item
+        
+        # Same axes as the matplotlib wireframe: (x, z) span the plane and
+        # the potential is the height. GLSurfacePlotItem wants z[i, j] at
+        # (x[i], y[j]), hence the transpose of the meshgrid-ordered Y.
+        if self._surface_versions.get(name) != (id(surface), surface.version):
+            item.setData(x=surface.x, y=surface.z, z=surface.Y.T)
+            self._surface_versions[name] = (id(surface), surface.version)
+        item.setVisible(self.scene.show_surface)
+    
+    def _update_camera(self):
+        """
+        Point the view at the simulation camera's target.
+        
+        The centre follows the focused body every frame; the distance is
+        only set when the mode or focus changes, so mouse zoom survives.
+        """
+        camera = self.scene.camera
+        focus = camera.focus_body if camera.mode == CameraMode.FOCUS else None
+        if focus is not None:
+            self.view.opts['center'] = pg.Vector(*(float(c) for c in focus.pos))
+        
+        state = (camera.mode, id(focus), camera.distance)
+        if state == self._camera_state:
+            return
+        self._camera_state = state
+        if focus is not None:
+            self.view.setCameraPosition(distance=camera.distance * 2.0)
+        else:
+            limit = max(self.scene.system.max_distance() * 1.2, 10.0)
+            self.view.opts['center'] = pg.Vector(0.0, 0.0, 0.0)
+            self.view.setCameraPosition(distance=3.0 * limit)
+    
+    # ---------------------------
+    # UI and window
+    # ---------------------------
+    def render_text_panel(self, position, lines):
+        """
+        Render a text panel (for UI components) as a label over the view.
+        
+        One label is kept per panel position and its text replaced on
+        later frames.
+        """
+        label = self.text_panels.get(position)
+        if label is None:
+            label = QtWidgets.QLabel(self.view)
+            label.setStyleSheet("color: white; background-color: rgba(0, 0, 0, 180);"
+                                "border-radius: 4px; padding: 4px; font-size: 8pt;")
+            label.move(*(int(v) for v in position))
+            self.text_panels[position] = label
+        label.setText('\n'.join(lines))
+        label.adjustSize()
+        label.show()
+    
+    def run(self, frame_callback, key_callback=None, interval=16):
+        """
+        Show the window and call ``frame_callback(frame)`` every ``interval`` ms.
+        
+        ``key_callback`` receives key presses as objects with a matplotlib-
+        style ``key`` attribute (a character, ' ' or 'escape'); 'q' and
+        Escape close the window.
+        """
+        self._key_callback = key_callback
+        frame = [0]
+        
+        def tick():
+            frame_callback(frame[0])
+            frame[0] += 1
+        
+        self._timer = QtCore.QTimer()
+        self._timer.timeout.connect(tick)
+        self._timer.start(interval)
+        self.show()
+    
+    def _on_key_press(self, event):
+        """Translate a Qt key press for the key callback."""
+        key = event.text().lower()
+        if key == '\x1b':
+            key = 'escape'
+        if key in ('q', 'escape'):
+            self.view.close()
+            self.app.quit()
+        elif key and self._key_callback is not None:
+            self._key_callback(_KeyEvent(key))
+    
+    def show(self):
+        """Show the window and run the Qt event loop."""
+        self.view.show()
+        pg.exec()
+    
+    def save_frame(self, filename):
+        """Save current frame to file."""
+        self.view.grabFramebuffer().save(filename)
+
+class _KeyEvent:
+    """Minimal stand-in for a matplotlib key event."""
+    
+    def __init__(self, key):
+        self.key = key
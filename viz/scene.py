@@ -7,21 +7,17 @@ Manages the 3D scene rendering including bodies, trails, potential surfaces,
 and coordinate systems. This is the main rendering coordinator.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.animation import FuncAnimation
-from scipy.ndimage import gaussian_filter
 import matplotlib.patches as patches
 
-from .surface import PotentialSurface
+from .surface import PotentialSurface, create_focus_surface
 from .camera import Camera, CameraMode
 from .ui import UIManager
 from constants import VISUAL_RADIUS_SCALE, TRAIL_DECIMATE
+from constants import FARFIELD_UPDATE_EVERY, FOCUS_PATCH_RADIUS_AU
 
 __all__ = ["Scene", "MatplotlibRenderer"]
 
@@ -54,14 +50,17 @@ class Scene:
         system : SolarSystem
             Solar system to render
         renderer_type : str
-            Type of renderer to use ("matplotlib", "opengl", etc.)
+            Type of renderer to use: "matplotlib", or "opengl" for the
+            pyqtgraph GPU renderer in renderer_gl.py (optional dependency)
         """
         self.system = system
         self.camera = Camera()
         self.ui = UIManager()
         
-        # Rendering components
+        # Rendering components: coarse far-field surface plus a fine patch
+        # around the focused body (only while the camera is in focus mode)
         self.potential_surface = PotentialSurface()
+        self.focus_surface = None
         
         # Rendering settings
         self.show_trails = True
@@ -72,6 +71,10 @@ class Scene:
         # Create renderer
         if renderer_type == "matplotlib":
             self.renderer = MatplotlibRenderer(self)
+        elif renderer_type == "opengl":
+            # Imported here so Qt/OpenGL only load when asked for
+            from .renderer_gl import GLRenderer
+            self.renderer = GLRenderer(self)
         else:
             raise ValueError(f"Unknown renderer type: {renderer_type}")
         
@@ -89,22 +92,39 @@ class Scene:
         dt : float
             Time step in years
         """
-        # Update camera
+        # Update camera (mouse drags are applied once per frame)
+        self.ui.flush_drag(self.camera)
         self.camera.update(dt)
         
         # Update UI
         self.ui.update(dt)
         
-        # Update potential surface periodically
-        if self.frame_count % 15 == 0:  # Update every 10 frames
+        # Update far-field potential surface periodically
+        if self.frame_count % FARFIELD_UPDATE_EVERY == 0:
             self.potential_surface.update(self.system.bodies)
         
+        # Fine focus patch follows the focused body every frame
+        self._update_focus_surface()
+        
         # Add trail points
         if self.frame_count % TRAIL_DECIMATE == 0:
             self.system.add_trail_points()
         
         self.frame_count += 1
     
+    def _update_focus_surface(self):
+        """Recenter and recompute the high-resolution patch around the focused body."""
+        body = self.camera.focus_body if self.camera.mode == CameraMode.FOCUS else None
+        if body is None:
+            self.focus_surface = None
+            return
+        
+        if self.focus_surface is None:
+            self.focus_surface = create_focus_surface(body.pos, radius_au=FOCUS_PATCH_RADIUS_AU)
+        else:
+            self.focus_surface.set_center(body.pos)
+        self.focus_surface.update(self.system.bodies)
+    
     def render(self):
         """Render the current frame."""
         self.renderer.render()
@@ -168,17 +188,34 @@ class MatplotlibRenderer:
         self.ax.set_zlabel("Potential", color="white")
         self.ax.tick_params(colors="white")
         
+        # Axis limits last applied, as (cx, cy, cz, half-width); see
+        # _set_view_limits
+        self._limits = None
+        
         # Set up the plot
         self._setup_plot()
         
-        # Store plot elements for updating
-        self.body_plots = {}
+        # Store plot elements for updating (created on the first render and
+        # then mutated in place, so the axes are never cleared)
+        self.body_plots = None
+        self.label_plots = {}
         self.trail_plots = {}
+        self._label_list = []           # label and trail artists in body order,
+        self._trail_list = []           # for the per-frame loops
+        self._artists_key = None        # (system, bodies_version) they were built for
         self.surface_plot = None
+        self.focus_plot = None
+        self._surface_versions = {}
+        self.axes_plots = []
+        self._display_radii = []        # per body, set by _build_body_artists
+        self._edge_selection = None     # selection the edge colours were set for
+        
+        # float32 shadow of the body positions, refreshed once per render;
+        # physics stays float64 but screen coordinates do not need it
+        self._pos32 = np.empty((0, 3), dtype=np.float32)
         
-        # Text elements
-        self.info_text = None
-        self.control_text = None
+        # Text elements, keyed by screen position
+        self.text_panels = {}
 
         #max_range = 5  # adjust as needed
         #self.ax.set_xlim(-max_range, max_range)
@@ -219,124 +256,244 @@ class MatplotlibRenderer:
         """Update view limits based on camera and bodies."""
         if self.scene.camera.mode == CameraMode.FOCUS and self.scene.camera.focus_body:
             # Focus mode: tight view around selected body
-            center = self.scene.camera.focus_body.pos
+            cx, cy, cz = self.scene.camera.focus_body.pos
             radius = self.scene.camera.distance * 0.5
-            
-            self.ax.set_xlim(center[0] - radius, center[0] + radius)
-            self.ax.set_ylim(center[1] - radius, center[1] + radius)
-            self.ax.set_zlim(center[2] - radius, center[2] + radius)
+            self._set_view_limits(cx, cy, cz, radius)
         else:
             # Overview mode: show entire system
-            max_dist = 0
-            for body in self.scene.system.bodies:
-                dist = np.linalg.norm(body.pos)
-                max_dist = max(max_dist, dist)
-            
-            limit = max(max_dist * 1.2, 10.0)
-            self.ax.set_xlim(-limit, limit)
-            self.ax.set_ylim(-limit, limit)
-            self.ax.set_zlim(-limit, limit)
+            limit = max(self.scene.system.max_distance() * 1.2, 10.0)
+            self._set_view_limits(0.0, 0.0, 0.0, limit)
+    
+    def _set_view_limits(self, cx, cy, cz, radius):
+        """
+        Set the axes to the cube of half-width ``radius`` around the centre.
+        
+        Each set_*lim call invalidates matplotlib's cached transforms, so
+        the limits are left alone while they move by less than 0.1% of the
+        view, well below a pixel.
+        """
+        new = (float(cx), float(cy), float(cz), float(radius))
+        old = self._limits
+        if old is not None and max(abs(a - b) for a, b in zip(new, old)) <= 1e-3 * radius:
+            return
+        self.ax.set_xlim(cx - radius, cx + radius)
+        self.ax.set_ylim(cy - radius, cy + radius)
+        self.ax.set_zlim(cz - radius, cz + radius)
+        self._limits = new
     
     def render(self):
         """Render the current frame."""
-        # Clear previous frame
-        self.ax.clear()
-        self._setup_plot()
-        
-        # Update view limits
-        self._update_view_limits()
+        system = self.scene.system
+        if self.body_plots is None or self._artists_key != (id(system), system.bodies_version):
+            self._build_body_artists(system.bodies)
         
         # Render potential surface
-        if self.scene.show_surface:
-            self._render_surface()
+        self._render_surface()
+        
+        # Update view limits (after the surface, which autoscales when
+        # rebuilt, and before bodies and trails, which are culled by them)
+        self._update_view_limits()
         
         # Render bodies
         self._render_bodies()
         
         # Render trails
-        if self.scene.show_trails:
-            self._render_trails()
+        self._render_trails()
         
         # Render coordinate axes
-        if self.scene.show_axes:
-            self._render_axes()
+        for artist in self.axes_plots:
+            artist.set_visible(self.scene.show_axes)
         
-        # Render UI elements
+        # Render UI elements; panels not drawn this frame stay hidden
+        for text in self.text_panels.values():
+            text.set_visible(False)
         self.scene.ui.render(self)
         
         # Update display
         plt.draw()
     
-    def _render_bodies(self):
-        """Render all celestial bodies."""
-        for body in self.scene.system.bodies:
-            # Calculate visual radius
-            visual_radius = get_display_radius(body)
-            self.ax.scatter(
-            body.pos[0], body.pos[1], body.pos[2],
-            s=max(20, visual_radius * 10000),  # scatter size is in points^2
-            c=[body.color],
+    def _build_body_artists(self, bodies):
+        """Create the scatter, label and trail artists reused by every frame."""
+        if self.body_plots is not None:
+            self.body_plots.remove()
+        for artist in self._label_list + self._trail_list:
+            artist.remove()
+        self.label_plots = {}
+        self.trail_plots = {}
+        
+        # Display radii are fixed per body, so the per-frame label loop
+        # reads them from here instead of calling get_display_radius
+        self._display_radii = np.array([get_display_radius(body) for body in bodies])
+        
+        pos = self.scene.system.pos
+        self.body_plots = self.ax.scatter(
+            pos[:, 0], pos[:, 1], pos[:, 2],
+            s=[max(20, r * 10000) for r in self._display_radii],  # points^2
+            c=[body.color for body in bodies],
             alpha=0.9,
-            edgecolors='white' if body == self.scene.ui.selected_body else 'none',
+            edgecolors='none',
             linewidth=2
+        )
+        
+        self._label_list = []
+        self._trail_list = []
+        for body, radius in zip(bodies, self._display_radii):
+            label = self.ax.text(
+                body.pos[0], body.pos[1], body.pos[2] + radius,
+                body.name,
+                fontsize=8,
+                color='white',
+                ha='center'
             )
-
-            # Add label above the scaled "surface"
-            if self.scene.show_labels:
-                self.ax.text(
-                    body.pos[0], body.pos[1], body.pos[2] + visual_radius,
-                    body.name,
-                    fontsize=8,
-                    color='white',
-                    ha='center'
-                )
-
+            trail, = self.ax.plot(
+                [], [], [],
+                color=body.color,
+                alpha=0.6,
+                linewidth=1
+            )
+            self._label_list.append(label)
+            self._trail_list.append(trail)
+            self.label_plots[body.name] = label
+            self.trail_plots[body.name] = trail
+        self._artists_key = (id(self.scene.system), self.scene.system.bodies_version)
+        
+        if not self.axes_plots:
+            self._render_axes()
+    
+    def _render_bodies(self):
+        """Render all celestial bodies."""
+        bodies = self.scene.system.bodies
+        pos = self.scene.system.pos
+        if self._pos32.shape != pos.shape:
+            self._pos32 = np.empty(pos.shape, dtype=np.float32)
+        np.copyto(self._pos32, pos, casting='same_kind')
+        pos = self._pos32
+        self.body_plots._offsets3d = (pos[:, 0], pos[:, 1], pos[:, 2])
+        
+        # Edge colours only change with the selection
+        selected = self.scene.ui.selected_body
+        if self._edge_selection != (self.body_plots, selected):
+            self.body_plots.set_edgecolors(
+                ['white' if body is selected else 'none' for body in bodies])
+            self._edge_selection = (self.body_plots, selected)
+        
+        # Label above the scaled "surface"; bodies outside the view cube
+        # (see _in_view) keep their label hidden and untouched
+        show = self.scene.show_labels
+        if show:
+            cx, cy, cz, half = self._limits
+            reach = half + self._display_radii
+            on_screen = ((np.abs(pos[:, 0] - cx) <= reach) & (np.abs(pos[:, 1] - cy) <= reach)
+                         & (np.abs(pos[:, 2] - cz) <= reach))
+        for k, label in enumerate(self._label_list):
+            visible = show and on_screen[k]
+            label.set_visible(visible)
+            if visible:
+                x, y, z = pos[k]
+                label.set_position_3d((x, y, z + self._display_radii[k]))
     
     def _render_trails(self):
-        """Render orbital trails."""
-        for body in self.scene.system.bodies:
-            if len(body.trail) > 1:
-                trail = np.array(body.trail)
-                trail = trail[-300:]
-                self.ax.plot(
-                    trail[:, 0], trail[:, 1], trail[:, 2],
-                    color=body.color,
-                    alpha=0.6,
-                    linewidth=1
-                )
+        """Render orbital trails (those inside the view cube, see _in_view)."""
+        system = self.scene.system
+        for k, line in enumerate(self._trail_list):
+            trail = system.get_trail(k)
+            visible = (self.scene.show_trails and len(trail) > 1
+                       and self._in_view(trail.min(axis=0), trail.max(axis=0)))
+            line.set_visible(visible)
+            if visible:
+                line.set_data_3d(trail[:, 0], trail[:, 1], trail[:, 2])
+    
+    def _in_view(self, lo, hi):
+        """
+        Whether the box [lo, hi] overlaps the cube given by the axis limits.
+        
+        That cube is what the 3D axes show; matplotlib does not clip
+        against it, so artists wholly outside would still be projected and
+        drawn off the axes. Hidden artists skip that work.
+        """
+        cx, cy, cz, half = self._limits
+        return (lo[0] <= cx + half and hi[0] >= cx - half
+                and lo[1] <= cy + half and hi[1] >= cy - half
+                and lo[2] <= cz + half and hi[2] >= cz - half)
     
     def _render_surface(self):
-        """Render gravitational potential surface."""
-        if self.scene.potential_surface.Y is not None:
-            X, Y, Z = self.scene.potential_surface.get_wireframe_data(stride=3)
-            self.ax.plot_wireframe( X, Z, Y, alpha=0.2, color='cyan', linewidth=0.5 )
+        """
+        Render gravitational potential surface (far field plus focus patch).
+        
+        The wireframe stride grows with the camera distance (3 up close, at
+        most 16), so zoomed-out views ship far fewer segments to matplotlib.
+        """
+        stride = int(max(3.0, min(16.0, self.scene.camera.distance / 5.0)))
+        self.surface_plot = self._update_wireframe(
+            'far', self.surface_plot, self.scene.potential_surface, stride=stride, alpha=0.2)
+        self.focus_plot = self._update_wireframe(
+            'focus', self.focus_plot, self.scene.focus_surface, stride=stride, alpha=0.35)
+    
+    def _update_wireframe(self, name, plot, surface, stride, alpha):
+        """
+        Create or refresh the wireframe for ``surface`` and return it.
+        
+        The line collection is created once; later updates only replace its
+        segments, and only when the surface has been recomputed or the
+        stride changed.
+        """
+        if surface is None:
+            if plot is not None:
+                plot.set_visible(False)
+            return plot
+        
+        key = (id(surface), surface.version, stride)
+        if self._surface_versions.get(name) != key:
+            X, Y, Z = (a.astype(np.float32, copy=False) for a in surface.get_wireframe_data(stride=stride))
+            if plot is None:
+                plot = self.ax.plot_wireframe( X, Z, Y, alpha=alpha, color='cyan', linewidth=0.5 )
+                self._limits = None     # plot_wireframe autoscaled the axes
+            else:
+                grid = np.stack((X, Z, Y), axis=-1)
+                plot.set_segments(list(grid) + list(grid.transpose(1, 0, 2)))
+            self._surface_versions[name] = key
+        
+        plot.set_visible(self.scene.show_surface)
+        return plot
         
     
     def _render_axes(self):
         """Render coordinate system axes."""
         # Origin marker
-        self.ax.scatter([0], [0], [0], c='white', s=50, marker='+')
+        self.axes_plots.append(self.ax.scatter([0], [0], [0], c='white', s=50, marker='+'))
         
         # Axis lines (small)
         axis_length = 2.0
-        self.ax.plot([0, axis_length], [0, 0], [0, 0], 'r-', alpha=0.5, linewidth=2)  # X
-        self.ax.plot([0, 0], [0, axis_length], [0, 0], 'g-', alpha=0.5, linewidth=2)  # Y
-        self.ax.plot([0, 0], [0, 0], [0, axis_length], 'b-', alpha=0.5, linewidth=2)  # Z
+        self.axes_plots += self.ax.plot([0, axis_length], [0, 0], [0, 0], 'r-', alpha=0.5, linewidth=2)  # X
+        self.axes_plots += self.ax.plot([0, 0], [0, axis_length], [0, 0], 'g-', alpha=0.5, linewidth=2)  # Y
+        self.axes_plots += self.ax.plot([0, 0], [0, 0], [0, axis_length], 'b-', alpha=0.5, linewidth=2)  # Z
     
 
     
     def render_text_panel(self, position, lines):
-        """Render a text panel (for UI components)."""
-        text = '\n'.join(lines)
-        x, y = position
+        """
+        Render a text panel (for UI components).
         
-        # Convert to normalized coordinates
-        x_norm = x / self.fig.get_size_inches()[0] / self.fig.dpi
-        y_norm = 1.0 - (y / self.fig.get_size_inches()[1] / self.fig.dpi)
+        One text artist is kept per panel position and its string replaced
+        on later frames.
+        """
+        text = '\n'.join(lines)
         
-        self.ax.text2D(x_norm, y_norm, text, transform=self.ax.transAxes,
-                      fontsize=8, color='white', verticalalignment='top',
-                      bbox=dict(boxstyle='round', facecolor='black', alpha=0.7))
+        artist = self.text_panels.get(position)
+        if artist is None:
+            x, y = position
+            
+            # Convert to normalized coordinates
+            x_norm = x / self.fig.get_size_inches()[0] / self.fig.dpi
+            y_norm = 1.0 - (y / self.fig.get_size_inches()[1] / self.fig.dpi)
+            
+            artist = self.ax.text2D(x_norm, y_norm, text, transform=self.ax.transAxes,
+                          fontsize=8, color='white', verticalalignment='top',
+                          bbox=dict(boxstyle='round', facecolor='black', alpha=0.7))
+            self.text_panels[position] = artist
+        else:
+            artist.set_text(text)
+        artist.set_visible(True)
     
     def show(self):
         """Show the plot window."""
@@ -7,15 +7,20 @@ Generates and manages the gravitational potential surface visualization
 that shows the "gravity wells" created by massive bodies.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+import math
 import numpy as np
 from constants import G, EPS_POTENTIAL, GRID_DEFAULT_RANGE_AU, GRID_COARSE_N, GRID_FOCUS_N
 from constants import POTENTIAL_Y_SCALE, POTENTIAL_Y_CLAMP
+from physics._kernels import HAVE_NUMBA
+from physics._packed import _packed_system
+from physics.potential import (compute_potential_grid_nb, compute_potential_axes_nb,
+                               compute_potential_point_nb)
+
+__all__ = ["PotentialSurface", "compute_potential_grid", "compute_potential_axes"]
 
-__all__ = ["PotentialSurface", "compute_potential_grid"]
+# Grid values per broadcast pass in the NumPy potential: as many bodies are
+# taken at once as keep the (block, *grid) temporaries (<= 256 KB) in cache
+_POTENTIAL_CHUNK = 32768
 
 class PotentialSurface:
     """
@@ -40,18 +45,41 @@ class PotentialSurface:
         self.range_au = range_au
         self.resolution = resolution
         
-        # Create coordinate grids
-        self.x = np.linspace(-range_au, range_au, resolution)
-        self.z = np.linspace(-range_au, range_au, resolution)
-        self.X, self.Z = np.meshgrid(self.x, self.z)
+        # Grid axes (float32: the surface is only drawn). The potential is
+        # evaluated from these directly; the 2-D X/Z meshgrid is only
+        # built when a caller asks for it
+        self.x = np.linspace(-range_au, range_au, resolution, dtype=np.float32)
+        self.z = np.linspace(-range_au, range_au, resolution, dtype=np.float32)
+        self._mesh = None
         
-        # Potential values (will be computed)
-        self.Y = np.zeros_like(self.X)
+        # Potential values (will be computed, in place on every update);
+        # version counts updates so renderers can tell when the mesh needs
+        # refreshing
+        self.Y = np.zeros((resolution, resolution), dtype=np.float32)
+        self.version = 0
+        
+        # Grid center in world coordinates (see set_center)
+        self.center = np.zeros(3)
         
         # Visualization properties
         self.y_scale = POTENTIAL_Y_SCALE
         self.y_clamp = POTENTIAL_Y_CLAMP
     
+    @property
+    def X(self):
+        """x coordinate of every grid point (meshgrid of x and z)."""
+        return self._meshgrid()[0]
+    
+    @property
+    def Z(self):
+        """z coordinate of every grid point (meshgrid of x and z)."""
+        return self._meshgrid()[1]
+    
+    def _meshgrid(self):
+        if self._mesh is None:
+            self._mesh = np.meshgrid(self.x, self.z)
+        return self._mesh
+    
     def update(self, bodies):
         """
         Update the potential surface based on current body positions.
@@ -61,15 +89,34 @@ class PotentialSurface:
         bodies : list of Body
             All bodies contributing to the gravitational field
         """
-        self.Y = compute_potential_grid(
-            self.X, self.Z, bodies, 
+        # Values below -y_clamp are clipped below anyway, so the sum may
+        # stop early there
+        floor = -self.y_clamp / self.y_scale if self.y_scale > 0 else -np.inf
+        compute_potential_axes(
+            self.x, self.z, bodies, 
             y_plane=0.0, 
-            softening=EPS_POTENTIAL
+            softening=EPS_POTENTIAL,
+            out=self.Y,
+            floor=floor
         )
         
         # Apply scaling and clamping for visualization
         self.Y *= self.y_scale
-        self.Y = np.clip(self.Y, -self.y_clamp, self.y_clamp)
+        np.clip(self.Y, -self.y_clamp, self.y_clamp, out=self.Y)
+        self.version += 1
+    
+    def set_center(self, center_pos):
+        """
+        Move the grid so it is centred on ``center_pos`` (x and z are used).
+        
+        The grid axes are shifted in place; call update() afterwards to
+        refresh the potential values.
+        """
+        center_pos = np.asarray(center_pos, dtype=float)
+        self.x += center_pos[0] - self.center[0]
+        self.z += center_pos[2] - self.center[2]
+        self._mesh = None
+        self.center = center_pos.copy()
     
     def get_mesh_data(self):
         """
@@ -96,9 +143,25 @@ class PotentialSurface:
         tuple of (np.ndarray, np.ndarray, np.ndarray)
             (X, Y, Z) coordinate arrays for wireframe
         """
-        return self.X[::stride, ::stride], self.Y[::stride, ::stride], self.Z[::stride, ::stride]
+        X, Z = np.meshgrid(self.x[::stride], self.z[::stride])
+        return X, self.Y[::stride, ::stride], Z
 
-def compute_potential_grid(X, Z, bodies, y_plane=0.0, softening=EPS_POTENTIAL):
+def _body_arrays(bodies):
+    """
+    Positions (N, 3) and G * mass (N,) of ``bodies`` as flat float arrays.
+    
+    Packed systems hand out their own arrays; other lists are gathered
+    once, so the potential sums below never touch Body attributes.
+    """
+    system = _packed_system(bodies)
+    if system is not None:
+        return system.pos, system.Gm
+    bpos = np.array([body.pos for body in bodies], dtype=float).reshape(-1, 3)
+    Gm = G * np.array([body.mass for body in bodies], dtype=float)
+    return bpos, Gm
+
+def compute_potential_grid(X, Z, bodies, y_plane=0.0, softening=EPS_POTENTIAL, out=None,
+                           floor=-np.inf):
     """
     Compute gravitational potential on a 2D grid.
     
@@ -112,27 +175,148 @@ def compute_potential_grid(X, Z, bodies, y_plane=0.0, softening=EPS_POTENTIAL):
         Y-coordinate of the plane (usually 0 for x-z plane)
     softening : float
         Softening parameter to avoid singularities
+    out : np.ndarray, optional
+        Array of X's shape to write the result into instead of allocating
+    floor : float
+        Values below this are returned as ``floor``. Points where the first
+        bodies already reach it skip the rest of the sum, which is where
+        callers that clamp the result anyway save work.
         
     Returns
     -------
     np.ndarray
-        Gravitational potential values at each grid point
+        Gravitational potential values at each grid point (``out`` if given)
+    
+    float32 grids give a float32 result, everything else float64. With
+    Numba available, 2-D grids are summed by the compiled, threaded kernel
+    in physics/potential.py (grids that are not C-contiguous are copied
+    once for it); otherwise a NumPy broadcast is used.
     """
-    potential = np.zeros_like(X)
+    bpos, Gm = _body_arrays(bodies)
+    soft2 = softening * softening
+    dtype = np.float32 if X.dtype == np.float32 else np.float64
+    potential = np.empty(X.shape, dtype=dtype) if out is None else out
     
-    for body in bodies:
-        # Distance from each grid point to this body
-        dx = X - body.pos[0]
-        dy = y_plane - body.pos[1]
-        dz = Z - body.pos[2]
+    if HAVE_NUMBA and X.ndim == 2:
+        X = np.ascontiguousarray(X, dtype=dtype)
+        Z = np.ascontiguousarray(Z, dtype=dtype)
+        direct = potential.dtype == dtype and potential.flags.c_contiguous
+        target = potential if direct else np.empty(X.shape, dtype=dtype)
+        compute_potential_grid_nb(X, Z, float(y_plane), bpos, Gm,
+                                  soft2, float(floor), target)
+        if not direct:
+            potential[...] = target
+        return potential
+    
+    potential[...] = 0.0
+    bpos = bpos.astype(dtype, copy=False)
+    Gm = Gm.astype(dtype, copy=False)
+    expand = (slice(None),) + (None,) * X.ndim
+    block = max(1, min(len(Gm), _POTENTIAL_CHUNK // max(X.size, 1)))
+    
+    # Work buffers shared by all blocks
+    r_buf = np.empty((block,) + X.shape, dtype=dtype)
+    dz_buf = np.empty_like(r_buf)
+    sum_buf = np.empty(X.shape, dtype=dtype)
+    
+    # All bodies of a block at once, broadcast against the grid:
+    # U = -sum(G*M/r) (negative because it's a potential well)
+    for lo in range(0, len(Gm), block):
+        p = bpos[lo:lo + block]
+        r = r_buf[:len(p)]
+        dz = dz_buf[:len(p)]
+        np.subtract(X, p[:, 0][expand], out=r)
+        np.subtract(Z, p[:, 2][expand], out=dz)
+        dy2 = (y_plane - p[:, 1])**2 + soft2
         
-        # Softened distance
-        r = np.sqrt(dx**2 + dy**2 + dz**2 + softening**2)
+        # Softened distance, then G*M/r, all in r
+        r *= r
+        dz *= dz
+        r += dz
+        r += dy2[expand]
+        np.sqrt(r, out=r)
+        np.divide(Gm[lo:lo + block][expand], r, out=r)
+        np.sum(r, axis=0, out=sum_buf)
+        potential -= sum_buf
+    
+    if floor > -np.inf:
+        np.maximum(potential, floor, out=potential)
+    return potential
+
+def compute_potential_axes(x, z, bodies, y_plane=0.0, softening=EPS_POTENTIAL, out=None,
+                           floor=-np.inf):
+    """
+    Compute gravitational potential on the grid spanned by two axes.
+    
+    Same result as compute_potential_grid(*np.meshgrid(x, z), ...), i.e.
+    ``potential[i, j]`` is the potential at (x[j], y_plane, z[i]), but the
+    2-D coordinate grids are never formed: the per-body distance terms
+    are computed along each axis once and combined by broadcasting.
+    
+    Parameters
+    ----------
+    x, z : np.ndarray
+        1-D grid coordinates along x and z
+    bodies : list of Body
+        Bodies contributing to the gravitational field
+    y_plane : float
+        Y-coordinate of the plane (usually 0 for x-z plane)
+    softening : float
+        Softening parameter to avoid singularities
+    out : np.ndarray, optional
+        (len(z), len(x)) array to write the result into instead of allocating
+    floor : float
+        As for compute_potential_grid
         
-        # Add this body's contribution to potential
-        # U = -G*M/r (negative because it's a potential well)
-        potential -= G * body.mass / r
+    Returns
+    -------
+    np.ndarray
+        Gravitational potential values, shape (len(z), len(x)) (``out`` if given)
+    """
+    bpos, Gm = _body_arrays(bodies)
+    soft2 = softening * softening
+    dtype = np.float32 if x.dtype == np.float32 else np.float64
+    shape = (len(z), len(x))
+    potential = np.empty(shape, dtype=dtype) if out is None else out
     
+    if HAVE_NUMBA:
+        x = np.ascontiguousarray(x, dtype=dtype)
+        z = np.ascontiguousarray(z, dtype=dtype)
+        direct = potential.dtype == dtype and potential.flags.c_contiguous
+        target = potential if direct else np.empty(shape, dtype=dtype)
+        compute_potential_axes_nb(x, z, float(y_plane), bpos, Gm,
+                                  soft2, float(floor), target)
+        if not direct:
+            potential[...] = target
+        return potential
+    
+    potential[...] = 0.0
+    bpos = bpos.astype(dtype, copy=False)
+    Gm = Gm.astype(dtype, copy=False)
+    x = np.asarray(x, dtype=dtype)
+    z = np.asarray(z, dtype=dtype)
+    
+    # Per body: (x_j - x_k)^2 along x, and (z_i - z_k)^2 + (y - y_k)^2 +
+    # eps^2 along z, so r^2 on the grid is one broadcast add of the two
+    dx2 = np.square(x[None, :] - bpos[:, 0, None])
+    row2 = np.square(z[None, :] - bpos[:, 2, None])
+    row2 += ((y_plane - bpos[:, 1])**2 + soft2)[:, None]
+    
+    block = max(1, min(len(Gm), _POTENTIAL_CHUNK // max(potential.size, 1)))
+    r_buf = np.empty((block,) + shape, dtype=dtype)
+    sum_buf = np.empty(shape, dtype=dtype)
+    
+    for lo in range(0, len(Gm), block):
+        hi = lo + block
+        r = r_buf[:len(Gm[lo:hi])]
+        np.add(row2[lo:hi, :, None], dx2[lo:hi, None, :], out=r)
+        np.sqrt(r, out=r)
+        np.divide(Gm[lo:hi, None, None], r, out=r)
+        np.sum(r, axis=0, out=sum_buf)
+        potential -= sum_buf
+    
+    if floor > -np.inf:
+        np.maximum(potential, floor, out=potential)
     return potential
 
 def create_focus_surface(center_pos, radius_au=2.0, resolution=GRID_FOCUS_N):
@@ -156,11 +340,36 @@ def create_focus_surface(center_pos, radius_au=2.0, resolution=GRID_FOCUS_N):
     surface = PotentialSurface(range_au=radius_au, resolution=resolution)
     
     # Offset the grid to center on the specified position
-    surface.X += center_pos[0]
-    surface.Z += center_pos[2]
+    surface.set_center(center_pos)
     
     return surface
 
+def compute_potential_at_points(positions, bodies, softening=EPS_POTENTIAL):
+    """
+    Compute gravitational potential at many points at once.
+    
+    Parameters
+    ----------
+    positions : array_like, shape (P, 3)
+        Positions [x, y, z] in AU
+    bodies : list of Body
+        Bodies contributing to the gravitational field
+    softening : float
+        Softening parameter
+        
+    Returns
+    -------
+    np.ndarray, shape (P,)
+        Gravitational potential at each position
+    """
+    bpos, Gm = _body_arrays(bodies)
+    pts = np.asarray(positions, dtype=float).reshape(-1, 3)
+    
+    # (P, N) softened distances from every point to every body
+    d = pts[:, None, :] - bpos[None, :, :]
+    r_soft = np.sqrt(np.einsum('pnk,pnk->pn', d, d) + softening * softening)
+    return -(Gm / r_soft).sum(axis=1)
+
 def compute_potential_at_point(pos, bodies, softening=EPS_POTENTIAL):
     """
     Compute gravitational potential at a single point.
@@ -179,13 +388,18 @@ def compute_potential_at_point(pos, bodies, softening=EPS_POTENTIAL):
     float
         Gravitational potential at the specified point
     """
-    potential = 0.0
-    pos = np.array(pos)
-    
-    for body in bodies:
-        r = np.linalg.norm(pos - body.pos)
-        r_soft = np.sqrt(r**2 + softening**2)
-        potential -= G * body.mass / r_soft
+    bpos, Gm = _body_arrays(bodies)
+    x, y, z = (float(c) for c in np.ravel(pos))
+    soft2 = softening * softening
+    if HAVE_NUMBA:
+        return compute_potential_point_nb(x, y, z, bpos, Gm, soft2)
     
-    return potential
+    # A handful of bodies: plain floats beat (N, 3) NumPy temporaries
+    phi = 0.0
+    for (bx, by, bz), gm in zip(bpos.tolist(), Gm.tolist()):
+        dx = x - bx
+        dy = y - by
+        dz = z - bz
+        phi -= gm / math.sqrt(dx*dx + dy*dy + dz*dz + soft2)
+    return phi
 
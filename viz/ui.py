@@ -7,14 +7,19 @@ Handles user interface elements including mouse interactions,
 information displays, and control panels for the simulation.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+import math
+import time
 import numpy as np
+from constants import G
+from physics._kernels import HAVE_NUMBA
+from physics.osculating import osculating_elements
+from physics._packed import _packed_system
+from ._hit_kernel import nearest_body_nb
 
 __all__ = ["UIManager", "InfoPanel", "ControlPanel"]
 
+_RAD2DEG = 180.0 / math.pi
+
 class UIManager:
     """
     Manages all user interface interactions and displays.
@@ -23,12 +28,32 @@ class UIManager:
     different UI components.
     """
     
+    # Touched on every frame; slots keep the attribute reads off a dict
+    __slots__ = ("info_panel", "control_panel", "selected_body", "mouse_pos", "is_dragging",
+                 "_pending_drag", "_ui_interval", "_last_refresh", "_dirty", "_key_handlers")
+    
     def __init__(self):
         self.info_panel = InfoPanel()
         self.control_panel = ControlPanel()
         self.selected_body = None
         self.mouse_pos = (0, 0)
         self.is_dragging = False
+        self._pending_drag = [0.0, 0.0]     # drag deltas not yet applied, see flush_drag
+        
+        # The info panel text is rebuilt at most this often (wall-clock
+        # seconds), or on the next render after force_dirty()
+        self._ui_interval = 1.0 / 60.0
+        self._last_refresh = -math.inf
+        self._dirty = True
+        
+        # handle_key_press dispatch: key -> handler(system, camera); the
+        # number keys are handled separately
+        self._key_handlers = {
+            'r': self._reset_camera,
+            'c': self._clear_trails,
+            'space': self._toggle_pause,
+            'f': self._focus_selected,
+        }
         
     def handle_mouse_click(self, x, y, bodies, camera):
         """
@@ -48,50 +73,71 @@ class UIManager:
         Body or None
             Selected body if any, None otherwise
         """
-        # Convert screen coordinates to world coordinates
-        world_pos = camera.screen_to_world(x, y)
+        # Positions and radii of all bodies as arrays (the packed ones when
+        # the list belongs to a system)
+        system = _packed_system(bodies)
+        if system is not None:
+            positions, radii = system.pos, system.radius
+        else:
+            positions = np.array([body.pos for body in bodies], dtype=float).reshape(-1, 3)
+            radii = np.array([body.radius for body in bodies], dtype=float)
         
-        # Find the closest body to the click
-        closest_body = None
-        min_distance = float('inf')
-        
-        for body in bodies:
-            # Project body position to screen
-            screen_pos = camera.world_to_screen(body.pos)
-            if screen_pos is None:
-                continue
-                
-            # Calculate distance in screen space
-            dx = x - screen_pos[0]
-            dy = y - screen_pos[1]
-            distance = np.sqrt(dx**2 + dy**2)
-            
-            # Consider body size for selection (larger bodies easier to click)
-            selection_radius = max(10, body.radius * camera.get_scale_factor())
-            
-            if distance < selection_radius and distance < min_distance:
-                closest_body = body
-                min_distance = distance
+        if HAVE_NUMBA:
+            k = nearest_body_nb(positions, camera.compose_world_to_screen(), float(x), float(y),
+                                radii, float(camera.get_scale_factor()), 10.0)
+        else:
+            k = self._nearest_body(positions, radii, x, y, camera)
+        closest_body = bodies[k] if k >= 0 else None
         
         self.selected_body = closest_body
         if closest_body:
             self.info_panel.set_body(closest_body)
+        self.force_dirty()
         
         return closest_body
     
+    def _nearest_body(self, positions, radii, x, y, camera):
+        """NumPy version of _hit_kernel.nearest_body_nb."""
+        # Project all body positions to screen in one batch
+        screen, visible = camera.world_to_screen_batch(positions)
+        
+        # Squared screen distances against squared selection radii (larger
+        # bodies are easier to click); the closest body inside its radius wins
+        d2 = (screen[:, 0] - x)**2 + (screen[:, 1] - y)**2
+        r2 = radii * camera.get_scale_factor()
+        np.maximum(r2, 10.0, out=r2)
+        r2 *= r2
+        masked = np.where(visible & (d2 < r2), d2, np.inf)
+        if len(masked):
+            k = int(masked.argmin())   # first index on ties, like the kernel
+            if masked[k] != np.inf:
+                return k
+        return -1
+    
     def handle_mouse_drag(self, dx, dy, camera):
         """
         Handle mouse drag events for camera control.
         
+        The deltas are only accumulated here; flush_drag applies them as
+        one rotation per frame, however many events arrived.
+        
         Parameters
         ----------
         dx, dy : float
             Mouse movement delta
         camera : Camera
-            Camera to update
+            Camera to update (on the next flush_drag)
         """
         if self.is_dragging:
+            self._pending_drag[0] += dx
+            self._pending_drag[1] += dy
+    
+    def flush_drag(self, camera):
+        """Apply the drag accumulated since the last call to ``camera``."""
+        dx, dy = self._pending_drag
+        if dx or dy:
             camera.rotate(dx * 0.01, dy * 0.01)
+            self._pending_drag = [0.0, 0.0]
     
     def handle_key_press(self, key, system, camera):
         """
@@ -106,37 +152,58 @@ class UIManager:
         camera : Camera
             Camera to control
         """
-        if key == 'r':
-            # Reset camera
-            camera.reset()
-        elif key == 'c':
-            # Clear trails
-            system.clear_all_trails()
-        elif key == 'space':
-            # Toggle pause (handled by main loop)
-            return 'toggle_pause'
-        elif key == 'f':
-            # Focus on selected body
-            if self.selected_body:
-                camera.focus_on_body(self.selected_body)
-        elif key.isdigit():
+        handler = self._key_handlers.get(key)
+        if handler is not None:
+            return handler(system, camera)
+        
+        if len(key) == 1 and '0' <= key <= '9':
             # Select planet by number (1-8)
             planet_index = int(key) - 1
             if 0 <= planet_index < len(system.planets):
                 self.selected_body = system.planets[planet_index]
                 self.info_panel.set_body(self.selected_body)
                 camera.focus_on_body(self.selected_body)
+                self.force_dirty()
         
         return None
     
+    def _reset_camera(self, system, camera):
+        camera.reset()
+    
+    def _clear_trails(self, system, camera):
+        system.clear_all_trails()
+    
+    def _toggle_pause(self, system, camera):
+        # Handled by the main loop
+        return 'toggle_pause'
+    
+    def _focus_selected(self, system, camera):
+        if self.selected_body:
+            camera.focus_on_body(self.selected_body)
+    
     def update(self, dt):
         """Update UI components."""
         self.info_panel.update(dt)
         self.control_panel.update(dt)
     
+    def force_dirty(self):
+        """Rebuild the panel contents on the next render, however soon."""
+        self._dirty = True
+    
     def render(self, renderer):
-        """Render UI components."""
-        self.info_panel.render(renderer)
+        """
+        Render UI components.
+        
+        Renders can come faster than the display refreshes; in between
+        refreshes the info panel shows its previous lines again instead of
+        reformatting them.
+        """
+        now = time.perf_counter()
+        refresh = self._dirty or now - self._last_refresh >= self._ui_interval
+        if refresh:
+            self._last_refresh = now
+            self._dirty = False
+        self.info_panel.render(renderer, refresh=refresh)
         self.control_panel.render(renderer)
 
 class InfoPanel:
@@ -144,15 +211,41 @@ class InfoPanel:
     Displays information about the selected body and simulation state.
     """
     
+    __slots__ = ("body", "visible", "position", "_is_sun", "_cache_key", "_cache_lines")
+    
+    # Panel text, filled in one %-format each (the elements part only for
+    # bodies other than the Sun)
+    _STATE_TMPL = ("Name: %s\n"
+                   "Mass: %.3e M☉\n"
+                   "Radius: %.3e AU\n"
+                   "Position: (%.3f, %.3f, %.3f) AU\n"
+                   "Velocity: (%.3f, %.3f, %.3f) AU/yr\n"
+                   "Speed: %.3f AU/yr")
+    _ELEMENTS_TMPL = ("\n\n"
+                      "Orbital Elements:\n"
+                      "Semi-major axis: %.3f AU\n"
+                      "Eccentricity: %.3f\n"
+                      "Inclination: %.1f°\n"
+                      "%s")
+    
     def __init__(self):
         self.body = None
         self.visible = True
         self.position = (10, 10)  # Screen position
+        self._is_sun = False      # set with the body, see set_body
+        
+        # Lines last rendered and the body state they were built from, so
+        # an unchanged body (e.g. while paused) skips the formatting and the
+        # orbital elements
+        self._cache_key = None
+        self._cache_lines = None
         
     def set_body(self, body):
         """Set the body to display information for."""
         self.body = body
         self.visible = True
+        self._cache_key = None
+        self._is_sun = body is not None and body.name.lower() == "sun"
     
     def hide(self):
         """Hide the info panel."""
@@ -162,40 +255,50 @@ class InfoPanel:
         """Update panel contents."""
         pass
     
-    def render(self, renderer):
-        """Render the info panel."""
+    def render(self, renderer, refresh=True):
+        """
+        Render the info panel.
+        
+        With ``refresh`` False the lines last built are reused as they are
+        (unless the body was changed since).
+        """
         if not self.visible or not self.body:
             return
         
+        if not refresh and self._cache_key is not None:
+            renderer.render_text_panel(self.position, self._cache_lines)
+            return
+        
+        body = self.body
+        key = (id(body), body.name, body.mass, body.radius,
+               body.pos.tobytes(), body.vel.tobytes())
+        if key == self._cache_key:
+            renderer.render_text_panel(self.position, self._cache_lines)
+            return
+        
         # Prepare text content
-        lines = [
-            f"Name: {self.body.name}",
-            f"Mass: {self.body.mass:.3e} M☉",
-            f"Radius: {self.body.radius:.3e} AU",
-            f"Position: ({self.body.pos[0]:.3f}, {self.body.pos[1]:.3f}, {self.body.pos[2]:.3f}) AU",
-            f"Velocity: ({self.body.vel[0]:.3f}, {self.body.vel[1]:.3f}, {self.body.vel[2]:.3f}) AU/yr",
-            f"Speed: {np.linalg.norm(self.body.vel):.3f} AU/yr"
-        ]
+        x, y, z = body.pos.tolist()
+        vx, vy, vz = body.vel.tolist()
+        text = self._STATE_TMPL % (body.name, body.mass, body.radius, x, y, z, vx, vy, vz,
+                                   math.sqrt(vx*vx + vy*vy + vz*vz))
         
         # Calculate orbital elements if not the Sun
-        if self.body.name.lower() != "sun":
+        if not self._is_sun:
             try:
-                from physics.osculating import osculating_elements
-                from constants import G
-                
                 # Assume Sun is at origin for orbital elements calculation
-                elements = osculating_elements(self.body.pos, self.body.vel, mu=G)
-                
-                lines.extend([
-                    "",
-                    "Orbital Elements:",
-                    f"Semi-major axis: {elements['a']:.3f} AU",
-                    f"Eccentricity: {elements['e']:.3f}",
-                    f"Inclination: {np.degrees(elements['i']):.1f}°",
-                    f"Period: {elements['period']:.1f} years" if elements['period'] else "Period: Unbound"
-                ])
-            except:
-                pass
+                elements = osculating_elements(body.pos, body.vel, mu=G)
+            except ZeroDivisionError:
+                elements = None     # body sitting exactly at the origin
+            
+            if elements is not None:
+                period = elements['period']
+                text += self._ELEMENTS_TMPL % (
+                    elements['a'], elements['e'], elements['i'] * _RAD2DEG,
+                    "Period: %.1f years" % period if period else "Period: Unbound")
+        
+        lines = text.split("\n")
+        self._cache_key = key
+        self._cache_lines = lines
         
         # Render text (implementation depends on rendering backend)
         renderer.render_text_panel(self.position, lines)
@@ -205,6 +308,24 @@ class ControlPanel:
     Displays simulation controls and status.
     """
     
+    __slots__ = ("visible", "position", "paused", "time_scale", "show_trails", "show_surface",
+                 "_text", "_text_state")
+    
+    # Fixed help text above the status lines, joined once
+    _HELP_LINES = (
+        "Controls:",
+        "Mouse: Click to select body",
+        "Drag: Rotate camera",
+        "R: Reset camera",
+        "C: Clear trails",
+        "F: Focus on selected",
+        "Space: Pause/Resume",
+        "1-8: Select planet",
+        "+/-: Adjust time scale",
+        "",
+    )
+    _HELP_TEXT = "\n".join(_HELP_LINES) + "\n"
+    
     def __init__(self):
         self.visible = True
         self.position = (10, 200)  # Screen position
@@ -212,6 +333,8 @@ class ControlPanel:
         self.time_scale = 1.0
         self.show_trails = True
         self.show_surface = True
+        self._text = None   # figure text artist, reused across frames
+        self._text_state = None     # status values self._text was last set from
         
     def update(self, dt):
         """Update control panel."""
@@ -220,32 +343,43 @@ class ControlPanel:
     def render(self, renderer):
         """Render the control panel."""
         if not self.visible:
+            if self._text is not None:
+                self._text.set_visible(False)
+            return
+        
+        # A figure text only changes with the status values shown in it
+        state = (self.paused, self.time_scale, self.show_trails, self.show_surface)
+        reuse = (hasattr(renderer, "fig") and self._text is not None
+                 and self._text.figure is renderer.fig)
+        if reuse and state == self._text_state:
+            self._text.set_visible(True)
             return
         
-        lines = [
-            "Controls:",
-            "Mouse: Click to select body",
-            "Drag: Rotate camera",
-            "R: Reset camera",
-            "C: Clear trails",
-            "F: Focus on selected",
-            "Space: Pause/Resume",
-            "1-8: Select planet",
-            "+/-: Adjust time scale",
-            "",
+        status = (
             f"Status: {'PAUSED' if self.paused else 'RUNNING'}",
             f"Time scale: {self.time_scale:.1f}x",
             f"Trails: {'ON' if self.show_trails else 'OFF'}",
             f"Surface: {'ON' if self.show_surface else 'OFF'}"
-        ]
-
-        renderer.fig.text(
-        0.02, 0.15,          # ⬅ shift higher if it overlaps control panel
-        "\n".join(lines),
-        ha="left", va="bottom",
-        fontsize=8, color="black",
-        bbox=dict(facecolor="white", alpha=0.5, boxstyle="round,pad=0.5")
         )
+
+        if not hasattr(renderer, "fig"):
+            # Renderers without a matplotlib figure draw it like any panel
+            renderer.render_text_panel(self.position, self._HELP_LINES + status)
+            return
+        
+        content = self._HELP_TEXT + "\n".join(status)
+        if reuse:
+            self._text.set_text(content)
+            self._text.set_visible(True)
+        else:
+            self._text = renderer.fig.text(
+            0.02, 0.15,          # ⬅ shift higher if it overlaps control panel
+            content,
+            ha="left", va="bottom",
+            fontsize=8, color="black",
+            bbox=dict(facecolor="white", alpha=0.5, boxstyle="round,pad=0.5")
+            )
+        self._text_state = state
     
     def toggle_pause(self):
         """Toggle pause state."""
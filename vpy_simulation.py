@@ -6,13 +6,17 @@ Entry point: assemble physics + VPython viz + run loop
 
 This follows the same structure as main.py but uses VPython for 3D visualization
 instead of matplotlib.
+
+Importing vpython opens its canvas (and the server behind it), so the
+module is only imported (as vp) when the first VPythonScene is created;
+loading the system and compiling the kernels happen before that.
 """
 
 import sys
 import time
 import json
 import math
-from vpython import *
+import numpy as np
 
 # Import our modules (assuming same structure as main.py)
 try:
@@ -26,6 +30,21 @@ except ImportError:
     DT = 0.001
     DIAGNOSTIC_ENERGY_PRINT_EVERY = 100
 
+# Numba is optional here as everywhere else (see physics/_kernels.py)
+try:
+    from physics._kernels import HAVE_NUMBA, njit, prange, get_num_threads
+    from physics.barnes_hut import bh_accel_nb
+    from constants import BH_THRESHOLD, BH_THETA, BH_LEAF_SIZE, PARALLEL_ACCEL_MIN_BODIES
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """Stand-in decorator so the fallback kernel runs as plain Python."""
+        def wrap(func):
+            return func
+        return wrap
+
 # VPython specific constants
 G = 0.1
 SUN_RADIUS_VISUAL = 5.0
@@ -35,74 +54,214 @@ SCALE_ORBIT = 40
 GRID_SPACING = 20.0  # Increased for better performance
 GRID_RANGE = 480     # Increased range
 LINE_RADIUS = 0.09
+GRID_REDRAW_TOL = 1e-3  # Grid points that moved less than this keep their old height
+GRID_MEMO_QUANTUM = 2.0  # The grid is only recomputed once a well centre crosses a cell this size
+VISUAL_MOVE_TOL = 1e-3  # Spheres that moved less than this (scene units) are not rewritten
+INFO_REFRESH_INTERVAL = 0.25  # Seconds between info panel refreshes
+
+# Info panel text, filled with % formatting
+CONTROLS_FOOTER = "Controls: P-Pause, T-Trails, G-Grid, L-Labels, C-Clear, R-Reset, Q-Quit\n"
+_NO_SELECTION_TEXT = "Select a body for info\n" + CONTROLS_FOOTER
+_INFO_TMPL = ("Selected: %s\n"
+              "Mass: %.2e kg\n"
+              "Position: (%.2f, %.2f) AU\n"
+              "Velocity: (%.2f, %.2f) AU/yr\n"
+              "Distance from Sun: %.2f AU\n"
+              "Orbital Speed: %.2f AU/yr\n"
+              "Orbital Period: %.1f years\n"
+              "\n" + CONTROLS_FOOTER)
+
+# Attribute names a body may store its position / velocity under, in probe order
+POS_ATTRS = ('r', 'pos', 'position')
+VEL_ATTRS = ('v', 'vel', 'velocity')
+
+# The vpython module, imported by _load_vpython when the first scene is created
+vp = None
+
+def _load_vpython():
+    """Import vpython on first call (this opens its canvas)."""
+    global vp
+    if vp is None:
+        import vpython
+        vp = vpython
+
+def _attr_ref(body, names):
+    """The first of ``names`` that ``body`` has, as the object itself (None if none)."""
+    for name in names:
+        if hasattr(body, name):
+            return getattr(body, name)
+    return None
+
+@njit("void(f8[:, ::1], f8[:, ::1], f8[::1], f8, f8, f8)", cache=True, fastmath=True)
+def _fallback_step_nb(pos, vel, mass, dt, g, soft):
+    """
+    One step of the fallback integrator on packed (N, 2) state.
+    
+    Velocities are kicked with the softened pull of all other bodies at
+    the current positions, then positions drift with the new velocities
+    (semi-implicit Euler). Each pair is visited once (i < j) and kicks
+    both bodies, as in compute_accel_nb. G and the softening are
+    arguments, as in the physics kernels.
+    """
+    n = pos.shape[0]
+    for i in range(n):
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        gi = g * mass[i] * dt
+        ax = 0.0
+        ay = 0.0
+        for j in range(i + 1, n):
+            dx = pos[j, 0] - xi
+            dy = pos[j, 1] - yi
+            # r^-3 as one power: a single opcode when this runs uncompiled
+            inv_r3 = (dx*dx + dy*dy + soft) ** -1.5
+            si = g * mass[j] * inv_r3
+            sj = gi * inv_r3
+            ax += si * dx
+            ay += si * dy
+            vel[j, 0] -= sj * dx
+            vel[j, 1] -= sj * dy
+        vel[i, 0] += ax * dt
+        vel[i, 1] += ay * dt
+    
+    for i in range(n):
+        pos[i, 0] += vel[i, 0] * dt
+        pos[i, 1] += vel[i, 1] * dt
+
+@njit("void(f8[:, ::1], f8[:, ::1], f8[::1], f8, f8, f8)",
+      cache=True, fastmath=True, parallel=True)
+def _fallback_step_nb_parallel(pos, vel, mass, dt, g, soft):
+    """
+    Multithreaded variant of _fallback_step_nb for larger body counts.
+    
+    Every row sums the pull of all other bodies itself, so threads never
+    write the same velocity; that is twice the pair work of the i < j
+    loop, but needs no per-thread buffers or reduction.
+    """
+    n = pos.shape[0]
+    for i in prange(n):
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        ax = 0.0
+        ay = 0.0
+        for j in range(n):
+            if j == i:
+                continue
+            dx = pos[j, 0] - xi
+            dy = pos[j, 1] - yi
+            s = g * mass[j] * (dx*dx + dy*dy + soft) ** -1.5
+            ax += s * dx
+            ay += s * dy
+        vel[i, 0] += ax * dt
+        vel[i, 1] += ay * dt
+    
+    for i in prange(n):
+        pos[i, 0] += vel[i, 0] * dt
+        pos[i, 1] += vel[i, 1] * dt
+
+@njit("void(f8[::1], f8[::1], f8[::1], f8[::1], f8[::1], f8[::1], f8[:, ::1])",
+      cache=True, fastmath=True, parallel=True)
+def _well_field_nb(xs, zs, bx, bz, depth, inv_width2, out):
+    """
+    Sum of the Gaussian body wells at every (xs[i], zs[j]), into out[i, j].
+    
+    Rows are spread over the threads; each grid point is independent, so
+    nothing is shared between them.
+    """
+    for i in prange(xs.shape[0]):
+        x = xs[i]
+        for j in range(zs.shape[0]):
+            z = zs[j]
+            y = 0.0
+            for k in range(bx.shape[0]):
+                dx = x - bx[k]
+                dz = z - bz[k]
+                y += depth[k] * math.exp(-(dx*dx + dz*dz + 1e-3) * inv_width2[k])
+            out[i, j] = y
 
 class VPythonScene:
     """VPython 3D scene management."""
     
     def __init__(self, system):
         """Initialize VPython scene."""
+        _load_vpython()
         self.system = system
         self.show_trails = True
         self.show_grid = True
         self.show_labels = True
         self.selected_body = None
         
+        # Position / velocity of every body, resolved once. These are the
+        # bodies' own (mutable) arrays, which the physics updates in place.
+        self._pos_ref = {body: _attr_ref(body, POS_ATTRS) for body in system.bodies}
+        self._vel_ref = {body: _attr_ref(body, VEL_ATTRS) for body in system.bodies}
+        self._is_sun = {body: getattr(body, 'name', '').lower() == 'sun' for body in system.bodies}
+        
         # Setup VPython scene
-        scene.title = "VPython Solar System Simulation"
-        scene.background = color.black
-        scene.width = 1200
-        scene.height = 800
-        scene.camera.pos = vector(0, 80, 120)
-        scene.camera.axis = vector(0, -80, -120)
+        vp.scene.title = "VPython Solar System Simulation"
+        vp.scene.background = vp.color.black
+        vp.scene.width = 1200
+        vp.scene.height = 800
+        vp.scene.camera.pos = vp.vector(0, 80, 120)
+        vp.scene.camera.axis = vp.vector(0, -80, -120)
         
         # Create visual objects
         self.body_visuals = {}
         self.labels = {}
         self.grid_lines = []
         self.light = None
+        self._sun_visual = None   # the light follows this sphere
+        self._highlighted = None  # body currently drawn as selected
+        
+        # Grid line positions and the 4-unit sample steps along each line
+        self._grid_coords = np.arange(-GRID_RANGE, GRID_RANGE + 1, int(GRID_SPACING))
+        self._grid_fine = np.arange(-GRID_RANGE, GRID_RANGE + 1, 4)
+        self._grid_drawn = None  # (lines, points) heights the curves currently show
+        self._grid_key = None    # quantized well centres they were computed for
         
         # Info panel
         self.info_display = None
+        self._info_dirty = True          # selection changed since the last refresh
+        self._info_last_refresh = 0.0
         self.create_info_panel()
         
         self._create_visuals()
+        self._setup_wells()
         self._setup_grid()
         
     def create_info_panel(self):
         """Create info panel for selected body."""
         # Create text display for info panel
-        self.info_display = wtext(pos=scene.title_anchor, text="Select a body for info\n")
+        self.info_display = vp.wtext(pos=vp.scene.title_anchor, text="Select a body for info\n")
         
     def update_info_panel(self):
-        """Update info panel with selected body data."""
+        """
+        Update info panel with selected body data.
+        
+        Rewritten when the selection changes and otherwise at most every
+        INFO_REFRESH_INTERVAL seconds, since each write refreshes the page.
+        """
+        now = time.perf_counter()
+        if not self._info_dirty and now - self._info_last_refresh < INFO_REFRESH_INTERVAL:
+            return
+        self._info_dirty = False
+        self._info_last_refresh = now
+        
         if not self.selected_body:
-            self.info_display.text = "Select a body for info\nControls: P-Pause, T-Trails, G-Grid, L-Labels, C-Clear, R-Reset, Q-Quit\n"
+            self.info_display.text = _NO_SELECTION_TEXT
             return
             
         body = self.selected_body
         
-        # Get position
-        if hasattr(body, 'r'):
-            pos = body.r
-        elif hasattr(body, 'pos'):
-            pos = body.pos
-        elif hasattr(body, 'position'):
-            pos = body.position
-        else:
+        pos = self._pos_ref[body]
+        if pos is None:
             pos = [0, 0]
-            
-        # Get velocity
-        if hasattr(body, 'v'):
-            vel = body.v
-        elif hasattr(body, 'vel'):
-            vel = body.vel
-        elif hasattr(body, 'velocity'):
-            vel = body.velocity
-        else:
+        vel = self._vel_ref[body]
+        if vel is None:
             vel = [0, 0]
         
         # Calculate orbital parameters
-        if hasattr(body, 'name') and body.name.lower() != 'sun':
+        if not self._is_sun[body]:
             distance = math.sqrt(pos[0]**2 + pos[1]**2)
             speed = math.sqrt(vel[0]**2 + vel[1]**2)
             orbital_period = 2 * math.pi * distance / max(speed, 1e-10)  # Avoid division by zero
@@ -111,43 +270,31 @@ class VPythonScene:
             speed = 0
             orbital_period = 0
         
-        info_text = f"""Selected: {getattr(body, 'name', 'Unknown')}
-Mass: {body.mass:.2e} kg
-Position: ({pos[0]:.2f}, {pos[1]:.2f}) AU
-Velocity: ({vel[0]:.2f}, {vel[1]:.2f}) AU/yr
-Distance from Sun: {distance:.2f} AU
-Orbital Speed: {speed:.2f} AU/yr
-Orbital Period: {orbital_period:.1f} years
-
-Controls: P-Pause, T-Trails, G-Grid, L-Labels, C-Clear, R-Reset, Q-Quit
-"""
-        self.info_display.text = info_text
+        self.info_display.text = _INFO_TMPL % (getattr(body, 'name', 'Unknown'), body.mass,
+                                               pos[0], pos[1], vel[0], vel[1],
+                                               distance, speed, orbital_period)
         
     def _create_visuals(self):
         """Create visual objects for all bodies."""
         for body in self.system.bodies:
-            # Get position (try different possible attribute names)
-            if hasattr(body, 'r'):
-                pos = body.r
-            elif hasattr(body, 'pos'):
-                pos = body.pos
-            elif hasattr(body, 'position'):
-                pos = body.position
-            else:
+            pos = self._pos_ref[body]
+            if pos is None:
                 print(f"Warning: Could not find position for {body}, using (0,0)")
                 pos = [0, 0]
             
-            if hasattr(body, 'name') and body.name.lower() == 'sun':
+            is_sun = self._is_sun[body]
+            if is_sun:
                 # Sun
-                visual = sphere(
-                    pos=vector(pos[0], 0, pos[1]),
+                visual = vp.sphere(
+                    pos=vp.vector(pos[0], 0, pos[1]),
                     radius=SUN_RADIUS_VISUAL,
-                    color=vector(1, 1, 0),
+                    color=vp.vector(1, 1, 0),
                     emissive=True,
                     make_trail=False
                 )
                 # Add light source
-                self.light = local_light(pos=visual.pos, color=vector(1, 1, 0.8))
+                self.light = vp.local_light(pos=visual.pos, color=vp.vector(1, 1, 0.8))
+                self._sun_visual = visual
             else:
                 # Planet
                 radius_visual = max(PLANET_MIN_RADIUS, min(PLANET_MAX_RADIUS, 
@@ -155,31 +302,44 @@ Controls: P-Pause, T-Trails, G-Grid, L-Labels, C-Clear, R-Reset, Q-Quit
                 
                 # Get color or use default
                 if hasattr(body, 'color'):
-                    color_val = vector(*body.color)
+                    color_val = vp.vector(*body.color)
                 else:
-                    color_val = color.white
+                    color_val = vp.color.white
                 
-                visual = sphere(
-                    pos=vector(pos[0] * SCALE_ORBIT, 0, pos[1] * SCALE_ORBIT),
+                visual = vp.sphere(
+                    pos=vp.vector(pos[0] * SCALE_ORBIT, 0, pos[1] * SCALE_ORBIT),
                     radius=radius_visual,
                     color=color_val,
                     make_trail=self.show_trails,
                     retain=200
                 )
             
+            # Scale of its position, the look to restore after highlighting and
+            # where its label sits (kept in step with the radius by _set_highlight)
+            visual.pos_scale = 1.0 if is_sun else SCALE_ORBIT
+            visual.original_radius = visual.radius
+            visual.base_emissive = is_sun
+            visual.label_offset = vp.vector(0, visual.radius * 2.5, 0)
             self.body_visuals[body] = visual
             
             # Add label
             if self.show_labels:
                 label_text = getattr(body, 'name', f"Body{id(body)}")
-                lbl = label(
-                    pos=visual.pos + vector(0, visual.radius * 2.5, 0),
+                lbl = vp.label(
+                    pos=visual.pos + visual.label_offset,
                     text=label_text,
                     height=10,
                     box=False,
-                    color=color.white
+                    color=vp.color.white
                 )
                 self.labels[body] = lbl
+        
+        # Planar sphere centres and radii for click picking, kept current by
+        # update() and _set_highlight
+        self._visual_bodies = list(self.body_visuals)
+        self._visual_xz = np.array([(visual.pos.x, visual.pos.z)
+                                    for visual in self.body_visuals.values()]).reshape(-1, 2)
+        self._visual_radius = np.array([visual.radius for visual in self.body_visuals.values()])
     
     def _setup_grid(self):
         """Setup spacetime curvature grid."""
@@ -189,159 +349,199 @@ Controls: P-Pause, T-Trails, G-Grid, L-Labels, C-Clear, R-Reset, Q-Quit
         # Create grid lines
         num_lines = 2 * (2 * GRID_RANGE // int(GRID_SPACING) + 1)
         for _ in range(num_lines):
-            self.grid_lines.append(curve(color=color.white, radius=LINE_RADIUS))
+            self.grid_lines.append(vp.curve(color=vp.color.white, radius=LINE_RADIUS))
     
-    def get_curvature_y(self, x, z):
-        """Calculate spacetime curvature at position (x, z)."""
-        total_y = 0
-        for body in self.system.bodies:
-            # Get position (try different possible attribute names)
-            if hasattr(body, 'r'):
-                body_pos = body.r
-            elif hasattr(body, 'pos'):
-                body_pos = body.pos
-            elif hasattr(body, 'position'):
-                body_pos = body.position
-            else:
-                body_pos = [0, 0]
-            
-            # Scale positions appropriately
-            if hasattr(body, 'name') and body.name.lower() == 'sun':
-                body_x = body_pos[0]
-                body_z = body_pos[1]
-            else:
-                body_x = body_pos[0] * SCALE_ORBIT
-                body_z = body_pos[1] * SCALE_ORBIT
-            
-            distance_sq = (x - body_x)**2 + (z - body_z)**2 + 1e-3
-            distance = math.sqrt(distance_sq)
-            
+    def _well_centers(self):
+        """Grid-space (x, z) centres of the body wells, as two arrays."""
+        n = len(self._well_pos)
+        bx = np.zeros(n)
+        bz = np.zeros(n)
+        for k, body_pos in enumerate(self._well_pos):
+            if body_pos is not None:
+                bx[k] = body_pos[0]
+                bz[k] = body_pos[1]
+        bx *= self._well_scale
+        bz *= self._well_scale
+        return bx, bz
+    
+    def _curvature_field(self, xs, zs, centers=None):
+        """
+        Spacetime curvature on the grid spanned by ``xs`` and ``zs``.
+        
+        Returns an array of shape (len(xs), len(zs)) whose [i, j] entry is
+        the height at (xs[i], zs[j]); every body adds one Gaussian well,
+        summed for all grid points at once. ``centers`` are the well
+        centres from _well_centers, gathered here if not given.
+        
+        With Numba the sum runs in the multithreaded _well_field_nb,
+        otherwise through NumPy broadcasting.
+        """
+        bx, bz = centers if centers is not None else self._well_centers()
+        
+        xs = np.ascontiguousarray(xs, dtype=float)
+        zs = np.ascontiguousarray(zs, dtype=float)
+        if HAVE_NUMBA:
+            out = np.empty((len(xs), len(zs)))
+            _well_field_nb(xs, zs, bx, bz, self._well_depth, self._well_inv_width2, out)
+            return out
+        
+        d2 = (xs[:, None, None] - bx)**2 + (zs[None, :, None] - bz)**2 + 1e-3
+        
+        # Gaussian well shape
+        return (self._well_depth * np.exp(-d2 * self._well_inv_width2)).sum(axis=-1)
+    
+    def _setup_wells(self):
+        """Per-body well depth, width and position scale for _curvature_field."""
+        bodies = self.system.bodies
+        self._well_pos = [self._pos_ref[body] for body in bodies]
+        self._well_depth = np.empty(len(bodies))
+        self._well_inv_width2 = np.empty(len(bodies))
+        self._well_scale = np.empty(len(bodies))
+        for k, body in enumerate(bodies):
             # Enhanced gravitational well visualization
-            if hasattr(body, 'name') and body.name.lower() == 'sun':
-                # Sun creates a deep well
-                well_depth = -495.0
-                well_width = 485.0
+            if self._is_sun[body]:
+                # Sun creates a deep well and is placed unscaled
+                depth, width, scale = -495.0, 485.0, 1.0
             else:
-                # Planets create smaller wells
-                well_depth = -2.0 * (body.mass / 1e4)  # Scale with planet mass
-                well_width = 8.0
-            
-            # Gaussian well shape
-            total_y += well_depth * math.exp(-distance_sq / (well_width**2))
-            
-        return total_y
+                # Planets create smaller wells, scaled with planet mass
+                depth, width, scale = -2.0 * (body.mass / 1e4), 8.0, SCALE_ORBIT
+            self._well_depth[k] = depth
+            self._well_inv_width2[k] = 1.0 / width**2
+            self._well_scale[k] = scale
+    
+    def get_curvature_y(self, x, z):
+        """Calculate spacetime curvature at position (x, z)."""
+        return float(self._curvature_field([x], [z])[0, 0])
     
     def update_grid(self):
-        """Update spacetime curvature grid."""
+        """
+        Update spacetime curvature grid.
+        
+        The curves are filled on the first call; after that only the
+        points whose height changed by more than GRID_REDRAW_TOL are
+        modified in place, which away from the moving wells is few. Until
+        some well centre moves into another GRID_MEMO_QUANTUM cell nothing
+        is recomputed at all.
+        """
         if not self.show_grid or not self.grid_lines:
             return
-            
-        curve_index = 0
-        step_size = int(GRID_SPACING)
-        
-        # X-direction lines
-        for x_coord in range(-GRID_RANGE, GRID_RANGE + 1, step_size):
-            if curve_index >= len(self.grid_lines):
-                break
-            points = []
-            for z in range(-GRID_RANGE, GRID_RANGE + 1, 4):  # 4-unit steps for performance
-                y_val = self.get_curvature_y(x_coord, z)
-                points.append(vector(x_coord, y_val, z))
-            
-            if points:  # Only update if we have points
-                self.grid_lines[curve_index].clear()
-                self.grid_lines[curve_index].append(points)
-            curve_index += 1
-        
-        # Z-direction lines
-        for z_coord in range(-GRID_RANGE, GRID_RANGE + 1, step_size):
-            if curve_index >= len(self.grid_lines):
-                break
-            points = []
-            for x in range(-GRID_RANGE, GRID_RANGE + 1, 4):  # 4-unit steps for performance
-                y_val = self.get_curvature_y(x, z_coord)
-                points.append(vector(x, y_val, z_coord))
-            
-            if points:  # Only update if we have points
-                self.grid_lines[curve_index].clear()
-                self.grid_lines[curve_index].append(points)
-            curve_index += 1
+        
+        centers = self._well_centers()
+        key = np.round(np.concatenate(centers) / GRID_MEMO_QUANTUM).tobytes()
+        if key == self._grid_key:
+            return
+        self._grid_key = key
+        
+        n_lines = min(len(self.grid_lines), 2 * len(self._grid_coords))
+        
+        # X-direction lines are rows of one field, Z-direction lines columns of the other
+        heights = np.concatenate(
+            (self._curvature_field(self._grid_coords, self._grid_fine, centers),
+             self._curvature_field(self._grid_fine, self._grid_coords, centers).T))
+        heights = heights[:n_lines]
+        coords = self._grid_coords.tolist()
+        fine = self._grid_fine.tolist()
+        
+        if self._grid_drawn is None:
+            for i, row in enumerate(heights.tolist()):
+                if i < len(coords):
+                    points = [vp.vector(coords[i], y_val, z) for z, y_val in zip(fine, row)]
+                else:
+                    z_coord = coords[i - len(coords)]
+                    points = [vp.vector(x, y_val, z_coord) for x, y_val in zip(fine, row)]
+                self.grid_lines[i].clear()
+                self.grid_lines[i].append(points)
+            self._grid_drawn = heights
+            return
+        
+        changed = np.abs(heights - self._grid_drawn) > GRID_REDRAW_TOL
+        for i, j in zip(*np.nonzero(changed)):
+            y_val = float(heights[i, j])
+            if i < len(coords):
+                pos = vp.vector(coords[i], y_val, fine[j])
+            else:
+                pos = vp.vector(fine[j], y_val, coords[i - len(coords)])
+            self.grid_lines[i].modify(j, pos=pos)
+        self._grid_drawn[changed] = heights[changed]
     
     def update(self):
         """Update visual objects with current physics state."""
-        for body in self.system.bodies:
-            if body in self.body_visuals:
-                visual = self.body_visuals[body]
-                
-                # Get position (try different possible attribute names)
-                if hasattr(body, 'r'):
-                    pos = body.r
-                elif hasattr(body, 'pos'):
-                    pos = body.pos
-                elif hasattr(body, 'position'):
-                    pos = body.position
-                else:
-                    continue  # Skip if no position found
-                
-                # Update position
-                if hasattr(body, 'name') and body.name.lower() == 'sun':
-                    visual.pos = vector(pos[0], 0, pos[1])
-                else:
-                    visual.pos = vector(
-                        pos[0] * SCALE_ORBIT, 
-                        0, 
-                        pos[1] * SCALE_ORBIT
-                    )
-                
-                # Highlight selected body
-                if body == self.selected_body:
-                    # Make selected body slightly larger and add glow
-                    original_radius = getattr(visual, 'original_radius', visual.radius)
-                    visual.radius = original_radius * 1.3
-                    if hasattr(visual, 'emissive'):
-                        visual.emissive = True
-                else:
-                    # Reset to normal size
-                    if hasattr(visual, 'original_radius'):
-                        visual.radius = visual.original_radius
-                    elif hasattr(body, 'name') and body.name.lower() != 'sun':
-                        if hasattr(visual, 'emissive'):
-                            visual.emissive = False
-                
-                # Store original radius for selection highlighting
-                if not hasattr(visual, 'original_radius'):
-                    visual.original_radius = visual.radius
-                
-                # Update light source for sun
-                if self.light and hasattr(body, 'name') and body.name.lower() == 'sun':
-                    self.light.pos = visual.pos
-                
-                # Update labels
-                if body in self.labels:
-                    self.labels[body].pos = visual.pos + vector(0, visual.radius * 2.5, 0)
+        # Highlight selected body
+        if self.selected_body is not self._highlighted:
+            self._set_highlight(self.selected_body)
+        
+        pos_ref = self._pos_ref
+        labels = self.labels
+        visual_xz = self._visual_xz
+        for k, (body, visual) in enumerate(self.body_visuals.items()):
+            pos = pos_ref[body]
+            if pos is None:
+                continue  # Skip if no position found
+            
+            # Update position, unless it would not visibly move; the check is
+            # against the position last written, so slow drift still shows
+            scale = visual.pos_scale
+            x = pos[0] * scale
+            z = pos[1] * scale
+            last_x, last_z = visual_xz[k]
+            if abs(x - last_x) + abs(z - last_z) < VISUAL_MOVE_TOL:
+                continue
+            visual.pos = vp.vector(x, 0, z)
+            visual_xz[k] = x, z
+            
+            # Update labels
+            lbl = labels.get(body)
+            if lbl is not None:
+                lbl.pos = visual.pos + visual.label_offset
+        
+        # Update light source for sun
+        if self.light and self._sun_visual is not None:
+            self.light.pos = self._sun_visual.pos
         
         # Update info panel
         self.update_info_panel()
     
+    def _set_highlight(self, body):
+        """Move the selection highlight (larger and glowing) to ``body``."""
+        labels = self.labels
+        old = self.body_visuals.get(self._highlighted)
+        if old is not None:
+            old.radius = old.original_radius
+            old.emissive = old.base_emissive
+            old.label_offset = vp.vector(0, old.radius * 2.5, 0)
+            self._visual_radius[self._visual_bodies.index(self._highlighted)] = old.radius
+            if self._highlighted in labels:
+                labels[self._highlighted].pos = old.pos + old.label_offset
+        new = self.body_visuals.get(body)
+        if new is not None:
+            new.radius = new.original_radius * 1.3
+            new.emissive = True
+            new.label_offset = vp.vector(0, new.radius * 2.5, 0)
+            self._visual_radius[self._visual_bodies.index(body)] = new.radius
+            if body in labels:
+                labels[body].pos = new.pos + new.label_offset
+        self._highlighted = body
+    
+    def select_body(self, body):
+        """Select ``body`` (or clear the selection with None) and refresh the info panel."""
+        self.selected_body = body
+        self._info_dirty = True
+    
     def handle_mouse_click(self, pos):
         """Handle mouse click for body selection."""
-        click_pos = vector(pos.x, 0, pos.z) if hasattr(pos, 'x') else vector(pos[0], 0, pos[1])
-        
-        closest_body = None
-        closest_distance = float('inf')
-        
-        for body, visual in self.body_visuals.items():
-            distance = mag(visual.pos - click_pos)
-            if distance < visual.radius * 3 and distance < closest_distance:  # Allow some tolerance
-                closest_body = body
-                closest_distance = distance
-        
-        if closest_body:
-            self.selected_body = closest_body
-            print(f"Selected: {getattr(closest_body, 'name', 'Unknown')}")
-            return closest_body
-        
-        return None
+        px, pz = (pos.x, pos.z) if hasattr(pos, 'x') else (pos[0], pos[1])
+        
+        # Squared distances to every sphere centre; a sphere is only a
+        # candidate within three of its radii (some tolerance)
+        d2 = (self._visual_xz[:, 0] - px)**2 + (self._visual_xz[:, 1] - pz)**2
+        d2 = np.where(d2 < (3.0 * self._visual_radius)**2, d2, np.inf)
+        if not len(d2) or d2.min() == np.inf:
+            return None
+        
+        closest_body = self._visual_bodies[int(np.argmin(d2))]
+        self.select_body(closest_body)
+        print(f"Selected: {getattr(closest_body, 'name', 'Unknown')}")
+        return closest_body
     
     def toggle_trails(self):
         """Toggle orbital trails."""
@@ -400,7 +600,7 @@ class VPythonSolarSimulation:
             self.E0 = total_energy(self.system.bodies)
             self.H0 = total_angular_momentum(self.system.bodies)
             print(f"Initial energy: {self.E0:.6e}")
-            print(f"Initial angular momentum: {mag(vector(*self.H0)):.6e}")
+            print(f"Initial angular momentum: {math.sqrt(sum(c * c for c in self.H0)):.6e}")
         except:
             self.E0 = 0
             self.H0 = [0, 0, 0]
@@ -409,9 +609,26 @@ class VPythonSolarSimulation:
         # Initialize VPython visualization
         self.scene = VPythonScene(self.system)
         
+        # Bodies the fallback integrator moves (those with a position), their
+        # position / velocity objects and the packed state it steps
+        self._bodies_arr = [b for b in self.system.bodies if self.scene._pos_ref[b] is not None]
+        self._pos_list = [self.scene._pos_ref[b] for b in self._bodies_arr]
+        self._vel_list = [self.scene._vel_ref[b] for b in self._bodies_arr]
+        self._fb_pos = np.zeros((len(self._bodies_arr), 2))
+        self._fb_vel = np.zeros((len(self._bodies_arr), 2))
+        self._fb_mass = np.array([b.mass for b in self._bodies_arr], dtype=float)
+        self._fb_fixed = np.array([k for k, vel in enumerate(self._vel_list) if vel is None],
+                                  dtype=np.int64)
+        self._fb_fixed_pos = np.zeros((len(self._fb_fixed), 2))
+        self._fb_stale = True    # bodies moved by other code since the last fallback step
+        self._fb_tree = None     # (pos, Gm, acc) octree buffers once there are enough bodies
+        self._fb_step = self._select_fallback_step()
+        
         # Animation control
         self.paused = False
         self.time_scale = 1.0
+        self.substeps = 1        # physics steps per frame and the length of
+        self._eff_dt = self.dt   # each, both refreshed by set_time_scale
         self.frame_skip = 0
         self.skip_every = 2
         
@@ -501,21 +718,21 @@ class VPythonSolarSimulation:
                 self.scene.clear_trails()
                 print("Trails cleared")
             elif key == 'r':
-                scene.camera.pos = vector(0, 80, 120)
-                scene.camera.axis = vector(0, -80, -120)
+                vp.scene.camera.pos = vp.vector(0, 80, 120)
+                vp.scene.camera.axis = vp.vector(0, -80, -120)
                 print("Camera reset")
             elif key in ['1', '2', '3', '4', '5', '6', '7', '8', '9']:
                 # Select body by number
                 body_index = int(key) - 1
                 if 0 <= body_index < len(self.system.bodies):
-                    self.scene.selected_body = self.system.bodies[body_index]
+                    self.scene.select_body(self.system.bodies[body_index])
                     body_name = getattr(self.system.bodies[body_index], 'name', f'Body {body_index+1}')
                     print(f"Selected: {body_name}")
             elif key == '+' or key == '=':
-                self.time_scale = min(10.0, self.time_scale * 1.5)
+                self.set_time_scale(min(10.0, self.time_scale * 1.5))
                 print(f"Time scale: {self.time_scale:.1f}x")
             elif key == '-':
-                self.time_scale = max(0.1, self.time_scale / 1.5)
+                self.set_time_scale(max(0.1, self.time_scale / 1.5))
                 print(f"Time scale: {self.time_scale:.1f}x")
             elif key == 'f':
                 if self.skip_every == 1:
@@ -535,19 +752,31 @@ class VPythonSolarSimulation:
             """Handle mouse clicks for body selection."""
             if evt.event == 'mousedown':
                 # Get mouse position in world coordinates
-                picked = scene.mouse.pick
+                picked = vp.scene.mouse.pick
                 if picked:
                     # Find which body was clicked
                     for body, visual in self.scene.body_visuals.items():
                         if picked == visual:
-                            self.scene.selected_body = body
+                            self.scene.select_body(body)
                             body_name = getattr(body, 'name', 'Unknown')
                             print(f"Selected: {body_name}")
                             break
         
         # Bind events
-        scene.bind('keydown', handle_keys)
-        scene.bind('mousedown', handle_mouse)
+        vp.scene.bind('keydown', handle_keys)
+        vp.scene.bind('mousedown', handle_mouse)
+    
+    def set_time_scale(self, scale):
+        """
+        Set the time scale and the effective timestep derived from it.
+        
+        Every frame advances dt * scale of simulated time. Above 1x that
+        span is split into substeps, so each integrator step stays close to
+        dt and a higher time scale costs more steps rather than accuracy.
+        """
+        self.time_scale = scale
+        self.substeps = max(1, int(round(scale)))
+        self._eff_dt = self.dt * scale / self.substeps
     
     def step_physics(self):
         """Advance physics by one timestep."""
@@ -556,12 +785,13 @@ class VPythonSolarSimulation:
             
         try:
             # Use imported physics if available
-            step_system(self.system.bodies, dt=self.dt * self.time_scale)
+            step_system(self.system.bodies, dt=self._eff_dt)
+            self._fb_stale = True
         except:
             # Fallback physics
             self._fallback_step_physics()
         
-        self.time += self.dt * self.time_scale
+        self.time += self._eff_dt
         self.step_count += 1
         
         # Print diagnostics
@@ -574,80 +804,75 @@ class VPythonSolarSimulation:
                 print(f"Step {self.step_count:6d}, Time: {self.time:8.3f}")
     
     def _fallback_step_physics(self):
-        """Simple fallback physics implementation."""
-        # Calculate forces
-        forces = {body: [0, 0] for body in self.system.bodies}
-        
-        for i, body in enumerate(self.system.bodies):
-            for j, other in enumerate(self.system.bodies):
-                if i == j:
-                    continue
-                
-                # Get positions (try different possible attribute names)
-                if hasattr(body, 'r'):
-                    body_pos = body.r
-                elif hasattr(body, 'pos'):
-                    body_pos = body.pos
-                elif hasattr(body, 'position'):
-                    body_pos = body.position
-                else:
-                    continue
-                
-                if hasattr(other, 'r'):
-                    other_pos = other.r
-                elif hasattr(other, 'pos'):
-                    other_pos = other.pos
-                elif hasattr(other, 'position'):
-                    other_pos = other.position
-                else:
-                    continue
-                
-                # Vector from body to other
-                dx = other_pos[0] - body_pos[0]
-                dy = other_pos[1] - body_pos[1]
-                r_sq = dx*dx + dy*dy + 1e-5  # Softening
-                r = math.sqrt(r_sq)
-                
-                # Gravitational force
-                F = G * body.mass * other.mass / r_sq
-                
-                # Force components
-                forces[body][0] += F * dx / r
-                forces[body][1] += F * dy / r
+        """
+        Simple fallback physics implementation.
+        
+        The packed state carries over from one fallback step to the next
+        and is only reloaded from the bodies after other code moved them.
+        """
+        if self._fb_stale:
+            self._sync_from_bodies()
+            self._fb_stale = False
+        self._fb_step(self._eff_dt)
+        if len(self._fb_fixed):
+            # Bodies without a velocity pull on the others but do not move
+            self._fb_pos[self._fb_fixed] = self._fb_fixed_pos
+            self._fb_vel[self._fb_fixed] = 0.0
+        self._sync_to_bodies()
+    
+    def _select_fallback_step(self):
+        """
+        The fallback step for this body count, bound to the packed state.
+        
+        The bodies never change during a run, so the kernel choice and its
+        array arguments are settled here once; the returned function only
+        takes dt, which follows the time scale.
+        """
+        n = len(self._fb_mass)
+        if HAVE_NUMBA and n >= BH_THRESHOLD:
+            return self._fallback_step_tree
+        if HAVE_NUMBA and n >= PARALLEL_ACCEL_MIN_BODIES and get_num_threads() > 1:
+            kernel = _fallback_step_nb_parallel
+        else:
+            kernel = _fallback_step_nb
+        pos, vel, mass = self._fb_pos, self._fb_vel, self._fb_mass
         
-        # Update velocities and positions
-        for body in self.system.bodies:
-            # Get velocity (try different possible attribute names)
-            if hasattr(body, 'v'):
-                vel = body.v
-            elif hasattr(body, 'vel'):
-                vel = body.vel
-            elif hasattr(body, 'velocity'):
-                vel = body.velocity
-            else:
-                continue
-            
-            # Get position
-            if hasattr(body, 'r'):
-                pos = body.r
-            elif hasattr(body, 'pos'):
-                pos = body.pos
-            elif hasattr(body, 'position'):
-                pos = body.position
-            else:
+        def step(dt):
+            kernel(pos, vel, mass, dt, G, 1e-5)
+        return step
+    
+    def _fallback_step_tree(self, dt):
+        """
+        The _fallback_step_nb update with Barnes-Hut accelerations.
+        
+        Used from BH_THRESHOLD bodies, like the octree in physics/nbody.py;
+        the planar state is laid into the z = 0 plane of its (N, 3) input.
+        """
+        if self._fb_tree is None:
+            n = len(self._fb_mass)
+            self._fb_tree = (np.zeros((n, 3)), G * self._fb_mass, np.zeros((n, 3)))
+        pos3, gm, acc3 = self._fb_tree
+        pos3[:, :2] = self._fb_pos
+        bh_accel_nb(pos3, gm, acc3, 1e-5, BH_THETA, BH_LEAF_SIZE)
+        
+        self._fb_vel += acc3[:, :2] * dt
+        self._fb_pos += self._fb_vel * dt
+    
+    def _sync_from_bodies(self):
+        """Copy body positions / velocities into the packed fallback state."""
+        for k, (pos, vel) in enumerate(zip(self._pos_list, self._vel_list)):
+            self._fb_pos[k] = pos[0], pos[1]
+            self._fb_vel[k] = (vel[0], vel[1]) if vel is not None else (0.0, 0.0)
+        self._fb_fixed_pos[:] = self._fb_pos[self._fb_fixed]
+    
+    def _sync_to_bodies(self):
+        """Write the packed fallback state back into the bodies."""
+        state = zip(self._pos_list, self._vel_list, self._fb_pos.tolist(), self._fb_vel.tolist())
+        for pos, vel, p, v in state:
+            if vel is None:
                 continue
-            
-            # Acceleration
-            ax = forces[body][0] / body.mass
-            ay = forces[body][1] / body.mass
-            
-            # Update velocity
-            vel[0] += ax * self.dt * self.time_scale
-            vel[1] += ay * self.dt * self.time_scale
-            
-            # Update position
-            pos[0] += vel[0] * self.dt * self.time_scale
-            pos[1] += vel[1] * self.dt * self.time_scale
+            pos[0], pos[1] = p
+            vel[0], vel[1] = v
     
     def run(self):
         """Run the interactive VPython simulation."""
@@ -669,12 +894,14 @@ class VPythonSolarSimulation:
         print("Starting simulation...")
         
         # Main simulation loop
+        last_grid_step = self.step_count
         while True:
             # Control frame rate
-            rate(60)  # Target 60 FPS
+            vp.rate(60)  # Target 60 FPS
             
             # Step physics
-            self.step_physics()
+            for _ in range(self.substeps):
+                self.step_physics()
             
             # Update visuals
             self.frame_skip += 1
@@ -683,7 +910,8 @@ class VPythonSolarSimulation:
                 self.scene.update()
                 
                 # Update grid less frequently (every 20 steps for better performance)
-                if self.step_count % 20 == 0:
+                if self.step_count - last_grid_step >= 20:
+                    last_grid_step = self.step_count
                     self.scene.update_grid()
             
             # Update FPS counter